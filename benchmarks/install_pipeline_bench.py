@@ -0,0 +1,189 @@
+"""
+安装流水线基准测试
+用模拟的npm命令和npm仓库对比串行执行与并发执行安装阶段的耗时
+
+用法:
+    python benchmarks/install_pipeline_bench.py [--rounds 3] [--latency 0.2]
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 使用临时的主目录和应用数据目录，检查点、本地包仓库和配置都不写入真实安装
+_workdir = tempfile.mkdtemp(prefix='openclaw-bench-')
+os.environ['HOME'] = _workdir
+os.environ['LOCALAPPDATA'] = _workdir
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.installer import Installer
+from core.env_cache import EnvCache
+from core.package_store import PackageStore
+from core.pipeline import Pipeline
+
+# 模拟npm：按子命令休眠固定时间，模拟真实npm的耗时
+FAKE_NPM = '''#!{python}
+import sys, time
+args = sys.argv[1:]
+if args[:1] == ['--version']:
+    time.sleep({version_delay})
+    print('10.0.0')
+elif args[:2] == ['cache', 'add']:
+    time.sleep({cache_delay})
+elif args[:1] == ['install']:
+    print('npm http fetch GET 200 http://registry/openclaw 5ms (cache hit)', file=sys.stderr)
+    time.sleep({install_delay})
+    print('added 2 packages in 1s')
+elif args[:3] == ['config', 'get', 'prefix']:
+    print('{prefix}')
+'''
+
+
+def make_tarball(name: str, version: str) -> bytes:
+    """生成一个最小的npm包tarball"""
+    manifest = json.dumps({'name': name, 'version': version}).encode()
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+        info = tarfile.TarInfo('package/package.json')
+        info.size = len(manifest)
+        tar.addfile(info, io.BytesIO(manifest))
+    return buf.getvalue()
+
+
+def start_registry(latency: float):
+    """启动模拟npm仓库（每个请求固定延迟）"""
+    packages = {'openclaw': ('1.0.0', {'dep-a': '^1.0.0'}), 'dep-a': ('1.0.0', {})}
+    tarballs = {}
+    packuments = {}
+
+    for name, (version, deps) in packages.items():
+        data = make_tarball(name, version)
+        tarballs[f"{name}-{version}.tgz"] = data
+        packuments[name] = {
+            'name': name,
+            'dist-tags': {'latest': version},
+            'versions': {version: {
+                'name': name,
+                'version': version,
+                'dependencies': deps,
+                'dist': {
+                    'integrity': 'sha512-' + base64.b64encode(hashlib.sha512(data).digest()).decode(),
+                    'tarball': f"BASE/-/{name}-{version}.tgz"
+                }
+            }}
+        }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            path = self.path.lstrip('/')
+            base = f"http://127.0.0.1:{server.server_port}"
+            if path.startswith('-/') and path[2:] in tarballs:
+                body = tarballs[path[2:]]
+            elif path in packuments:
+                body = json.dumps(packuments[path]).replace('BASE', base).encode()
+            else:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_once(workdir: str, registry: str, use_store: bool, max_workers: int) -> float:
+    """执行一次完整安装流水线，返回耗时（秒）"""
+    run_dir = tempfile.mkdtemp(dir=workdir)
+
+    installer = Installer()
+    installer.npm_registry = registry
+    installer.npm_registries = [registry]
+    installer.config.set('network.npm_registries', [registry])
+    installer.config.set('advanced.use_package_store', use_store)
+    installer.env_cache = EnvCache(cache_path=os.path.join(run_dir, 'env_cache.json'))
+    installer.package_store = PackageStore(root=os.path.join(run_dir, 'store'), registry=registry)
+    # 验证阶段会调用真实的openclaw-cn，基准测试中替换掉
+    installer._verify_install = lambda: True
+    installer._init_config = lambda: None
+
+    pipeline = Pipeline(
+        'bench',
+        checkpoint_path=os.path.join(run_dir, 'checkpoint.json'),
+        max_workers=max_workers
+    )
+
+    start = time.perf_counter()
+    ok = pipeline.run(installer._install_stages(os.path.join(run_dir, 'prefix'), None), force=True)
+    elapsed = time.perf_counter() - start
+
+    if not ok:
+        raise RuntimeError("流水线执行失败")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='安装流水线基准测试')
+    parser.add_argument('--rounds', type=int, default=3, help='每种模式的执行次数')
+    parser.add_argument('--latency', type=float, default=0.2, help='模拟仓库的请求延迟（秒）')
+    parser.add_argument('--npm-version-delay', type=float, default=0.5, help='npm --version 耗时（秒）')
+    parser.add_argument('--cache-delay', type=float, default=1.5, help='npm cache add 耗时（秒）')
+    parser.add_argument('--install-delay', type=float, default=1.0, help='npm install 耗时（秒）')
+    args = parser.parse_args()
+
+    workdir = _workdir
+    bin_dir = os.path.join(workdir, 'bin')
+    os.makedirs(bin_dir)
+
+    npm_path = os.path.join(bin_dir, 'npm')
+    with open(npm_path, 'w', encoding='utf-8') as f:
+        f.write(FAKE_NPM.format(
+            python=sys.executable,
+            version_delay=args.npm_version_delay,
+            cache_delay=args.cache_delay,
+            install_delay=args.install_delay,
+            prefix=os.path.join(workdir, 'prefix')
+        ))
+    os.chmod(npm_path, 0o755)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+
+    server = start_registry(args.latency)
+    registry = f"http://127.0.0.1:{server.server_port}/"
+
+    try:
+        print(f"{'模式':<24} {'串行(s)':>10} {'并发(s)':>10} {'加速比':>8}")
+        for label, use_store in (('npm缓存预热', False), ('本地包仓库', True)):
+            serial = [run_once(workdir, registry, use_store, 1) for _ in range(args.rounds)]
+            parallel = [run_once(workdir, registry, use_store, 4) for _ in range(args.rounds)]
+            s, p = statistics.median(serial), statistics.median(parallel)
+            print(f"{label:<24} {s:>10.2f} {p:>10.2f} {s / p:>7.2f}x")
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Node运行时调优基准测试
+交替在关闭和开启advanced.node_tuning时启动网关，对比就绪耗时和压测吞吐
+
+默认使用模拟网关（Node脚本：每个请求做一次走libuv线程池的pbkdf2并分配一批临时对象），
+--real 使用已安装的openclaw-cn
+
+用法:
+    python benchmarks/node_tuning_bench.py [--rounds 3] [--duration 5] [--concurrency 16] [--real]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+
+# 模拟模式下使用临时的应用数据目录，不影响真实配置
+_workdir = tempfile.mkdtemp(prefix='openclaw-tuning-bench-')
+if '--real' not in sys.argv:
+    os.environ['HOME'] = _workdir
+    os.environ['LOCALAPPDATA'] = _workdir
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.manager import Manager
+from utils.loadgen import LoadGenerator
+
+FAKE_GATEWAY = '''#!/usr/bin/env node
+const http = require('http');
+const crypto = require('crypto');
+if (process.argv.includes('--help')) {
+  console.log('Usage: openclaw-cn gateway start [--port <port>]');
+  process.exit(0);
+}
+const port = +process.argv[process.argv.indexOf('--port') + 1];
+http.createServer((req, res) => {
+  const garbage = [];
+  for (let i = 0; i < 2000; i++) garbage.push({ i, s: 'x' + i });
+  crypto.pbkdf2('secret', 'salt', 2000, 32, 'sha256', (err, key) => {
+    res.end(err ? 'error' : key.toString('hex') + garbage.length);
+  });
+}).listen(port, '127.0.0.1');
+process.on('SIGTERM', () => process.exit(0));
+'''
+
+
+def install_fake_gateway(workdir: str):
+    """生成模拟网关命令并加入PATH"""
+    bin_dir = os.path.join(workdir, 'bin')
+    os.makedirs(bin_dir, exist_ok=True)
+    path = os.path.join(bin_dir, 'openclaw-cn')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(FAKE_GATEWAY)
+    os.chmod(path, 0o755)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+
+
+def run_once(manager: Manager, tuned: bool, args) -> dict:
+    """按指定模式启动一次网关并压测"""
+    manager.config.set('advanced.node_tuning', tuned)
+    if not manager.start(args.port):
+        raise RuntimeError("网关启动失败")
+    try:
+        result = LoadGenerator(
+            f"http://127.0.0.1:{manager.port}{args.path}",
+            concurrency=args.concurrency,
+            duration=args.duration,
+            warmup=1
+        ).run()
+        return {
+            'ready': manager.ready_time,
+            'throughput': result['throughput'],
+            'p99': result['latency_ms']['p99'],
+            'tuning': manager.get_status()['tuning']
+        }
+    finally:
+        manager.stop()
+
+
+def run_modes(args) -> dict:
+    """
+    两种模式交替启动若干轮，返回各模式的中位数
+
+    每轮都跑两种模式且先后顺序轮换，机器负载的漂移会同时落在两边，而不是只影响后跑的一种
+    """
+    manager = Manager()
+    modes = [('默认', False), ('调优', True)]
+    runs = {label: [] for label, _ in modes}
+    for i in range(args.rounds):
+        for label, tuned in (modes if i % 2 == 0 else modes[::-1]):
+            runs[label].append(run_once(manager, tuned, args))
+
+    return {
+        label: {
+            'ready': statistics.median(r['ready'] for r in items),
+            'throughput': statistics.median(r['throughput'] for r in items),
+            'p99': statistics.median(r['p99'] for r in items),
+            'tuning': items[-1]['tuning']
+        }
+        for label, items in runs.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Node运行时调优基准测试')
+    parser.add_argument('--rounds', type=int, default=3, help='轮数（每轮两种模式各启动一次）')
+    parser.add_argument('--duration', type=float, default=5, help='每次压测时长（秒）')
+    parser.add_argument('--concurrency', type=int, default=16, help='压测并发数')
+    parser.add_argument('--port', type=int, default=38900, help='网关端口')
+    parser.add_argument('--path', default='/', help='压测路径')
+    parser.add_argument('--real', action='store_true', help='使用已安装的openclaw-cn')
+    args = parser.parse_args()
+
+    if not args.real:
+        install_fake_gateway(_workdir)
+
+    try:
+        results = run_modes(args)
+    finally:
+        shutil.rmtree(_workdir, ignore_errors=True)
+
+    tuning = results['调优']['tuning']
+    if tuning:
+        print(f"调优参数: NODE_OPTIONS={tuning['node_options']!r}, UV_THREADPOOL_SIZE={tuning['uv_threadpool_size']}, "
+              f"资源={tuning['resources']}")
+    print(f"{'模式':<8} {'就绪(s)':>10} {'吞吐(req/s)':>14} {'p99(ms)':>10}")
+    for label, r in results.items():
+        print(f"{label:<8} {r['ready']:>10.3f} {r['throughput']:>14.1f} {r['p99']:>10.2f}")
+
+    base, tuned = results['默认'], results['调优']
+    if base['throughput']:
+        print(f"吞吐变化: {(tuned['throughput'] / base['throughput'] - 1) * 100:+.1f}%，"
+              f"就绪耗时变化: {(tuned['ready'] - base['ready']) * 1000:+.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
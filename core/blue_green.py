@@ -0,0 +1,192 @@
+"""
+蓝绿重启
+管理器的本地TCP转发器占用对外端口；重启时在空闲端口启动新网关，就绪后切换转发目标，旧网关排空连接后再停止
+"""
+
+import http.client
+import threading
+import time
+from typing import Optional, Callable, Dict, Any
+from utils.logger import get_logger
+from utils.metrics import get_metrics
+
+
+class AvailabilityMonitor:
+    """可用性监测：持续通过对外端口发送请求，统计成功率和最长中断时间"""
+
+    def __init__(self, port: int, path: str = '/', interval: float = 0.02, timeout: float = 1.0):
+        """
+        初始化监测
+
+        Args:
+            port: 对外端口
+            path: 请求路径
+            interval: 请求间隔（秒）
+            timeout: 单个请求超时（秒）
+        """
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self.timeout = timeout
+
+        self.requests = 0
+        self.failures = 0
+        self.longest_outage = 0.0
+        self._outage_start: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _check(self) -> bool:
+        """发送一个请求（每次新建连接，经过转发器的accept）"""
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=self.timeout)
+        try:
+            conn.request('GET', self.path)
+            return conn.getresponse().status < 500
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            conn.close()
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            ok = self._check()
+            now = time.monotonic()
+            self.requests += 1
+            if ok:
+                if self._outage_start is not None:
+                    self.longest_outage = max(self.longest_outage, now - self._outage_start)
+                    self._outage_start = None
+            else:
+                self.failures += 1
+                if self._outage_start is None:
+                    self._outage_start = now
+            self._stop_event.wait(self.interval)
+
+    def start(self) -> 'AvailabilityMonitor':
+        """开始监测"""
+        self._thread = threading.Thread(target=self._loop, name='availability-monitor', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        停止监测
+
+        Returns:
+            {'requests', 'failures', 'availability'（百分比）, 'longest_outage_ms'}
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        if self._outage_start is not None:
+            self.longest_outage = max(self.longest_outage, time.monotonic() - self._outage_start)
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'availability': round((1 - self.failures / self.requests) * 100, 3) if self.requests else None,
+            'longest_outage_ms': round(self.longest_outage * 1000, 1)
+        }
+
+
+class BlueGreenGateway:
+    """蓝绿重启（由Manager在启用转发器时使用）"""
+
+    SLOTS = ('blue', 'green')
+
+    def __init__(self, manager, drain_timeout: Optional[float] = None):
+        """
+        初始化
+
+        Args:
+            manager: 管理器实例（持有转发器和当前网关进程）
+            drain_timeout: 旧网关排空连接的最长等待时间（秒，None则使用配置 openclaw.drain_timeout）
+        """
+        self.logger = get_logger()
+        self.metrics = get_metrics()
+        self.manager = manager
+        self.drain_timeout = drain_timeout
+        self.active = self.SLOTS[0]
+        self.last_switch: Optional[Dict[str, Any]] = None
+
+    def _standby(self) -> str:
+        """备用槽位"""
+        return self.SLOTS[1] if self.active == self.SLOTS[0] else self.SLOTS[0]
+
+    def restart(self, callback: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        蓝绿重启：启动新网关 -> 就绪后切换转发 -> 排空并停止旧网关
+
+        新网关启动失败时旧网关继续服务。
+
+        Returns:
+            切换成功返回True
+        """
+        manager = self.manager
+        forwarder = manager.forwarder
+        if not forwarder or not manager.is_running:
+            self.logger.warning("转发器或网关未运行，无法蓝绿重启")
+            return False
+
+        drain_timeout = self.drain_timeout
+        if drain_timeout is None:
+            drain_timeout = manager.config.get('openclaw.drain_timeout', 30)
+
+        start = time.perf_counter()
+        standby = self._standby()
+        monitor = AvailabilityMonitor(manager.port).start()
+        try:
+            try:
+                port = manager.spare_port(manager.port, exclude=(manager.gateway_port,))
+                self.logger.info(f"蓝绿重启: 在端口 {port} 启动 {standby}")
+                spawned = manager.spawn(port, callback)
+            except (OSError, RuntimeError) as e:
+                self.logger.error(f"✗ 新网关启动失败: {e}")
+                spawned = None
+            if spawned is None:
+                self.logger.error("✗ 新网关启动失败，继续使用原网关")
+                return False
+
+            previous = manager.adopt(spawned, callback)
+            old_port = forwarder.switch(port)
+            self.active = standby
+            switched = time.perf_counter()
+
+            drained = forwarder.drain(old_port, drain_timeout)
+            if not drained:
+                self.logger.warning(f"旧网关排空超时，仍有 {forwarder.active_connections(old_port)} 个连接")
+            if previous:
+                manager.terminate(previous)
+        finally:
+            availability = monitor.stop()
+
+        self.last_switch = {
+            'time': time.time(),
+            'from_port': old_port,
+            'to_port': port,
+            'duration': round(time.perf_counter() - start, 3),
+            'drain': round(time.perf_counter() - switched, 3),
+            'drained': drained,
+            **availability
+        }
+        self.metrics.record('blue_green', 'restart', self.last_switch['duration'])
+        self.logger.info(
+            f"✓ 蓝绿重启完成: 可用性 {availability['availability']}%，"
+            f"最长中断 {availability['longest_outage_ms']}ms"
+        )
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取状态
+
+        Returns:
+            状态字典: public_port, active（当前槽位）, target_port, connections, last_switch
+        """
+        forwarder = self.manager.forwarder
+        return {
+            'public_port': forwarder.listen_port if forwarder else None,
+            'active': self.active,
+            'target_port': forwarder.target_port if forwarder else None,
+            'connections': forwarder.active_connections() if forwarder else 0,
+            'last_switch': self.last_switch
+        }
@@ -44,15 +44,56 @@ class Config:
                 "api_type": "minimax",
                 "api_url": "https://api.minimax.chat/v1",
                 "api_key": "",
-                "model_name": "MiniMax-M2.1"
+                "model_name": "MiniMax-M2.1",
+                "health_path": "",
+                "instances": 0,
+                "auto_port": False,
+                "port_range": [3000, 3100],
+                "forwarder": False,
+                "drain_timeout": 30
             },
             "paths": {
                 "nodejs": "",
                 "openclaw": ""
             },
+            "network": {
+                "npm_registries": [
+                    "https://registry.npmjs.org/",
+                    "https://registry.npmmirror.com/",
+                    "https://mirrors.cloud.tencent.com/npm/",
+                    "https://repo.huaweicloud.com/repository/npm/"
+                ],
+                "probe_endpoints": [
+                    "https://github.com"
+                ],
+                "probe_timeout": 5,
+                "auto_select_registry": True
+            },
+            "watchdog": {
+                "enabled": False,
+                "rss_limit_mb": 1024,
+                "cpu_limit_percent": 0,
+                "sustain": 300,
+                "check_interval": 30,
+                "cooldown": 600,
+                "dry_run": False
+            },
             "advanced": {
                 "log_level": "INFO",
-                "max_log_files": 10
+                "max_log_files": 10,
+                "npm_stall_timeout": 120,
+                "use_package_store": True,
+                "start_timeout": 30,
+                "sample_interval": 2,
+                "compile_cache": True,
+                "compile_cache_max_mb": 256,
+                "node_profiling": False,
+                "max_profile_runs": 10,
+                "node_tuning": False,
+                "node_max_old_space_mb": 0,
+                "uv_threadpool_size": 0,
+                "node_semi_space_mb": 0,
+                "node_extra_options": ""
             }
         }
 
@@ -0,0 +1,188 @@
+"""
+环境检查缓存
+将环境检查结果按环境指纹持久化到应用数据目录，避免重复启动子进程
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+from utils.logger import get_logger
+from utils.platform import Platform
+
+
+class EnvCache:
+    """环境检查结果缓存"""
+
+    # 各检查项的有效期（秒）
+    DEFAULT_TTL = {
+        'python_version': 7 * 24 * 3600,
+        'nodejs_version': 24 * 3600,
+        'npm_version': 24 * 3600,
+        'disk_space': 10 * 60,
+        'network': 5 * 60
+    }
+
+    # 磁盘空间分桶大小（MB），可用空间跨桶时缓存失效
+    DISK_BUCKET_MB = 512
+
+    def __init__(self, cache_path: Optional[str] = None, ttl: Optional[Dict[str, float]] = None):
+        """
+        初始化缓存
+
+        Args:
+            cache_path: 缓存文件路径（默认为应用数据目录/env_cache.json）
+            ttl: 各检查项有效期覆盖 {检查项: 秒}
+        """
+        self.logger = get_logger()
+
+        if cache_path is None:
+            cache_path = os.path.join(Platform.get_app_dir(), 'env_cache.json')
+
+        self.cache_path = cache_path
+        self.ttl = dict(self.DEFAULT_TTL)
+        if ttl:
+            self.ttl.update(ttl)
+
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        """从文件加载缓存"""
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+        except Exception as e:
+            self.logger.debug(f"加载环境检查缓存失败: {e}")
+        return {}
+
+    def _save(self):
+        """保存缓存到文件（先写临时文件再替换，避免写坏）"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            self.logger.debug(f"保存环境检查缓存失败: {e}")
+
+    def fingerprint(self, check: str) -> str:
+        """
+        计算检查项的环境指纹
+
+        只包含影响该检查结果的因素：
+        - nodejs_version/npm_version: 可执行文件路径、inode、mtime 和 PATH
+        - disk_space: 可用空间分桶
+        - python_version: 解释器路径和版本
+        - network: 无（仅依赖有效期）
+
+        Args:
+            check: 检查项名称
+
+        Returns:
+            指纹字符串
+        """
+        parts = [check]
+
+        if check in ('nodejs_version', 'npm_version'):
+            binary = 'node' if check == 'nodejs_version' else 'npm'
+            path = shutil.which(binary)
+            parts.append(path or '')
+            if path:
+                try:
+                    real_path = os.path.realpath(path)
+                    stat = os.stat(real_path)
+                    parts.extend([real_path, str(stat.st_ino), str(stat.st_mtime_ns)])
+                except OSError:
+                    pass
+            parts.append(os.environ.get('PATH', ''))
+
+        elif check == 'disk_space':
+            try:
+                free_mb = shutil.disk_usage(os.path.expanduser("~")).free / (1024 * 1024)
+                parts.append(str(int(free_mb // self.DISK_BUCKET_MB)))
+            except OSError:
+                parts.append('unknown')
+
+        elif check == 'python_version':
+            parts.extend([sys.executable, sys.version])
+
+        return hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, check: str, fingerprint: Optional[str] = None) -> Optional[Any]:
+        """
+        读取缓存结果
+
+        Args:
+            check: 检查项名称
+            fingerprint: 环境指纹（None则自动计算）
+
+        Returns:
+            缓存的结果，未命中、过期或指纹不一致时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(check)
+        if not entry:
+            return None
+
+        ttl = self.ttl.get(check, 0)
+        if time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+
+        if fingerprint is None:
+            fingerprint = self.fingerprint(check)
+        if entry.get('fingerprint') != fingerprint:
+            return None
+
+        return entry.get('value')
+
+    def put(self, check: str, value: Any, fingerprint: Optional[str] = None):
+        """
+        写入缓存结果
+
+        Args:
+            check: 检查项名称
+            value: 检查结果（需可JSON序列化）
+            fingerprint: 环境指纹（None则自动计算）
+        """
+        if fingerprint is None:
+            fingerprint = self.fingerprint(check)
+
+        with self._lock:
+            self._entries[check] = {
+                'fingerprint': fingerprint,
+                'timestamp': time.time(),
+                'value': value
+            }
+            self._save()
+
+    def invalidate(self, check: Optional[str] = None):
+        """
+        使缓存失效
+
+        Args:
+            check: 检查项名称（None表示全部失效）
+        """
+        with self._lock:
+            if check is None:
+                self._entries = {}
+            else:
+                self._entries.pop(check, None)
+            self._save()
+
+        self.logger.debug(f"环境检查缓存已失效: {check or '全部'}")
+
+
+# 测试代码
+if __name__ == '__main__':
+    cache = EnvCache()
+    for name in EnvCache.DEFAULT_TTL:
+        print(f"{name}: 指纹={cache.fingerprint(name)[:12]} 缓存={cache.get(name)}")
@@ -7,38 +7,187 @@ import subprocess
 import shutil
 import sys
 import os
-from typing import Dict, Tuple, List
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Tuple, List, Callable, Optional
 from utils.logger import get_logger
 from utils.platform import Platform
+from utils.netprobe import NetworkProbe
+from .config import Config
+from .env_cache import EnvCache
 
 class EnvChecker:
     """环境检查类"""
 
-    def __init__(self):
+    # 并发检查默认参数
+    MAX_WORKERS = 4
+    PROBE_TIMEOUT = 12  # 单项检查截止时间（秒）
+    OVERALL_TIMEOUT = 15  # 全部检查截止时间（秒）
+
+    def __init__(
+        self,
+        use_cache: bool = True,
+        cache: Optional[EnvCache] = None,
+        config: Optional[Config] = None
+    ):
+        """
+        初始化环境检查
+
+        Args:
+            use_cache: 是否使用检查结果缓存
+            cache: 缓存实例（None则使用默认缓存文件）
+            config: 配置实例（None则加载默认配置文件）
+        """
         self.logger = get_logger()
         self.results = {}
-
-    def check_all(self) -> Dict[str, bool]:
+        self.durations = {}
+
+        if config is None:
+            config = Config()
+            config.load()
+        self.config = config
+        self.cache = (cache or EnvCache()) if use_cache else None
+
+    def check_all(
+        self,
+        probe_timeout: float = PROBE_TIMEOUT,
+        overall_timeout: float = OVERALL_TIMEOUT
+    ) -> Dict[str, bool]:
         """
         执行所有环境检查
 
+        各检查项在有界线程池中并发执行，总耗时取决于最慢的一项，
+        而不是所有超时之和。每项耗时记录在 self.durations 中。
+        启用缓存时，指纹未变且未过期的通过项直接使用缓存结果。
+
+        Args:
+            probe_timeout: 单项检查截止时间（秒），超时视为未通过
+            overall_timeout: 全部检查截止时间（秒）
+
         Returns:
             检查结果字典 {检查项: 是否通过}
         """
         self.logger.info("开始环境检查...")
 
-        self.results = {
-            'python_version': self.check_python_version(),
-            'nodejs_version': self.check_nodejs_version(),
-            'disk_space': self.check_disk_space(),
-            'network': self.check_network()
+        probes = {
+            'python_version': self.check_python_version,
+            'nodejs_version': self.check_nodejs_version,
+            'disk_space': self.check_disk_space,
+            'network': self.check_network
         }
 
+        order = list(probes)
+
+        # 命中缓存的检查项直接使用缓存结果，不再启动子进程
+        cached = {}
+        fingerprints = {}
+        if self.cache:
+            for name in list(probes):
+                fingerprints[name] = self.cache.fingerprint(name)
+                if self.cache.get(name, fingerprints[name]) is True:
+                    cached[name] = True
+                    del probes[name]
+            if cached:
+                self.logger.info(f"使用缓存的检查结果: {', '.join(cached)}")
+
+        results, durations = {}, {}
+        if probes:
+            results, durations = self._run_probes(probes, probe_timeout, overall_timeout)
+
+        # 只缓存通过的结果，失败项下次重新检查
+        if self.cache:
+            for name, passed in results.items():
+                if passed:
+                    self.cache.put(name, True, fingerprints[name])
+
+        results.update(cached)
+        self.results = {name: results[name] for name in order}
+        self.durations = {name: durations.get(name, 0.0) for name in order}
+
         # 打印检查结果
         self._print_results()
 
         return self.results
 
+    def invalidate_cache(self, check: Optional[str] = None):
+        """
+        使环境检查缓存失效
+
+        Args:
+            check: 检查项名称（None表示全部失效）
+        """
+        if self.cache:
+            self.cache.invalidate(check)
+
+    def _run_probes(
+        self,
+        probes: Dict[str, Callable[[], bool]],
+        probe_timeout: float,
+        overall_timeout: float
+    ) -> Tuple[Dict[str, bool], Dict[str, float]]:
+        """
+        并发执行检查项
+
+        Args:
+            probes: 检查项字典 {检查项: 检查函数}
+            probe_timeout: 单项检查截止时间（秒）
+            overall_timeout: 全部检查截止时间（秒）
+
+        Returns:
+            (results, durations)
+            results: 检查结果字典（保持probes中的顺序）
+            durations: 每项耗时字典（秒）
+        """
+        start = time.monotonic()
+        overall_deadline = start + overall_timeout
+        results = {}
+        durations = {}
+        finished_at = {}
+
+        def run(name, func):
+            try:
+                return func()
+            finally:
+                finished_at[name] = time.monotonic()
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.MAX_WORKERS, len(probes)) or 1,
+            thread_name_prefix='env-check'
+        )
+        try:
+            futures = {executor.submit(run, name, func): name for name, func in probes.items()}
+            pending = set(futures)
+
+            while pending:
+                now = time.monotonic()
+                deadline = min(overall_deadline, start + probe_timeout)
+                if now >= deadline:
+                    break
+                done, pending = wait(pending, timeout=deadline - now, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    try:
+                        results[name] = bool(future.result())
+                    except Exception as e:
+                        self.logger.error(f"✗ {name} 检查失败: {e}")
+                        results[name] = False
+                    durations[name] = finished_at.get(name, time.monotonic()) - start
+
+            # 超过截止时间的检查项视为未通过
+            for future in pending:
+                name = futures[future]
+                future.cancel()
+                results[name] = False
+                durations[name] = time.monotonic() - start
+                self.logger.warning(f"✗ {name} 检查超时（{durations[name]:.1f}s）")
+        finally:
+            # 不等待超时的检查线程，它们会在各自的超时后自行结束
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        ordered = {name: results[name] for name in probes}
+        self.logger.debug(f"环境检查耗时: {time.monotonic() - start:.2f}s")
+        return ordered, durations
+
     def check_python_version(self, min_version=(3, 10)) -> bool:
         """
         检查Python版本
@@ -156,41 +305,49 @@ class EnvChecker:
             self.logger.error(f"✗ 磁盘空间检查失败: {e}")
             return False
 
-    def check_network(self, timeout=5) -> bool:
+    def check_network(self, timeout: Optional[float] = None) -> bool:
         """
         检查网络连接
 
+        并发探测npm仓库、镜像、GitHub和配置的API地址，测量TCP连接和TLS握手耗时，
+        按延迟排序的结果记录在日志中（安装时的仓库选择由RegistrySelector另行测量）。
+
         Args:
-            timeout: 超时时间（秒）
+            timeout: 单个端点的超时时间（秒，None则使用配置 network.probe_timeout）
 
         Returns:
-            网络可用返回True，否则返回False
+            至少一个npm仓库可用返回True，否则返回False
         """
         try:
-            # 测试连接到GitHub（OpenClaw的托管平台）
-            import socket
-
-            host = 'github.com'
-            port = 443
-
-            self.logger.debug(f"测试网络连接: {host}:{port}")
-
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-
-            result = sock.connect_ex((host, port))
-            sock.close()
-
-            if result == 0:
-                self.logger.info(f"✓ 网络连接检查通过: 可连接到 {host}")
+            registries = self.config.get('network.npm_registries', [])
+            endpoints = list(registries)
+            endpoints.extend(self.config.get('network.probe_endpoints', []))
+            api_url = self.config.get('openclaw.api_url')
+            if api_url:
+                endpoints.append(api_url)
+
+            if timeout is None:
+                timeout = self.config.get('network.probe_timeout', 5)
+
+            self.logger.debug(f"测试网络连接: {len(endpoints)} 个端点")
+
+            report = NetworkProbe(timeout=timeout).probe(endpoints)
+
+            reachable = [r['url'] for r in report if r['ok']]
+            registry_urls = {NetworkProbe.parse_endpoint(u)['url'] for u in registries}
+            reachable_registries = [u for u in reachable if u in registry_urls]
+
+            if reachable_registries:
+                fastest = next(r for r in report if r['url'] == reachable_registries[0])
+                self.logger.info(
+                    f"✓ 网络连接检查通过: {len(reachable)}/{len(report)} 个端点可用，"
+                    f"最快的npm仓库: {fastest['url']} ({fastest['total_ms']:.0f}ms)"
+                )
                 return True
             else:
-                self.logger.warning(f"✗ 网络连接检查失败: 无法连接到 {host}")
+                self.logger.warning("✗ 网络连接检查失败: 无法连接到任何npm仓库")
                 return False
 
-        except socket.timeout:
-            self.logger.warning("✗ 网络连接检查超时")
-            return False
         except Exception as e:
             self.logger.error(f"✗ 网络连接检查失败: {e}")
             return False
@@ -205,6 +362,9 @@ class EnvChecker:
 
         for name, status in self.results.items():
             status_str = "✓ 通过" if status else "✗ 失败"
+            duration = self.durations.get(name)
+            if duration is not None:
+                status_str += f" ({duration * 1000:.0f}ms)"
             self.logger.info(f"  {name}: {status_str}")
 
         self.logger.info("=" * 50)
@@ -229,7 +389,7 @@ class EnvChecker:
             requirements.append("至少 500MB 可用磁盘空间")
 
         if not self.results.get('network', True):
-            requirements.append("可访问 GitHub 的网络连接")
+            requirements.append("可访问 npm 仓库的网络连接")
 
         return requirements
 
@@ -250,7 +410,7 @@ if __name__ == '__main__':
 
     print("\n检查结果:")
     for name, status in results.items():
-        print(f"  {name}: {status}")
+        print(f"  {name}: {status} ({checker.durations[name] * 1000:.0f}ms)")
 
     print(f"\n环境就绪: {checker.is_ready()}")
 
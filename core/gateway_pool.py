@@ -0,0 +1,262 @@
+"""
+OpenClaw网关实例池
+在一段连续端口上启动多个网关实例（默认按CPU核数），跟踪各实例的PID、端口、健康状态和重启次数，支持滚动重启；
+启用 watchdog.enabled 时每个实例有自己的资源看门狗，超过阈值时只重启该实例
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, List, Dict, Any
+from utils.logger import get_logger
+from utils.metrics import get_metrics
+from utils.readiness import ReadinessProbe
+from .config import Config
+from .manager import Manager
+from .supervisor import Supervisor
+from .watchdog import Watchdog
+from .port_allocator import PortAllocator
+
+
+class GatewayInstance:
+    """实例池中的单个网关"""
+
+    def __init__(self, index: int, port: int, supervise: bool = True, pool_size: int = 1):
+        """
+        初始化实例
+
+        Args:
+            index: 实例编号
+            port: 请求的端口号（端口冲突且启用openclaw.auto_port时，实际端口可能不同）
+            supervise: 是否由守护进程自动重启
+            pool_size: 实例池大小（各实例按份额分配Node堆内存和线程池）
+        """
+        self.index = index
+        self.requested_port = port
+        self.manager = Manager(instance_id=index)
+        self.manager.launch_profile.tuning.instances = pool_size
+        self.supervisor = Supervisor(self.manager) if supervise else None
+        self.watchdog: Optional[Watchdog] = None
+
+    @property
+    def port(self) -> int:
+        """实际使用的端口（管理器启动后可能改用了其他端口）"""
+        return self.manager.port or self.requested_port
+
+    def start(self, callback: Optional[Callable[[str], None]] = None) -> bool:
+        """启动实例"""
+        if self.supervisor:
+            self.supervisor.callback = callback
+            return self.supervisor.start(self.requested_port)
+        return self.manager.start(self.requested_port, callback)
+
+    def stop(self, callback: Optional[Callable[[str], None]] = None) -> bool:
+        """停止实例"""
+        if self.supervisor:
+            self.supervisor.callback = callback
+            return self.supervisor.stop()
+        return self.manager.stop(callback) if self.manager.check_running() else True
+
+    def is_healthy(self) -> bool:
+        """进程运行中且端口可连接"""
+        return self.manager.check_running() and ReadinessProbe(self.port, attempt_timeout=0.5).check() is None
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取实例状态"""
+        status = self.manager.get_status()
+        status.update({
+            'index': self.index,
+            'healthy': self.is_healthy(),
+            'restarts': self.supervisor.restart_count if self.supervisor else 0,
+            'supervisor': self.supervisor.get_status()['state'] if self.supervisor else None,
+            'watchdog': self.watchdog.get_status() if self.watchdog else None
+        })
+        return status
+
+
+class GatewayPool:
+    """网关实例池"""
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        base_port: Optional[int] = None,
+        supervise: bool = True,
+        config: Optional[Config] = None
+    ):
+        """
+        初始化实例池
+
+        Args:
+            size: 实例数（None则使用配置 openclaw.instances，为0时按CPU核数）
+            base_port: 起始端口（None则使用配置 openclaw.port）
+            supervise: 是否为每个实例启用守护进程
+            config: 配置实例
+        """
+        self.logger = get_logger()
+        self.metrics = get_metrics()
+
+        if config is None:
+            config = Config()
+            config.load()
+        self.config = config
+
+        if size is None:
+            size = config.get('openclaw.instances', 0) or os.cpu_count() or 1
+        if base_port is None:
+            base_port = config.get('openclaw.port', 3000)
+
+        self.size = max(1, size)
+        self.base_port = base_port
+        self.supervise = supervise
+        self.instances: List[GatewayInstance] = []
+        # 同一时间只重启一个实例（各实例的看门狗可能同时触发）
+        self._restart_lock = threading.Lock()
+
+    def allocate_ports(self) -> List[int]:
+        """
+        从起始端口向上分配空闲端口（跳过被占用的端口，一次扫描）
+
+        Returns:
+            端口列表
+
+        Raises:
+            RuntimeError: 扫描范围内空闲端口不足
+        """
+        limit = self.base_port + max(self.size * 4, 32)
+        ports = PortAllocator().find_free_ports(self.base_port, limit - 1, self.size)
+        if len(ports) < self.size:
+            raise RuntimeError(f"端口 {self.base_port}-{limit - 1} 内空闲端口不足 {self.size} 个")
+        return ports
+
+    def start(self, callback: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        并发启动所有实例
+
+        Args:
+            callback: 状态回调函数
+
+        Returns:
+            全部实例启动成功返回True（部分失败时已启动的实例保持运行）
+        """
+        if self.instances:
+            self.logger.warning("实例池已启动")
+            return False
+
+        start = time.perf_counter()
+        try:
+            ports = self.allocate_ports()
+        except RuntimeError as e:
+            self.logger.error(f"✗ {e}")
+            return False
+
+        self.instances = [GatewayInstance(i, port, self.supervise, self.size) for i, port in enumerate(ports)]
+        self.logger.info(f"启动 {self.size} 个OpenClaw实例: 端口 {', '.join(map(str, ports))}")
+
+        if self.config.get('watchdog.enabled', False):
+            for instance in self.instances:
+                instance.watchdog = Watchdog(
+                    instance.manager,
+                    callback=callback,
+                    restart=lambda cb, inst=instance: self.restart_instance(inst, cb)
+                )
+                # 启动前设置，各实例的堆上限低于看门狗的内存阈值
+                instance.manager.launch_profile.tuning.rss_limit_mb = instance.watchdog.rss_limit_mb or None
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            results = list(executor.map(lambda inst: inst.start(callback), self.instances))
+
+        ok = all(results)
+        self.metrics.record('pool', 'start', time.perf_counter() - start, ok=ok)
+        self.logger.info(f"{sum(results)}/{self.size} 个实例启动成功")
+
+        for instance in self.instances:
+            if instance.watchdog:
+                instance.watchdog.start()
+        return ok
+
+    def stop(self, callback: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        并发停止所有实例
+
+        Returns:
+            全部停止成功返回True
+        """
+        if not self.instances:
+            return True
+
+        for instance in self.instances:
+            if instance.watchdog:
+                instance.watchdog.stop()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(self.instances)) as executor:
+            results = list(executor.map(lambda inst: inst.stop(callback), self.instances))
+
+        ok = all(results)
+        self.metrics.record('pool', 'stop', time.perf_counter() - start, ok=ok)
+        self.instances = []
+        return ok
+
+    def rolling_restart(self, callback: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        滚动重启：逐个重启实例，等新进程就绪后再重启下一个，其余实例持续提供服务
+
+        Returns:
+            全部实例重启成功返回True；某个实例重启失败时停止，不再重启后续实例
+        """
+        start = time.perf_counter()
+        for instance in self.instances:
+            if not self.restart_instance(instance, callback):
+                self.logger.error(f"✗ 实例 {instance.index} 重启失败，停止滚动重启")
+                self.metrics.record('pool', 'rolling_restart', time.perf_counter() - start, ok=False)
+                return False
+
+        self.metrics.record('pool', 'rolling_restart', time.perf_counter() - start)
+        return True
+
+    def restart_instance(
+        self,
+        instance: GatewayInstance,
+        callback: Optional[Callable[[str], None]] = None
+    ) -> bool:
+        """
+        重启单个实例（滚动重启的一步，其余实例持续提供服务；也是该实例看门狗的重启方式）
+
+        Returns:
+            新进程就绪返回True
+        """
+        with self._restart_lock:
+            self.logger.info(f"滚动重启: 实例 {instance.index} (端口 {instance.port})")
+            instance.stop(callback)
+            return instance.start(callback)
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取实例池汇总状态
+
+        Returns:
+            状态字典: size, running, healthy, restarts, cpu_percent, rss, instances（各实例状态）
+        """
+        instances = [inst.get_status() for inst in self.instances]
+        resources = [s['resources'] for s in instances if s.get('resources')]
+        return {
+            'size': len(instances),
+            'running': sum(1 for s in instances if s['running']),
+            'healthy': sum(1 for s in instances if s['healthy']),
+            'restarts': sum(s['restarts'] for s in instances),
+            'cpu_percent': sum(r['cpu_percent'] for r in resources),
+            'rss': sum(r['rss'] for r in resources),
+            'instances': instances
+        }
+
+
+# 测试代码
+if __name__ == '__main__':
+    pool = GatewayPool(size=2)
+    if pool.start(print):
+        try:
+            print(pool.get_status())
+        finally:
+            pool.stop()
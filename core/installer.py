@@ -6,11 +6,20 @@ OpenClaw安装器
 import subprocess
 import os
 import sys
-from typing import Optional, Callable
+import time
+from contextlib import nullcontext
+from typing import Optional, Callable, List, Tuple
 from utils.logger import get_logger
 from utils.platform import Platform
 from utils.downloader import Downloader
+from utils.metrics import get_metrics
 from .config import Config
+from .env_cache import EnvCache
+from .npm_runner import NpmRunner, NpmProgress
+from .package_store import PackageStore
+from .registry_selector import RegistrySelector
+from .package_info import read_installed_version, LatestVersionCache, get_installed_version_cache
+from .pipeline import Pipeline, Stage
 
 class Installer:
     """OpenClaw安装器"""
@@ -19,81 +28,204 @@ class Installer:
         """初始化安装器"""
         self.logger = get_logger()
         self.config = Config()
+        self.config.load()
         self.downloader = Downloader()
+        self.env_cache = EnvCache()
+        self.metrics = get_metrics()
 
         # OpenClaw的npm包信息
         self.npm_package = 'openclaw'
         self.npm_registry = 'https://registry.npmjs.org/'
 
+        # 故障切换顺序（选择仓库后按速度排序）
+        self.npm_registries = [self.npm_registry]
+
+        # 本地包仓库（按integrity保存tarball，重复安装无需联网）
+        self.package_store = PackageStore(registry=self.npm_registry, downloader=self.downloader)
+
     def install(
         self,
         install_dir: Optional[str] = None,
-        progress_callback: Optional[Callable[[str, int, int], None]] = None
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        force: bool = False
     ) -> bool:
         """
         执行完整安装流程
 
+        每个阶段完成后写入检查点（阶段ID、输入指纹、结果、耗时），
+        再次执行时跳过输入未变化的已完成阶段。
+
         Args:
             install_dir: 安装目录（默认为全局安装）
             progress_callback: 进度回调 callback(stage, current, total)
+            force: 忽略检查点，重新执行全部阶段
 
         Returns:
             安装成功返回True，失败返回False
         """
         self.logger.info("开始OpenClaw安装流程...")
 
-        stages = [
-            ("检查环境", 1),
-            ("下载OpenClaw", 2),
-            ("执行安装", 3),
-            ("安装依赖", 4),
-            ("初始化配置", 5),
-            ("验证安装", 6)
-        ]
-
-        total_stages = len(stages)
-
-        # 阶段1: 检查环境
-        self._update_progress(progress_callback, stages[0][0], 1, total_stages)
-        if not self._check_environment():
-            self.logger.error("环境检查失败，安装终止")
+        pipeline = self._install_pipeline(progress_callback)
+        self._select_registry()
+        ok = pipeline.run(
+            self._install_stages(install_dir, progress_callback),
+            params={'install_dir': install_dir},
+            force=force
+        )
+        get_installed_version_cache().invalidate()
+        if not ok:
             return False
 
-        # 阶段2: 下载OpenClaw
-        self._update_progress(progress_callback, stages[1][0], 2, total_stages)
-        if not self._download_openclaw():
-            self.logger.error("下载OpenClaw失败，安装终止")
-            return False
+        self.logger.info("OpenClaw安装流程完成")
+        return True
 
-        # 阶段3: 执行安装
-        self._update_progress(progress_callback, stages[2][0], 3, total_stages)
-        if not self._execute_install(install_dir):
-            self.logger.error("安装OpenClaw失败，安装终止")
-            return False
+    def resume(
+        self,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> bool:
+        """
+        从上次失败的阶段继续安装
 
-        # 阶段4: 安装依赖
-        self._update_progress(progress_callback, stages[3][0], 4, total_stages)
-        if not self._install_dependencies():
-            self.logger.warning("依赖安装失败，但OpenClaw可能仍可使用")
+        失败阶段之前的阶段直接使用检查点结果，安装目录沿用上次的参数。
 
-        # 阶段5: 初始化配置
-        self._update_progress(progress_callback, stages[4][0], 5, total_stages)
-        self._init_config()
+        Args:
+            progress_callback: 进度回调 callback(stage, current, total)
 
-        # 阶段6: 验证安装
-        self._update_progress(progress_callback, stages[5][0], 6, total_stages)
-        if not self._verify_install():
-            self.logger.warning("安装验证失败，但OpenClaw可能已安装")
-            # 不返回False，因为可能只是版本检查失败
+        Returns:
+            安装成功返回True，失败返回False
+        """
+        pipeline = self._install_pipeline(progress_callback)
+        install_dir = pipeline.checkpoint.get('params', {}).get('install_dir')
+
+        self.logger.info("继续OpenClaw安装流程...")
+        self._select_registry()
+
+        ok = pipeline.run(
+            self._install_stages(install_dir, progress_callback),
+            params={'install_dir': install_dir},
+            resume=True
+        )
+        get_installed_version_cache().invalidate()
+        if not ok:
+            return False
 
         self.logger.info("OpenClaw安装流程完成")
         return True
 
+    def _install_pipeline(
+        self,
+        progress_callback: Optional[Callable[[str, int, int], None]]
+    ) -> Pipeline:
+        """创建安装流水线（检查点保存在应用数据目录）"""
+        return Pipeline(
+            'install',
+            stage_callback=lambda stage, current, total: self._update_progress(
+                progress_callback, stage.name, current, total
+            ),
+            metrics=self.metrics
+        )
+
+    def _install_stages(
+        self,
+        install_dir: Optional[str],
+        progress_callback: Optional[Callable[[str, int, int], None]]
+    ) -> List[Stage]:
+        """
+        构建安装阶段列表
+
+        Args:
+            install_dir: 安装目录（None表示全局安装）
+            progress_callback: 进度回调
+
+        Returns:
+            阶段列表
+        """
+        use_store = self.config.get('advanced.use_package_store', True)
+        total = 7
+
+        def prefix():
+            return install_dir or self.config.get('paths.openclaw')
+
+        def latest():
+            return LatestVersionCache().get_latest(self.npm_package, self.npm_registry)
+
+        def download_inputs():
+            version = latest()
+            return {'latest': version, 'use_store': use_store} if version else None
+
+        def install_inputs():
+            version = latest()
+            return {'latest': version, 'install_dir': install_dir} if version else None
+
+        def installed_is_latest():
+            version = read_installed_version(self.npm_package, prefix())
+            return version is not None and version == latest()
+
+        def verify_inputs():
+            version = read_installed_version(self.npm_package, prefix())
+            return {'installed': version} if version else None
+
+        # 环境检查、元数据获取和npm缓存预热互不依赖，并发执行
+        return [
+            Stage(
+                'check_environment', "检查环境", self._check_environment,
+                fingerprint=lambda: self.env_cache.fingerprint('npm_version'),
+                failure_message="环境检查失败，安装终止",
+                depends_on=[]
+            ),
+            Stage(
+                'download', "下载OpenClaw", self._download_openclaw,
+                fingerprint=download_inputs,
+                validate=lambda: not use_store or bool(self.package_store.snapshot(self.npm_package)),
+                failure_message="下载OpenClaw失败，安装终止",
+                depends_on=[]
+            ),
+            Stage(
+                'warm_cache', "预热npm缓存", self._warm_npm_cache,
+                fingerprint=download_inputs,
+                required=False,
+                failure_message="npm缓存预热失败，安装时将在线下载",
+                depends_on=[]
+            ),
+            Stage(
+                'execute_install', "执行安装",
+                lambda: self._execute_install(install_dir, progress_callback, 4, total),
+                fingerprint=install_inputs,
+                validate=installed_is_latest,
+                failure_message="安装OpenClaw失败，安装终止",
+                depends_on=['check_environment', 'download', 'warm_cache']
+            ),
+            Stage(
+                'install_dependencies', "安装依赖", self._install_dependencies,
+                fingerprint=lambda: self.npm_package,
+                required=False,
+                failure_message="依赖安装失败，但OpenClaw可能仍可使用"
+            ),
+            Stage(
+                'init_config', "初始化配置",
+                lambda: self._init_config() or True,
+                required=False
+            ),
+            Stage(
+                'verify_install', "验证安装", self._verify_install,
+                fingerprint=verify_inputs,
+                required=False,
+                # 不终止流程，因为可能只是版本检查失败
+                failure_message="安装验证失败，但OpenClaw可能已安装"
+            )
+        ]
+
     def _check_environment(self) -> bool:
         """检查环境是否满足要求"""
         self.logger.info("检查安装环境...")
 
-        # 检查npm是否可用
+        # 检查npm是否可用（npm未变化时使用缓存的版本，避免启动子进程）
+        fingerprint = self.env_cache.fingerprint('npm_version')
+        cached_version = self.env_cache.get('npm_version', fingerprint)
+        if cached_version:
+            self.logger.info(f"npm版本: {cached_version} (缓存)")
+            return True
+
         try:
             result = subprocess.run(
                 ['npm', '--version'],
@@ -106,7 +238,9 @@ class Installer:
                 self.logger.error("npm未安装或不可用")
                 return False
 
-            self.logger.info(f"npm版本: {result.stdout.strip()}")
+            npm_version = result.stdout.strip()
+            self.logger.info(f"npm版本: {npm_version}")
+            self.env_cache.put('npm_version', npm_version, fingerprint)
 
         except FileNotFoundError:
             self.logger.error("npm未安装，请先安装Node.js")
@@ -118,9 +252,26 @@ class Installer:
         return True
 
     def _download_openclaw(self) -> bool:
-        """下载OpenClaw（通过npm）"""
+        """下载OpenClaw（预取到本地包仓库，失败时交由npm在线下载）"""
         self.logger.info("准备下载OpenClaw...")
 
+        if self.config.get('advanced.use_package_store', True):
+            for registry in self.npm_registries:
+                self.package_store.registry = registry
+                version = self.package_store.prefetch(self.npm_package)
+                if version:
+                    self.logger.info(f"✓ {self.npm_package}@{version} 已在本地包仓库中")
+                    return True
+                self.logger.warning(f"从 {registry} 预取失败")
+
+            snapshot, offline = self._store_snapshot()
+            if snapshot:
+                reason = "在线仓库均不可访问" if offline else "预取失败"
+                self.logger.warning(
+                    f"{reason}，将使用本地包仓库中的 {self.npm_package}@{snapshot['version']} 离线安装"
+                )
+                return True
+
         try:
             # 检查是否能访问npm registry
             can_access = self.downloader.check_url(
@@ -140,12 +291,95 @@ class Installer:
             self.logger.warning(f"下载准备失败，但尝试继续: {e}")
             return True  # 不阻止安装流程
 
-    def _execute_install(self, install_dir: Optional[str] = None) -> bool:
+    def _store_snapshot(self) -> Tuple[Optional[dict], bool]:
+        """
+        选择用于安装的本地包仓库快照
+
+        快照是仓库的latest版本时直接使用；不是时（预取失败）只在所有在线仓库都不可访问时才离线安装旧版本，
+        否则不使用本地包仓库，由npm在线安装最新版本。
+
+        Returns:
+            (快照，None表示不使用本地包仓库; 是否为离线安装旧版本)
+        """
+        if not self.config.get('advanced.use_package_store', True):
+            return None, False
+
+        snapshot = self.package_store.snapshot(self.npm_package)
+        if not snapshot:
+            return None, False
+        if snapshot['version'] == LatestVersionCache().get_latest(self.npm_package, self.npm_registry):
+            return snapshot, False
+
+        for registry in self.npm_registries:
+            if self.downloader.check_url(f"{registry}{self.npm_package}"):
+                self.logger.warning(
+                    f"本地包仓库中的 {self.npm_package}@{snapshot['version']} 不是最新版本，"
+                    f"{registry} 可访问，在线安装"
+                )
+                return None, False
+        return snapshot, True
+
+    def _warm_npm_cache(self) -> bool:
+        """
+        预先把openclaw的tarball放入npm缓存（与环境检查、元数据获取并发执行）
+
+        使用本地包仓库时由仓库提供tarball，无需预热。
+        """
+        if self.config.get('advanced.use_package_store', True):
+            self.logger.info("使用本地包仓库，跳过npm缓存预热")
+            return True
+
+        cmd = ['npm', 'cache', 'add', self.npm_package, '--registry', self.npm_registry, '--loglevel=http']
+        self.logger.info(f"预热npm缓存: {' '.join(cmd)}")
+
+        try:
+            stall_timeout = self.config.get('advanced.npm_stall_timeout', 120)
+            result = NpmRunner(stall_timeout=stall_timeout).run(cmd)
+            if not result.ok:
+                self.logger.debug(f"npm缓存预热输出: {result.tail}")
+            return result.ok
+        except Exception as e:
+            self.logger.warning(f"npm缓存预热失败: {e}")
+            return False
+
+    def _select_registry(self):
+        """
+        测量候选仓库，选出最快的健康仓库作为npm_registry
+
+        在流水线开始前调用一次：各阶段并发读取npm_registry，且下载阶段可能被检查点跳过。
+        """
+        if not self.config.get('network.auto_select_registry', True):
+            return
+
+        self.logger.info("测量npm仓库速度...")
+        try:
+            selector = RegistrySelector(package=self.npm_package, config=self.config)
+            with self.metrics.measure('install', 'select_registry'):
+                self.npm_registries = selector.ranked()
+            self.npm_registry = self.npm_registries[0]
+            self.package_store.registry = self.npm_registry
+            self.logger.info(f"使用npm仓库: {self.npm_registry}")
+        except Exception as e:
+            self.logger.warning(f"仓库选择失败，使用默认仓库: {e}")
+
+    def _execute_install(
+        self,
+        install_dir: Optional[str] = None,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        current: int = 4,
+        total: int = 7
+    ) -> bool:
         """
         执行OpenClaw安装
 
+        逐行读取npm输出，实时把进度（阶段、已获取的包数）传给进度回调；
+        npm超过 advanced.npm_stall_timeout 秒没有任何输出时视为卡住并终止。
+
         Args:
             install_dir: 安装目录（None表示全局安装）
+            progress_callback: 进度回调 callback(stage, current, total)
+            current: 当前阶段序号（用于进度回调）
+            total: 总阶段数（用于进度回调）
 
         Returns:
             安装成功返回True，失败返回False
@@ -153,8 +387,22 @@ class Installer:
         self.logger.info("开始安装OpenClaw...")
 
         try:
-            # 构建npm install命令
-            cmd = ['npm', 'install', '-g', self.npm_package]
+            # 本地包仓库中有最新版本的完整快照（或在线仓库均不可访问）时，从本地仓库安装
+            snapshot, offline = self._store_snapshot()
+
+            install_spec = self.npm_package
+            if snapshot:
+                install_spec = f"{self.npm_package}@{snapshot['version']}"
+                if offline:
+                    self._update_progress(
+                        progress_callback,
+                        f"在线仓库不可访问，离线安装 {install_spec}",
+                        current,
+                        total
+                    )
+
+            # 构建npm install命令（http日志级别用于解析下载进度）
+            cmd = ['npm', 'install', '-g', install_spec, '--loglevel=http']
 
             # 如果指定了安装目录，添加--prefix参数
             if install_dir:
@@ -164,19 +412,39 @@ class Installer:
             else:
                 self.logger.info("全局安装模式")
 
-            self.logger.info(f"执行命令: {' '.join(cmd)}")
+            def on_progress(progress: NpmProgress):
+                self._update_progress(
+                    progress_callback,
+                    f"执行安装: {progress.describe()}",
+                    current,
+                    total
+                )
 
             # 执行安装
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5分钟超时
-            )
+            stall_timeout = self.config.get('advanced.npm_stall_timeout', 120)
+            store_registry = self.package_store.serve() if snapshot else nullcontext()
+            with store_registry as local_registry:
+                if local_registry:
+                    self.logger.info(f"从本地包仓库安装: {install_spec}")
+                    # 本地仓库出现网络错误时仍可切换到在线仓库
+                    registries = [local_registry] + self.npm_registries
+                    cmd.extend(['--prefer-offline', '--no-audit', '--no-fund'])
+                else:
+                    registries = self.npm_registries
+
+                # 仓库卡住或出现网络错误时切换到下一个仓库
+                for i, registry in enumerate(registries):
+                    run_cmd = cmd + ['--registry', registry]
+                    self.logger.info(f"执行命令: {' '.join(run_cmd)}")
+                    result = NpmRunner(stall_timeout=stall_timeout).run(run_cmd, on_progress)
+
+                    if result.ok or not result.network_error or i == len(registries) - 1:
+                        break
+                    self.logger.warning(f"仓库 {registry} 安装失败，切换到 {registries[i + 1]}")
 
             # 检查结果
-            if result.returncode == 0:
-                self.logger.info("OpenClaw安装成功")
+            if result.ok:
+                self.logger.info(f"OpenClaw安装成功 ({result.progress.describe()})")
 
                 # 保存安装路径到配置
                 if install_dir:
@@ -188,12 +456,16 @@ class Installer:
                         self.config.set('paths.openclaw', global_path)
 
                 return True
+            elif result.stalled:
+                self.logger.error(f"安装超时（超过{stall_timeout}秒无进度）")
+                self.logger.error(f"最近输出: {result.tail}")
+                return False
             else:
-                self.logger.error(f"安装失败: {result.stderr}")
+                self.logger.error(f"安装失败: {result.tail}")
                 return False
 
-        except subprocess.TimeoutExpired:
-            self.logger.error("安装超时（超过5分钟）")
+        except FileNotFoundError:
+            self.logger.error("npm未安装，请先安装Node.js")
             return False
         except Exception as e:
             self.logger.error(f"安装失败: {e}")
@@ -217,9 +489,6 @@ class Installer:
         self.logger.info("初始化配置...")
 
         try:
-            # 加载配置
-            self.config.load()
-
             # 设置默认值
             if not self.config.get('openclaw.install_dir'):
                 install_dir = self.config.get('paths.openclaw')
@@ -310,8 +579,14 @@ class Installer:
         """
         self.logger.info("开始卸载OpenClaw...")
 
+        with self.metrics.measure('uninstall', 'npm_uninstall') as timer:
+            timer.ok = self._npm_uninstall()
+        get_installed_version_cache().invalidate()
+        return timer.ok
+
+    def _npm_uninstall(self) -> bool:
+        """使用npm卸载"""
         try:
-            # 使用npm卸载
             result = subprocess.run(
                 ['npm', 'uninstall', '-g', self.npm_package],
                 capture_output=True,
@@ -330,6 +605,41 @@ class Installer:
             self.logger.error(f"卸载失败: {e}")
             return False
 
+    def _is_up_to_date(self) -> bool:
+        """
+        检查已安装版本是否已是最新
+
+        已安装版本直接读取package.json，最新版本来自带ETag缓存的dist-tags，
+        两者都不启动子进程。
+
+        Returns:
+            确认已是最新返回True；不是最新或无法确定返回False
+        """
+        start = time.perf_counter()
+        try:
+            self.config.load()
+            installed = read_installed_version(self.npm_package, self.config.get('paths.openclaw'))
+            latest = None
+            if installed:
+                latest = LatestVersionCache().get_latest(self.npm_package, self.npm_registry)
+        except Exception as e:
+            self.logger.debug(f"版本比较失败: {e}")
+            installed = latest = None
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if installed and latest and installed == latest:
+            self.logger.info(f"✓ OpenClaw已是最新版本 {installed}，跳过更新 ({elapsed_ms:.1f}ms)")
+            return True
+
+        if not installed:
+            self.logger.info(f"未找到已安装版本，执行npm更新 ({elapsed_ms:.1f}ms)")
+        elif not latest:
+            self.logger.info(f"无法获取最新版本，执行npm更新 ({elapsed_ms:.1f}ms)")
+        else:
+            self.logger.info(f"发现新版本: {installed} -> {latest}，执行npm更新 ({elapsed_ms:.1f}ms)")
+        return False
+
     def update(self) -> bool:
         """
         更新OpenClaw到最新版本
@@ -338,9 +648,31 @@ class Installer:
             更新成功返回True，失败返回False
         """
         self.logger.info("开始更新OpenClaw...")
+        start = time.perf_counter()
+
+        # 快速路径：已安装版本与仓库latest一致时无需运行npm
+        with self.metrics.measure('update', 'version_check'):
+            up_to_date = self._is_up_to_date()
 
+        if up_to_date:
+            self.metrics.record('update', 'total', time.perf_counter() - start)
+            return True
+
+        with self.metrics.measure('update', 'npm_update') as timer:
+            timer.ok = self._npm_update()
+        get_installed_version_cache().invalidate()
+
+        if timer.ok:
+            with self.metrics.measure('update', 'verify_install') as verify_timer:
+                verify_timer.ok = self._verify_install()
+            timer.ok = verify_timer.ok
+
+        self.metrics.record('update', 'total', time.perf_counter() - start, ok=timer.ok)
+        return timer.ok
+
+    def _npm_update(self) -> bool:
+        """使用npm更新"""
         try:
-            # 使用npm更新
             result = subprocess.run(
                 ['npm', 'update', '-g', self.npm_package],
                 capture_output=True,
@@ -350,7 +682,7 @@ class Installer:
 
             if result.returncode == 0:
                 self.logger.info("OpenClaw更新成功")
-                return self._verify_install()
+                return True
             else:
                 self.logger.error(f"更新失败: {result.stderr}")
                 return False
@@ -0,0 +1,316 @@
+"""
+网关启动配置
+为网关进程准备环境变量：按本机资源设置Node运行时参数；启用Node.js磁盘编译缓存（NODE_COMPILE_CACHE，Node 22.1+），
+管理缓存大小并在OpenClaw版本变化时清空；性能分析模式通过NODE_OPTIONS传入--cpu-prof/--heap-prof并收集分析文件
+"""
+
+import os
+import shutil
+import time
+from typing import Optional, Dict, List, Any
+from utils.logger import get_logger
+from utils.platform import Platform
+from .config import Config
+from .package_info import get_installed_version_cache
+from .node_tuning import NodeTuning, allowed_node_options
+
+
+class LaunchProfile:
+    """网关启动配置类"""
+
+    # 缓存目录中记录OpenClaw版本的文件
+    VERSION_FILE = '.openclaw-version'
+
+    # 分析文件后缀
+    PROFILE_SUFFIXES = ('.cpuprofile', '.heapprofile')
+
+    # 性能分析预加载脚本。Node只在正常退出时写出分析文件，而停止网关发送的是SIGTERM，
+    # 因此网关自己没有处理的SIGTERM/SIGINT改为正常退出（两种方式都加载）。
+    # 不允许在NODE_OPTIONS中使用--cpu-prof的Node（22之前）设置OPENCLAW_PROFILE_DIR，
+    # 由脚本通过inspector在进程内开始采样，退出时写出与--cpu-prof/--heap-prof相同格式的文件
+    PRELOAD_SCRIPT = """\
+'use strict';
+const fs = require('fs');
+const path = require('path');
+const os = require('os');
+
+const dir = process.env.OPENCLAW_PROFILE_DIR;
+if (dir) {
+  const inspector = require('inspector');
+  const session = new inspector.Session();
+  session.connect();
+  session.post('Profiler.enable');
+  session.post('Profiler.start');
+  session.post('HeapProfiler.enable');
+  session.post('HeapProfiler.startSampling');
+
+  process.on('exit', () => {
+    const name = `${Date.now()}.${process.pid}`;
+    // 进程内会话的post是同步回调，可以在exit事件中使用
+    session.post('Profiler.stop', (err, res) => {
+      if (!err) fs.writeFileSync(path.join(dir, `CPU.${name}.cpuprofile`), JSON.stringify(res.profile));
+    });
+    session.post('HeapProfiler.stopSampling', (err, res) => {
+      if (!err) fs.writeFileSync(path.join(dir, `Heap.${name}.heapprofile`), JSON.stringify(res.profile));
+    });
+  });
+}
+
+// 网关自己没有处理的信号按信号退出码正常退出，触发分析文件写出
+for (const signal of ['SIGTERM', 'SIGINT']) {
+  process.on(signal, () => {
+    if (process.listenerCount(signal) === 1) {
+      process.exit(128 + os.constants.signals[signal]);
+    }
+  });
+}
+"""
+
+    def __init__(self, config: Optional[Config] = None):
+        """
+        初始化启动配置
+
+        Args:
+            config: 配置实例（advanced.compile_cache、compile_cache_max_mb、node_profiling、max_profile_runs）
+        """
+        self.logger = get_logger()
+        if config is None:
+            config = Config()
+            config.load()
+        self.config = config
+
+        app_dir = Platform.get_app_dir()
+        self.cache_dir = os.path.join(app_dir, 'node_compile_cache')
+        self.profiles_root = os.path.join(app_dir, 'profiles')
+
+        # 最近一次启动的分析文件目录
+        self.profile_dir: Optional[str] = None
+
+        # Node运行时调优及最近一次启动实际使用的参数
+        self.tuning = NodeTuning(config)
+        self.tuning_applied: Optional[Dict[str, Any]] = None
+
+    @property
+    def cache_enabled(self) -> bool:
+        return bool(self.config.get('advanced.compile_cache', True))
+
+    @property
+    def profiling(self) -> bool:
+        return bool(self.config.get('advanced.node_profiling', False))
+
+    # ==================== 编译缓存 ====================
+
+    def cache_size(self) -> int:
+        """缓存目录的总字节数"""
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    def prepare_cache(self) -> Dict[str, Any]:
+        """
+        启动前整理编译缓存：OpenClaw版本变化时清空，超过大小上限时删除最久未更新的文件
+
+        Returns:
+            {'version', 'invalidated', 'evicted'（删除的文件数）, 'size'}
+        """
+        version = get_installed_version_cache().get()
+        marker = os.path.join(self.cache_dir, self.VERSION_FILE)
+        result = {'version': version, 'invalidated': False, 'evicted': 0, 'size': 0}
+
+        cached_version = None
+        try:
+            with open(marker, 'r', encoding='utf-8') as f:
+                cached_version = f.read().strip()
+        except OSError:
+            pass
+
+        if cached_version != (version or ''):
+            if os.path.isdir(self.cache_dir):
+                self.logger.info(f"OpenClaw版本变化 ({cached_version or '无'} -> {version})，清空编译缓存")
+                shutil.rmtree(self.cache_dir, ignore_errors=True)
+                result['invalidated'] = True
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = marker + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(version or '')
+            os.replace(tmp_path, marker)
+
+        result['evicted'] = self.trim_cache()
+        result['size'] = self.cache_size()
+        return result
+
+    def trim_cache(self, max_bytes: Optional[int] = None) -> int:
+        """
+        把缓存目录缩减到大小上限以内（按修改时间从旧到新删除）
+
+        Args:
+            max_bytes: 大小上限（None则使用配置 advanced.compile_cache_max_mb）
+
+        Returns:
+            删除的文件数
+        """
+        if max_bytes is None:
+            max_bytes = int(self.config.get('advanced.compile_cache_max_mb', 256)) * 1024 * 1024
+
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name == self.VERSION_FILE:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+
+        if removed:
+            self.logger.info(f"编译缓存超过上限，已删除 {removed} 个旧文件")
+        return removed
+
+    def clear_cache(self):
+        """删除全部编译缓存"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    # ==================== 性能分析 ====================
+
+    def _new_profile_dir(self) -> str:
+        """为本次启动创建分析文件目录，并删除超出保留数量的旧目录"""
+        os.makedirs(self.profiles_root, exist_ok=True)
+        runs = sorted(
+            name for name in os.listdir(self.profiles_root)
+            if os.path.isdir(os.path.join(self.profiles_root, name))
+        )
+        keep = max(1, int(self.config.get('advanced.max_profile_runs', 10)))
+        for name in runs[:max(0, len(runs) - keep + 1)]:
+            shutil.rmtree(os.path.join(self.profiles_root, name), ignore_errors=True)
+
+        path = os.path.join(self.profiles_root, time.strftime('%Y%m%d-%H%M%S'))
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.profiles_root, f"{time.strftime('%Y%m%d-%H%M%S')}-{suffix}")
+        os.makedirs(path)
+        return path
+
+    @staticmethod
+    def node_allows_prof_flags() -> bool:
+        """当前Node是否允许在NODE_OPTIONS中使用--cpu-prof/--heap-prof"""
+        flags = ['--cpu-prof', '--heap-prof']
+        return allowed_node_options(flags) == set(flags)
+
+    def _preload_path(self) -> str:
+        """写入预加载脚本（内容不变时不重写）"""
+        path = os.path.join(self.profiles_root, 'profile-preload.js')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == self.PRELOAD_SCRIPT:
+                    return path
+        except OSError:
+            pass
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.PRELOAD_SCRIPT)
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        """NODE_OPTIONS中含空格的值需要用双引号"""
+        return f'"{value}"' if ' ' in value else value
+
+    def collect_profiles(self) -> List[str]:
+        """
+        收集最近一次启动产生的分析文件
+
+        Node在进程退出时写入分析文件，需在网关停止后调用；被SIGKILL强制终止的进程不会写入。
+
+        Returns:
+            分析文件路径列表
+        """
+        if not self.profile_dir or not os.path.isdir(self.profile_dir):
+            return []
+        return sorted(
+            os.path.join(self.profile_dir, name)
+            for name in os.listdir(self.profile_dir)
+            if name.endswith(self.PROFILE_SUFFIXES)
+        )
+
+    # ==================== 环境变量 ====================
+
+    def environment(self) -> Dict[str, str]:
+        """
+        生成网关进程的环境变量（在当前环境基础上修改）
+
+        Returns:
+            环境变量字典
+        """
+        env = dict(os.environ)
+        self.tuning_applied = self.tuning.apply(env)
+
+        if self.cache_enabled:
+            try:
+                self.prepare_cache()
+                env['NODE_COMPILE_CACHE'] = self.cache_dir
+            except OSError as e:
+                self.logger.warning(f"编译缓存不可用: {e}")
+
+        self.profile_dir = None
+        if self.profiling:
+            self.profile_dir = self._new_profile_dir()
+            flags = ['--require', self._quote(self._preload_path())]
+            if self.node_allows_prof_flags():
+                directory = self._quote(self.profile_dir)
+                flags += [
+                    '--cpu-prof', f"--cpu-prof-dir={directory}",
+                    '--heap-prof', f"--heap-prof-dir={directory}"
+                ]
+            else:
+                env['OPENCLAW_PROFILE_DIR'] = self.profile_dir
+            env['NODE_OPTIONS'] = ' '.join(filter(None, [env.get('NODE_OPTIONS', ''), *flags]))
+            self.logger.info(f"性能分析模式: 分析文件写入 {self.profile_dir}")
+
+        return env
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取状态
+
+        Returns:
+            状态字典: tuning, compile_cache, cache_dir, cache_size, profiling, profile_dir
+        """
+        return {
+            'tuning': self.tuning_applied,
+            'compile_cache': self.cache_enabled,
+            'cache_dir': self.cache_dir,
+            'cache_size': self.cache_size(),
+            'profiling': self.profiling,
+            'profile_dir': self.profile_dir
+        }
+
+
+# 测试代码
+if __name__ == '__main__':
+    profile = LaunchProfile()
+    print(profile.prepare_cache())
+    env = profile.environment()
+    print({k: env[k] for k in ('NODE_COMPILE_CACHE', 'NODE_OPTIONS') if k in env})
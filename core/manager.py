@@ -3,30 +3,170 @@ OpenClaw管理器
 负责启动、停止、状态监控和Web界面管理
 """
 
+import json
+import os
+import signal
 import subprocess
+import threading
 import time
 import webbrowser
-from typing import Optional, Callable
+from typing import Optional, Callable, Iterator, Union, List
 from utils.logger import get_logger
 from utils.platform import Platform
+from utils.metrics import get_metrics
+from utils.readiness import ReadinessProbe
+from utils.process_log import ProcessLog
+from utils.log_tail import tail_lines, follow
+from utils.proc_sampler import ProcessSampler
+from utils.loadgen import LoadGenerator, save_result
+from utils.exit_watcher import get_exit_watcher
+from utils.tcp_forwarder import TcpForwarder
 from .config import Config
+from .package_info import get_installed_version_cache, cli_options
+from .pidfile import PidFile, pid_alive, process_starttime
+from .port_allocator import PortAllocator, describe_owner
+from .launch_profile import LaunchProfile
+from .blue_green import BlueGreenGateway
 
 class Manager:
     """OpenClaw管理器"""
 
-    def __init__(self):
-        """初始化管理器"""
+    def __init__(self, instance_id: Optional[Union[int, str]] = None):
+        """
+        初始化管理器
+
+        Args:
+            instance_id: 多实例时的实例编号（None为默认的单实例，启动后把端口写回配置）
+        """
         self.logger = get_logger()
         self.config = Config()
+        self.config.load()
+        self.instance_id = instance_id
+        self.metrics = get_metrics()
 
-        # 进程信息
+        # 进程信息（port为对外端口；启用转发器时网关监听gateway_port，否则两者相同）
         self.process: Optional[subprocess.Popen] = None
         self.pid: Optional[int] = None
         self.port: Optional[int] = None
+        self.gateway_port: Optional[int] = None
+
+        # 本地TCP转发器（openclaw.forwarder）：占用对外端口，重启时蓝绿切换
+        self.forwarder: Optional[TcpForwarder] = None
+        self.blue_green = BlueGreenGateway(self)
+
+        # 资源看门狗（watchdog.enabled，网关启动或接管后开始检查）
+        self.watchdog = None
+
+        # 最近一次启动的就绪耗时（秒）
+        self.ready_time: Optional[float] = None
+
+        # 网关输出：网关直接写入轮转日志文件，安装器退出后仍可继续写日志，接管后通过日志文件读取
+        log_name = 'gateway.log' if instance_id is None else f"gateway-{instance_id}.log"
+        self.log_path = os.path.join(Platform.get_app_dir(), 'logs', log_name)
+        self.gateway_log = ProcessLog(self.log_path)
+        # 本次启动前日志文件的大小（之后的内容为本次启动的输出）
+        self._log_offset = 0
+
+        # 启动环境（编译缓存、性能分析）
+        self.launch_profile = LaunchProfile(self.config)
+        self.last_profiles: List[str] = []
+
+        # 资源采样（CPU/内存/线程/文件数）
+        self.sampler: Optional[ProcessSampler] = None
 
         # 状态
         self.is_running = False
 
+        # 是否为主动停止（供守护进程区分主动停止和异常退出）
+        self.stop_requested = False
+
+        # 进程退出事件
+        self.last_exit: Optional[dict] = None
+        self._exit_listeners: List[Callable[[dict], None]] = []
+
+        # PID文件：安装器重启后重新接管仍在运行的网关
+        pid_name = 'gateway.pid' if instance_id is None else f"gateway-{instance_id}.pid"
+        self.pid_file = PidFile(os.path.join(Platform.get_app_dir(), pid_name))
+        self.attached = False
+        self._starttime: Optional[int] = None
+        self._reattach()
+
+    @property
+    def use_forwarder(self) -> bool:
+        """是否通过本地转发器对外提供服务（仅默认的单实例）"""
+        return self.instance_id is None and bool(self.config.get('openclaw.forwarder', False))
+
+    def _reattach(self):
+        """根据PID文件接管上次启动且仍在运行的网关（启用转发器时重新开始转发）"""
+        record = self.pid_file.load_valid()
+        if record is None:
+            return
+
+        self.pid = record['pid']
+        self.port = self.gateway_port = record['port']
+        self._starttime = record.get('starttime')
+        self.attached = True
+        self.is_running = True
+        self._log_offset = self.gateway_log.size()
+
+        public_port = record.get('public_port')
+        if public_port and self.use_forwarder and self._forward(public_port, self.gateway_port):
+            self.port = public_port
+
+        self.logger.info(f"已接管运行中的OpenClaw (PID: {self.pid}, 端口: {self.port})")
+        self._start_sampler()
+        self._watch_exit(self._current())
+        self._start_watchdog()
+
+    @staticmethod
+    def _pid_running(pid: int, starttime: Optional[int]) -> bool:
+        """PID对应的进程是否仍在运行（启动时间不同说明PID已被复用）"""
+        if not pid_alive(pid):
+            return False
+        return starttime is None or process_starttime(pid) == starttime
+
+    def _process_alive(self) -> bool:
+        """网关进程是否仍在运行（子进程或接管的进程）"""
+        if self.process:
+            return self.process.poll() is None
+        if self.attached and self.pid:
+            return self._pid_running(self.pid, self._starttime)
+        return False
+
+    def _current(self) -> Optional[dict]:
+        """
+        当前网关进程
+
+        Returns:
+            {'process'（接管的进程为None）, 'pid', 'port', 'starttime'}，没有返回None
+        """
+        if not self.process and not (self.attached and self.pid):
+            return None
+        return {'process': self.process, 'pid': self.pid, 'port': self.gateway_port, 'starttime': self._starttime}
+
+    def _watch_exit(self, gateway: dict):
+        """订阅网关进程的退出（回调只关心PID，切换后旧进程的退出视为预期的退出）"""
+        pid, starttime = gateway['pid'], gateway['starttime']
+        if gateway['process']:
+            get_exit_watcher().watch(pid, self._on_exit, gateway['process'])
+        else:
+            get_exit_watcher().watch(pid, self._on_exit, alive=lambda: self._pid_running(pid, starttime))
+
+    def _clear_process(self):
+        """清理进程信息"""
+        self.is_running = False
+        self.process = None
+        self.pid = None
+        self.attached = False
+        self._starttime = None
+
+    @staticmethod
+    def _detach_options() -> dict:
+        """Popen参数：让网关脱离安装器的会话/控制台，不随安装器或终端退出"""
+        if Platform.is_windows():
+            return {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {'start_new_session': True}
+
     def start(
         self,
         port: Optional[int] = None,
@@ -49,60 +189,47 @@ class Manager:
         self.logger.info("启动OpenClaw...")
         self._log_callback(callback, "正在启动OpenClaw...")
 
+        with self.metrics.measure('start', 'total') as timer:
+            timer.ok = self._start(port, callback)
+        if timer.ok:
+            self._start_watchdog()
+        return timer.ok
+
+    def _start(self, port: Optional[int], callback: Optional[Callable[[str], None]]) -> bool:
+        """启动进程并等待就绪（启用转发器时网关监听内部端口，由转发器占用对外端口）"""
+        self.stop_requested = False
+        self._prepare_watchdog()
         try:
             # 获取端口
             if port is None:
                 port = self.config.get('openclaw.port', 3000)
 
+            # 转发器仍在对外端口上监听时（网关异常退出后重新启动）无需检查对外端口
+            if not (self.forwarder and self.forwarder.listen_port == port):
+                port = self._check_port(port, callback)
+                if port is None:
+                    return False
+
             self.port = port
             self._log_callback(callback, f"使用端口: {port}")
 
-            # 构建启动命令
-            cmd = ['openclaw-cn', 'gateway', 'start']
-
-            self.logger.info(f"执行命令: {' '.join(cmd)}")
-
-            # 启动进程
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-
-            # 获取PID
-            self.pid = self.process.pid
-            self._log_callback(callback, f"进程PID: {self.pid}")
-
-            # 等待启动（检查进程是否还在运行）
-            time.sleep(1)
+            gateway_port = self.spare_port(port) if self.use_forwarder else port
+            spawned = self.spawn(gateway_port, callback)
+            if spawned is None:
+                return False
 
-            if self.process.poll() is None:
-                # 进程仍在运行，启动成功
-                self.is_running = True
-                self.logger.info(f"✓ OpenClaw启动成功 (PID: {self.pid})")
-                self._log_callback(callback, "✓ OpenClaw启动成功")
+            if self.use_forwarder and not self._forward(port, gateway_port):
+                self._log_callback(callback, f"✗ 对外端口 {port} 不可用")
+                self.terminate(spawned)
+                return False
+            self.adopt(spawned, callback)
 
-                # 保存配置
+            # 保存配置（多实例的端口由实例池分配，不写回）
+            if self.instance_id is None:
                 self.config.set('openclaw.port', port)
                 self.config.save()
 
-                return True
-            else:
-                # 进程已退出，启动失败
-                returncode = self.process.returncode
-                stderr = self.process.stderr.read()
-
-                self.logger.error(f"✗ OpenClaw启动失败 (返回码: {returncode})")
-                self.logger.error(f"错误信息: {stderr}")
-
-                self._log_callback(callback, f"✗ 启动失败: {stderr}")
-
-                # 清理
-                self.process = None
-                self.pid = None
-
-                return False
+            return True
 
         except FileNotFoundError:
             self.logger.error("✗ openclaw-cn命令未找到")
@@ -114,6 +241,213 @@ class Manager:
             self._log_callback(callback, f"✗ 启动失败: {e}")
             return False
 
+    def _check_port(self, port: int, callback: Optional[Callable[[str], None]]) -> Optional[int]:
+        """
+        检查端口是否被占用（冲突时按配置自动选择空闲端口）
+
+        Returns:
+            可用的端口，被占用且不能自动选择时返回None
+        """
+        with self.metrics.measure('start', 'port_check'):
+            allocation = PortAllocator(config=self.config).resolve(
+                port, auto=bool(self.config.get('openclaw.auto_port', False))
+            )
+        if allocation['conflict']:
+            owner = describe_owner(allocation['owner'])
+            if allocation['port'] is None:
+                self.logger.error(f"✗ 端口 {port} 已被 {owner} 占用")
+                self._log_callback(callback, f"✗ 端口 {port} 已被 {owner} 占用")
+                return None
+            self.logger.warning(f"端口 {port} 已被 {owner} 占用，改用端口 {allocation['port']}")
+            port = allocation['port']
+        return port
+
+    def spare_port(self, public_port: int, exclude=()) -> int:
+        """
+        对外端口之后的第一个空闲端口（启用转发器时网关监听的内部端口）
+
+        Raises:
+            RuntimeError: 没有空闲端口
+        """
+        port = PortAllocator(config=self.config).find_free(public_port + 1, 65535, exclude=exclude)
+        if port is None:
+            raise RuntimeError("没有空闲端口")
+        return port
+
+    def _forward(self, public_port: int, gateway_port: int) -> bool:
+        """把对外端口转发到网关端口（转发器未运行时启动转发器）"""
+        if self.forwarder:
+            self.forwarder.switch(gateway_port)
+            return True
+
+        forwarder = TcpForwarder(public_port, gateway_port)
+        try:
+            forwarder.start()
+        except OSError as e:
+            self.logger.error(f"✗ 对外端口 {public_port} 不可用: {e}")
+            return False
+        self.forwarder = forwarder
+        return True
+
+    def spawn(self, port: int, callback: Optional[Callable[[str], None]] = None) -> Optional[dict]:
+        """
+        启动一个网关进程并等待就绪（不改变当前网关，供启动和蓝绿重启使用）
+
+        Args:
+            port: 网关监听的端口
+            callback: 状态回调函数
+
+        Returns:
+            {'process', 'pid', 'port', 'starttime', 'log_offset', 'ready_time'}，启动失败返回None
+
+        Raises:
+            FileNotFoundError: openclaw-cn命令不存在
+        """
+        # 构建启动命令（openclaw-cn支持--port时通过参数传入端口，否则写入OpenClaw自身的配置）
+        cmd = ['openclaw-cn', 'gateway', 'start']
+        if '--port' in (cli_options(['gateway', 'start']) or ()):
+            cmd.extend(['--port', str(port)])
+        else:
+            self._configure_gateway_port(port)
+
+        self.logger.info(f"执行命令: {' '.join(cmd)}")
+
+        # 准备环境变量（编译缓存、性能分析）
+        with self.metrics.measure('start', 'prepare_env'):
+            env = self.launch_profile.environment()
+
+        # 启动进程：输出直接写入日志文件，并脱离安装器的会话（安装器退出后网关继续运行）
+        with self.metrics.measure('start', 'spawn'):
+            log_file = self.gateway_log.open()
+            log_offset = log_file.tell()
+            try:
+                process = subprocess.Popen(
+                    cmd,
+                    env=env,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    **self._detach_options()
+                )
+            finally:
+                log_file.close()
+
+        self._log_callback(callback, f"进程PID: {process.pid}")
+        spawned = {
+            'process': process,
+            'pid': process.pid,
+            'port': port,
+            'starttime': None,
+            'log_offset': log_offset,
+            'ready_time': None
+        }
+
+        # 等待端口（及健康检查路径）就绪
+        probe = ReadinessProbe(
+            port,
+            health_path=self.config.get('openclaw.health_path') or None,
+            deadline=self.config.get('advanced.start_timeout', 30)
+        )
+        with self.metrics.measure('start', 'wait_ready') as ready:
+            readiness = probe.wait(alive=lambda: process.poll() is None)
+            ready.ok = readiness['ready']
+
+        if ready.ok:
+            # 服务已开始接受连接，启动成功
+            spawned['ready_time'] = readiness['elapsed']
+            return spawned
+        elif not readiness['exited']:
+            # 进程仍在运行但超时未就绪
+            self.logger.error(f"✗ OpenClaw启动超时: 端口{port}未就绪 ({readiness['error']})")
+            self._log_callback(callback, f"✗ 启动超时: 端口{port}未就绪")
+            self.terminate(spawned)
+            return None
+        else:
+            # 进程已退出，启动失败
+            stderr = '\n'.join(self.gateway_log.output_since(log_offset))
+
+            self.logger.error(f"✗ OpenClaw启动失败 (返回码: {process.returncode})")
+            self.logger.error(f"错误信息: {stderr}")
+
+            self._log_callback(callback, f"✗ 启动失败: {stderr}")
+            return None
+
+    def adopt(self, spawned: dict, callback: Optional[Callable[[str], None]] = None) -> Optional[dict]:
+        """
+        把spawn启动的网关作为当前网关（写入PID文件、开始采样和退出监视）
+
+        Args:
+            spawned: spawn的返回值
+            callback: 状态回调函数
+
+        Returns:
+            原来的网关进程（见_current），没有返回None；调用方负责停止它
+        """
+        previous = self._current()
+
+        self.process = spawned['process']
+        self.pid = spawned['pid']
+        self.gateway_port = spawned['port']
+        self._starttime = spawned['starttime']
+        self._log_offset = spawned['log_offset']
+        self.ready_time = spawned['ready_time']
+        self.attached = False
+        self.is_running = True
+
+        self.logger.info(f"✓ OpenClaw启动成功 (PID: {self.pid}, 就绪耗时: {self.ready_time:.2f}s)")
+        self.pid_file.write(self.pid, self.gateway_port, public_port=self.port if self.forwarder else None)
+        self._start_sampler()
+        self._watch_exit(spawned)
+        self._log_callback(callback, "✓ OpenClaw启动成功")
+        return previous
+
+    def terminate(self, gateway: dict, timeout: float = 5):
+        """
+        终止网关进程（先优雅终止，超时后强制终止）
+
+        Args:
+            gateway: 网关进程（见_current）
+            timeout: 等待优雅退出的时间（秒）
+        """
+        process = gateway['process']
+        if process is None:
+            # 接管的进程不是本进程的子进程，只能通过PID终止
+            self._terminate_pid(gateway['pid'], gateway['starttime'], timeout)
+            return
+
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.logger.warning("优雅终止超时，强制终止")
+            process.kill()
+            process.wait()
+
+    def _configure_gateway_port(self, port: int):
+        """把端口写入OpenClaw配置文件的gateway.port（openclaw-cn gateway start不支持--port时使用）"""
+        if self.instance_id is not None:
+            self.logger.warning("openclaw-cn不支持--port，多个实例共用配置文件中的端口")
+
+        path = os.path.join(os.path.expanduser('~'), '.openclaw', 'openclaw.json')
+        try:
+            oc_config = {}
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    oc_config = json.load(f)
+            gateway = oc_config.setdefault('gateway', {})
+            if gateway.get('port') == port:
+                return
+            gateway['port'] = port
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(oc_config, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self.logger.info(f"已将网关端口 {port} 写入 {path}")
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"写入OpenClaw配置失败: {e}")
+
     def stop(self, callback: Optional[Callable[[str], None]] = None) -> bool:
         """
         停止OpenClaw
@@ -124,47 +458,131 @@ class Manager:
         Returns:
             停止成功返回True，失败返回False
         """
+        if self.watchdog:
+            self.watchdog.stop()
+
         if not self.is_running:
+            # 网关异常退出后转发器可能仍占用对外端口
+            self._close_forwarder()
             self.logger.warning("OpenClaw未运行")
             return False
 
         self.logger.info("停止OpenClaw...")
         self._log_callback(callback, "正在停止OpenClaw...")
 
+        with self.metrics.measure('stop', 'total') as timer:
+            timer.ok = self._stop(callback)
+        return timer.ok
+
+    def _stop(self, callback: Optional[Callable[[str], None]]) -> bool:
+        """终止进程（启用转发器时先停止接受新连接，排空现有连接后再终止）"""
+        self.stop_requested = True
         try:
-            if self.process:
-                # 尝试优雅终止
-                self.process.terminate()
+            current = self._current()
+            if current is None:
+                return False
+
+            self._close_forwarder()
+            self.terminate(current)
 
-                # 等待最多5秒
-                try:
-                    self.process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    # 超时则强制终止
-                    self.logger.warning("优雅终止超时，强制终止")
-                    self.process.kill()
-                    self.process.wait()
+            if self.sampler:
+                self.sampler.stop()
 
-                self.is_running = False
-                self.process = None
-                self.pid = None
+            self.pid_file.remove()
+            self._clear_process()
 
-                self.logger.info("✓ OpenClaw已停止")
-                self._log_callback(callback, "✓ OpenClaw已停止")
+            # 性能分析模式下收集进程退出时写入的分析文件
+            if self.launch_profile.profile_dir:
+                self.last_profiles = self.launch_profile.collect_profiles()
+                self.logger.info(f"收集到 {len(self.last_profiles)} 个分析文件: {self.launch_profile.profile_dir}")
 
-                return True
+            self.logger.info("✓ OpenClaw已停止")
+            self._log_callback(callback, "✓ OpenClaw已停止")
+
+            return True
 
         except Exception as e:
             self.logger.error(f"✗ 停止失败: {e}")
             self._log_callback(callback, f"✗ 停止失败: {e}")
             return False
 
-        return False
+    def add_exit_listener(self, listener: Callable[[dict], None]):
+        """
+        订阅进程退出事件（重复订阅同一个回调只保留一个）
+
+        Args:
+            listener: 回调 listener(event)，event见_on_exit
+        """
+        if listener not in self._exit_listeners:
+            self._exit_listeners.append(listener)
+
+    def remove_exit_listener(self, listener: Callable[[dict], None]):
+        """取消订阅进程退出事件"""
+        if listener in self._exit_listeners:
+            self._exit_listeners.remove(listener)
+
+    def _on_exit(self, pid: int, returncode: Optional[int]):
+        """
+        进程退出回调（由退出监视器调用）
+
+        异常退出时立即更新运行状态，然后发布退出事件:
+        {'pid', 'returncode'（接管的进程为None）, 'expected'（是否为主动停止）,
+         'stderr'（本次启动的最后几行输出，stdout和stderr写入同一个日志文件）, 'time'}
+        """
+        current = pid == self.pid
+        expected = self.stop_requested or not current
+        stderr = self.gateway_log.output_since(self._log_offset) if current else []
+
+        event = {
+            'pid': pid,
+            'returncode': returncode,
+            'expected': expected,
+            'stderr': stderr,
+            'time': time.time()
+        }
+        self.last_exit = event
+
+        if not expected:
+            self.logger.warning(f"OpenClaw进程已退出 (PID: {pid}, 返回码: {returncode})")
+            if self.sampler:
+                self.sampler.stop()
+            self.pid_file.remove()
+            self._clear_process()
+
+        for listener in list(self._exit_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                self.logger.warning(f"退出事件回调失败: {e}")
+
+    def _close_forwarder(self):
+        """停止转发器：先停止接受新连接，等待现有连接结束"""
+        if not self.forwarder:
+            return
+        self.forwarder.stop()
+        if not self.forwarder.drain(self.gateway_port, self.config.get('openclaw.drain_timeout', 30)):
+            self.logger.warning("排空连接超时，强制停止")
+        self.forwarder = None
+
+    def _terminate_pid(self, pid: int, starttime: Optional[int], timeout: float = 5):
+        """通过PID终止进程（先SIGTERM，超时后强制终止）"""
+        os.kill(pid, signal.SIGTERM)
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            if not self._pid_running(pid, starttime):
+                return
+            time.sleep(0.05)
+
+        self.logger.warning("优雅终止超时，强制终止")
+        os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
 
     def restart(self, callback: Optional[Callable[[str], None]] = None) -> bool:
         """
         重启OpenClaw
 
+        转发器运行中时蓝绿重启（新网关就绪后切换转发，旧网关排空后停止，不中断服务）；
+        否则先停止再启动。
+
         Args:
             callback: 状态回调函数
 
@@ -174,13 +592,55 @@ class Manager:
         self.logger.info("重启OpenClaw...")
         self._log_callback(callback, "正在重启OpenClaw...")
 
-        # 先停止
-        if self.is_running:
-            self.stop(callback)
-            time.sleep(1)
+        with self.metrics.measure('restart', 'total') as timer:
+            if self.forwarder and self.is_running:
+                timer.ok = self.blue_green.restart(callback)
+                return timer.ok
+
+            # 先停止（不经过stop()，看门狗保持运行：重启可能正是由看门狗线程发起的）
+            if self.is_running:
+                with self.metrics.measure('restart', 'stop') as stop_timer:
+                    stop_timer.ok = self._stop(callback)
+                if not stop_timer.ok:
+                    timer.ok = False
+                    return False
+                with self.metrics.measure('restart', 'pause'):
+                    time.sleep(1)
+
+            # 再启动
+            with self.metrics.measure('restart', 'start') as start_timer:
+                start_timer.ok = self._start(None, callback)
+            timer.ok = start_timer.ok
+        if timer.ok:
+            self._start_watchdog()
+        return timer.ok
+
+    def _prepare_watchdog(self):
+        """
+        按配置（watchdog.enabled）创建资源看门狗，并按其内存阈值限制Node堆上限（未启用时不限制）
 
-        # 再启动
-        return self.start(callback=callback)
+        在启动网关进程之前调用，新进程的堆上限才与看门狗一致。实例池的看门狗由GatewayPool管理。
+
+        Returns:
+            启用时返回看门狗，否则返回None
+        """
+        if self.instance_id is not None:
+            return None
+        if not self.config.get('watchdog.enabled', False):
+            self.launch_profile.tuning.rss_limit_mb = None
+            return None
+        if self.watchdog is None:
+            # watchdog模块依赖本模块，在此处导入
+            from .watchdog import Watchdog
+            self.watchdog = Watchdog(self)
+        self.launch_profile.tuning.rss_limit_mb = self.watchdog.rss_limit_mb or None
+        return self.watchdog
+
+    def _start_watchdog(self):
+        """网关运行后按配置启动资源看门狗"""
+        watchdog = self._prepare_watchdog()
+        if watchdog and not watchdog.get_status()['running']:
+            watchdog.start()
 
     def get_status(self) -> dict:
         """
@@ -193,37 +653,101 @@ class Manager:
             'running': self.is_running,
             'pid': self.pid,
             'port': self.port,
+            'gateway_port': self.gateway_port,
+            'forwarder': self.blue_green.get_status() if self.forwarder else None,
+            'watchdog': self.watchdog.get_status() if self.watchdog else None,
             'version': None,
-            'uptime': None
+            'uptime': None,
+            'ready_time': self.ready_time,
+            'resources': None,
+            'tuning': None
         }
 
-        if self.is_running and self.process:
+        if self.is_running:
             # 检查进程是否仍在运行
-            if self.process.poll() is None:
-                # 进程仍在运行
-                status['pid'] = self.process.pid
+            if self._process_alive():
+                # 网关持有日志文件，运行中超过大小上限时复制后截断
+                self.gateway_log.trim()
+                status['attached'] = self.attached
+                status['tuning'] = self.launch_profile.tuning_applied
+                if self.sampler:
+                    status['uptime'] = self.sampler.uptime()
+                    status['resources'] = self.sampler.latest()
             else:
                 # 进程已退出
-                self.is_running = False
-                self.process = None
-                self.pid = None
+                self._clear_process()
+                self.pid_file.remove()
                 status['running'] = False
+                status['pid'] = None
 
-        # 尝试获取版本
+        # 获取版本（命令文件未变化时直接使用缓存）
         try:
-            result = subprocess.run(
-                ['openclaw-cn', '--version'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                status['version'] = result.stdout.strip()
-        except:
-            pass
+            status['version'] = get_installed_version_cache().get()
+        except Exception as e:
+            self.logger.debug(f"获取版本失败: {e}")
 
         return status
 
+    def _start_sampler(self):
+        """开始采样网关进程树的资源占用"""
+        if self.sampler:
+            self.sampler.stop()
+        self.sampler = ProcessSampler(self.pid, interval=self.config.get('advanced.sample_interval', 2))
+        if not self.sampler.start():
+            self.sampler = None
+
+    def get_resource_stats(self, seconds: float = 60) -> dict:
+        """
+        获取最近一段时间的资源占用统计
+
+        Args:
+            seconds: 时间窗口（秒）
+
+        Returns:
+            {指标: {'min', 'max', 'avg'}}，未采样返回空字典
+        """
+        if not self.sampler:
+            return {}
+        return self.sampler.window(seconds)
+
+    def benchmark(
+        self,
+        path: str = '/',
+        rate: float = 0,
+        concurrency: int = 8,
+        duration: float = 10,
+        output: Optional[str] = None
+    ) -> Optional[dict]:
+        """
+        压测运行中的网关
+
+        Args:
+            path: 请求路径
+            rate: 每秒请求数（0表示不限速）
+            concurrency: 并发连接数
+            duration: 压测时长（秒）
+            output: 结果JSON文件路径（None则保存到应用数据目录/benchmarks）
+
+        Returns:
+            压测结果（见LoadGenerator.run），网关未运行返回None
+        """
+        if not self.check_running():
+            self.logger.warning("OpenClaw未运行，无法压测")
+            return None
+
+        result = LoadGenerator(
+            f"http://127.0.0.1:{self.port}{path}",
+            rate=rate,
+            concurrency=concurrency,
+            duration=duration
+        ).run()
+        result['output'] = save_result(result, output)
+        self.logger.info(
+            f"压测完成: {result['throughput']}/s, p50 {result['latency_ms']['p50']}ms, "
+            f"p99 {result['latency_ms']['p99']}ms"
+        )
+        return result
+
     def open_webui(
         self,
         url: Optional[str] = None,
@@ -273,7 +797,7 @@ class Manager:
         if not self.is_running:
             return False
 
-        if self.process and self.process.poll() is None:
+        if self._process_alive():
             return True
 
         # 进程已退出
@@ -292,24 +816,25 @@ class Manager:
         """
         self.logger.info(f"获取OpenClaw日志 (最近{lines}行)...")
 
+        # 网关直接写入日志文件（包括接管的网关），从文件末尾读取
         try:
-            result = subprocess.run(
-                ['openclaw-cn', 'gateway', 'status'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0:
-                return result.stdout
-            else:
-                self.logger.warning(f"获取日志失败: {result.stderr}")
-                return None
-
+            return '\n'.join(tail_lines(self.log_path, lines))
         except Exception as e:
             self.logger.error(f"获取日志失败: {e}")
             return None
 
+    def follow_logs(self, stop_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        跟踪OpenClaw日志新增的行
+
+        Args:
+            stop_event: 设置后停止跟踪
+
+        Yields:
+            新增的日志行
+        """
+        return follow(self.log_path, stop_event=stop_event)
+
     def _log_callback(
         self,
         callback: Optional[Callable[[str], None]],
@@ -0,0 +1,335 @@
+"""
+Node.js运行时调优
+根据CPU核数、物理内存和cgroup的内存/CPU限制计算网关进程的--max-old-space-size、UV_THREADPOOL_SIZE等参数，
+配置 advanced.* 中的非零值优先
+"""
+
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+from typing import Optional, Dict, Any, List, Set
+from utils.logger import get_logger
+from utils.platform import Platform
+from .config import Config
+
+# cgroup v1中表示不限制内存的值（接近2^63，按页对齐）
+CGROUP_V1_UNLIMITED = 1 << 62
+
+
+def _read_text(path: str) -> Optional[str]:
+    """读取文件内容，失败返回None"""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_paths() -> Dict[str, str]:
+    """从/proc/self/cgroup读取各控制器的cgroup路径（v2的键为空字符串）"""
+    paths = {}
+    content = _read_text('/proc/self/cgroup') or ''
+    for line in content.splitlines():
+        parts = line.split(':', 2)
+        if len(parts) != 3:
+            continue
+        for controller in parts[1].split(',') if parts[1] else ['']:
+            paths[controller] = parts[2]
+    return paths
+
+
+def _cgroup_file(controller_dir: str, cgroup_path: str, name: str) -> Optional[str]:
+    """读取cgroup文件：先找进程所在的cgroup，容器内路径不可见时回退到挂载点根目录"""
+    for directory in (os.path.join(controller_dir, cgroup_path.lstrip('/')), controller_dir):
+        value = _read_text(os.path.join(directory, name))
+        if value is not None:
+            return value
+    return None
+
+
+def read_cgroup_limits() -> Dict[str, Optional[float]]:
+    """
+    读取cgroup的内存和CPU限制（仅Linux，同时支持v1和v2）
+
+    Returns:
+        {'memory': 内存上限字节数, 'cpu': 可用CPU核数}，未限制的项为None
+    """
+    limits = {'memory': None, 'cpu': None}
+    if not Platform.is_linux():
+        return limits
+
+    paths = _cgroup_paths()
+    root = '/sys/fs/cgroup'
+
+    if '' in paths and os.path.exists(os.path.join(root, 'cgroup.controllers')):
+        # cgroup v2
+        memory = _cgroup_file(root, paths[''], 'memory.max')
+        if memory and memory != 'max':
+            limits['memory'] = float(memory)
+        cpu = _cgroup_file(root, paths[''], 'cpu.max')
+        if cpu:
+            quota, _, period = cpu.partition(' ')
+            if quota != 'max' and period:
+                limits['cpu'] = int(quota) / int(period)
+        return limits
+
+    # cgroup v1
+    memory = _cgroup_file(os.path.join(root, 'memory'), paths.get('memory', '/'), 'memory.limit_in_bytes')
+    if memory and int(memory) < CGROUP_V1_UNLIMITED:
+        limits['memory'] = float(memory)
+
+    cpu_path = paths.get('cpu', '/')
+    quota = _cgroup_file(os.path.join(root, 'cpu'), cpu_path, 'cpu.cfs_quota_us')
+    period = _cgroup_file(os.path.join(root, 'cpu'), cpu_path, 'cpu.cfs_period_us')
+    if quota and period and int(quota) > 0 and int(period) > 0:
+        limits['cpu'] = int(quota) / int(period)
+    return limits
+
+
+def total_memory() -> Optional[int]:
+    """物理内存字节数，无法获取返回None"""
+    if Platform.is_windows():
+        import ctypes
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.c_ulong),
+                ('dwMemoryLoad', ctypes.c_ulong),
+                ('ullTotalPhys', ctypes.c_ulonglong),
+                ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong),
+                ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong),
+                ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('ullAvailExtendedVirtual', ctypes.c_ulonglong)
+            ]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+        return None
+
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def cpu_count() -> int:
+    """本进程可用的CPU核数（考虑CPU亲和性）"""
+    if hasattr(os, 'sched_getaffinity'):
+        try:
+            return len(os.sched_getaffinity(0))
+        except OSError:
+            pass
+    return os.cpu_count() or 1
+
+
+# 已查询过的Node可执行文件 -> 允许在NODE_OPTIONS中使用的选项
+_allowed_options_cache: Dict[tuple, Dict[str, bool]] = {}
+
+
+def allowed_node_options(options: List[str]) -> Set[str]:
+    """
+    查询当前Node允许在NODE_OPTIONS中使用的选项（process.allowedNodeEnvironmentFlags）
+
+    结果按node可执行文件的真实路径和mtime缓存，同一个Node只启动一次子进程。
+
+    Args:
+        options: 选项名列表（如 '--max-old-space-size'）
+
+    Returns:
+        允许的选项集合，找不到node或查询失败返回空集合
+    """
+    node = shutil.which('node')
+    if not node:
+        return set()
+    try:
+        real_path = os.path.realpath(node)
+        key = (real_path, os.stat(real_path).st_mtime_ns)
+    except OSError:
+        return set()
+
+    cached = _allowed_options_cache.setdefault(key, {})
+    missing = [o for o in options if o not in cached]
+    if missing:
+        script = (
+            "console.log(JSON.stringify(process.argv.slice(1)"
+            ".map(f => process.allowedNodeEnvironmentFlags.has(f))))"
+        )
+        try:
+            # '--'之后的参数不会被node当作自身的选项解析
+            result = subprocess.run(
+                [node, '-e', script, '--', *missing],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            flags = json.loads(result.stdout)
+        except (OSError, subprocess.TimeoutExpired, ValueError):
+            return set()
+        if result.returncode != 0 or len(flags) != len(missing):
+            return set()
+        cached.update(zip(missing, flags))
+    return {o for o in options if cached.get(o)}
+
+
+class NodeTuning:
+    """Node.js运行时调优类"""
+
+    # 堆上限占可用内存（或看门狗内存阈值）的比例，其余留给代码、缓冲区和原生内存
+    HEAP_RATIO = 0.75
+    MIN_HEAP_MB = 256
+    # 堆上限的绝对上限：更大的堆只会推迟GC、增加RSS，单个网关用不到
+    MAX_HEAP_MB = 4096
+
+    # libuv线程池大小范围（默认4）
+    MIN_THREADPOOL = 4
+    MAX_THREADPOOL = 64
+
+    def __init__(self, config: Optional[Config] = None, instances: int = 1):
+        """
+        初始化调优
+
+        Args:
+            config: 配置实例（advanced.node_tuning、node_max_old_space_mb、uv_threadpool_size、
+                    node_semi_space_mb、node_extra_options）
+            instances: 共享本机资源的网关实例数（实例池中每个实例按份额计算）
+        """
+        self.logger = get_logger()
+        if config is None:
+            config = Config()
+            config.load()
+        self.config = config
+        self.instances = max(1, instances)
+        # 看门狗的内存阈值（MB），由启用看门狗的一方在启动网关前设置；为None时不按其限制堆上限
+        self.rss_limit_mb: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get('advanced.node_tuning', False))
+
+    def resources(self) -> Dict[str, Any]:
+        """
+        检测可用资源
+
+        Returns:
+            {'cpus', 'memory'（字节）, 'cgroup_cpu', 'cgroup_memory'}，memory已取物理内存和cgroup限制中的较小值
+        """
+        limits = read_cgroup_limits()
+        cpus = cpu_count()
+        if limits['cpu']:
+            cpus = min(cpus, max(1, math.ceil(limits['cpu'])))
+
+        memory = total_memory()
+        if limits['memory']:
+            memory = min(memory, limits['memory']) if memory else limits['memory']
+
+        return {
+            'cpus': cpus,
+            'memory': int(memory) if memory else None,
+            'cgroup_cpu': limits['cpu'],
+            'cgroup_memory': limits['memory']
+        }
+
+    def compute(self) -> Dict[str, Any]:
+        """
+        计算调优参数（配置中的非零值覆盖自动计算的值）
+
+        Returns:
+            {'max_old_space_mb', 'uv_threadpool_size', 'semi_space_mb'（None为使用Node默认值）,
+             'extra_options', 'resources', 'overrides'（来自配置的项）}
+        """
+        resources = self.resources()
+        cpus = max(1, resources['cpus'] // self.instances)
+
+        heap = semi = None
+        if resources['memory']:
+            share_mb = resources['memory'] / (1024 * 1024) / self.instances
+            # 看门狗按进程树RSS重启网关，堆上限要低于该阈值，V8才会在被重启之前先回收
+            if self.rss_limit_mb:
+                share_mb = min(share_mb, self.rss_limit_mb)
+            heap = min(self.MAX_HEAP_MB, max(self.MIN_HEAP_MB, int(share_mb * self.HEAP_RATIO)))
+            # 新生代加大后Scavenge次数减少，内存充足时提升分配密集场景的吞吐
+            if share_mb >= 2048:
+                semi = 32
+
+        profile = {
+            'max_old_space_mb': heap,
+            'uv_threadpool_size': min(self.MAX_THREADPOOL, max(self.MIN_THREADPOOL, cpus)),
+            'semi_space_mb': semi,
+            'extra_options': '',
+            'resources': resources,
+            'overrides': []
+        }
+
+        overrides = {
+            'max_old_space_mb': 'advanced.node_max_old_space_mb',
+            'uv_threadpool_size': 'advanced.uv_threadpool_size',
+            'semi_space_mb': 'advanced.node_semi_space_mb',
+            'extra_options': 'advanced.node_extra_options'
+        }
+        for field, key in overrides.items():
+            value = self.config.get(key)
+            if value:
+                profile[field] = value
+                profile['overrides'].append(field)
+        return profile
+
+    def apply(self, env: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        把调优参数写入子进程环境变量
+
+        环境中已有的同名设置（用户自己设置的NODE_OPTIONS或UV_THREADPOOL_SIZE）保持不变。
+
+        Args:
+            env: 子进程环境变量（原地修改）
+
+        Returns:
+            实际生效的参数（同compute，另有'node_options'），未启用返回None
+        """
+        if not self.enabled:
+            return None
+
+        profile = self.compute()
+        existing = env.get('NODE_OPTIONS', '')
+        options = []
+
+        if profile['max_old_space_mb'] and not re.search(r'--max[-_]old[-_]space[-_]size', existing):
+            options.append(f"--max-old-space-size={int(profile['max_old_space_mb'])}")
+        if profile['semi_space_mb'] and not re.search(r'--max[-_]semi[-_]space[-_]size', existing):
+            options.append(f"--max-semi-space-size={int(profile['semi_space_mb'])}")
+        if profile['extra_options']:
+            options.extend(str(profile['extra_options']).split())
+
+        # 与性能分析选项一样，只传当前Node允许在NODE_OPTIONS中使用的选项，否则Node拒绝启动
+        names = [o.split('=', 1)[0] for o in options if o.startswith('--')]
+        allowed = allowed_node_options(names) if names else set()
+        rejected = [o for o in options if o.startswith('--') and o.split('=', 1)[0] not in allowed]
+        if rejected:
+            self.logger.warning(f"当前Node不允许在NODE_OPTIONS中使用，已忽略: {' '.join(rejected)}")
+            options = [o for o in options if o not in rejected]
+
+        if 'UV_THREADPOOL_SIZE' in env:
+            profile['uv_threadpool_size'] = int(env['UV_THREADPOOL_SIZE'])
+        else:
+            env['UV_THREADPOOL_SIZE'] = str(int(profile['uv_threadpool_size']))
+
+        env['NODE_OPTIONS'] = ' '.join(filter(None, [existing, *options]))
+        profile['node_options'] = ' '.join(options)
+        self.logger.info(
+            f"Node调优: 堆上限 {profile['max_old_space_mb']}MB, 线程池 {profile['uv_threadpool_size']}, "
+            f"新生代 {profile['semi_space_mb'] or '默认'}MB (CPU {profile['resources']['cpus']}核)"
+        )
+        return profile
+
+
+# 测试代码
+if __name__ == '__main__':
+    tuning = NodeTuning()
+    print(f"cgroup限制: {read_cgroup_limits()}")
+    print(f"调优参数: {tuning.compute()}")
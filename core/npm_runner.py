@@ -0,0 +1,258 @@
+"""
+npm命令执行器
+逐行读取npm输出并解析为进度事件，用“无进度超时”代替固定的总超时
+"""
+
+import queue
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Optional, Callable, List
+from utils.logger import get_logger
+
+
+class NpmProgress:
+    """npm执行进度"""
+
+    # 阶段名称
+    PHASE_STARTING = "启动"
+    PHASE_RESOLVING = "解析依赖"
+    PHASE_FETCHING = "下载包"
+    PHASE_LINKING = "安装包"
+    PHASE_DONE = "完成"
+
+    # npm http日志: npm http fetch GET 200 https://registry.npmjs.org/xxx 123ms (cache miss)
+    HTTP_RE = re.compile(r'^npm http fetch (\w+) (\d+) (\S+) (\d+)ms(?: \((cache [\w ]+)\))?')
+    # npm silly/timing日志中的阶段信息
+    PHASE_RE = re.compile(r'^npm (?:silly|timing) (idealTree|reify|build|ADD)\b')
+    # 结果摘要: added 12 packages in 3s / changed 1 package in 2s
+    SUMMARY_RE = re.compile(r'^(?:added|changed|removed) (\d+) packages?')
+
+    def __init__(self):
+        self.phase = self.PHASE_STARTING
+        self.requests = 0
+        self.packuments = 0
+        self.tarballs = 0
+        self.cache_hits = 0
+        self.packages = None
+        self.errors = 0
+
+    def feed(self, line: str) -> bool:
+        """
+        解析一行npm输出
+
+        Args:
+            line: 输出行
+
+        Returns:
+            该行是否代表新的进度
+        """
+        line = line.strip()
+        if not line:
+            return False
+
+        match = self.HTTP_RE.match(line)
+        if match:
+            url = match.group(3)
+            cache = match.group(5) or ''
+            self.requests += 1
+            if cache.endswith('hit') or 'revalidated' in cache:
+                self.cache_hits += 1
+            if url.endswith('.tgz'):
+                self.tarballs += 1
+                self.phase = self.PHASE_FETCHING
+            else:
+                self.packuments += 1
+                if self.phase == self.PHASE_STARTING:
+                    self.phase = self.PHASE_RESOLVING
+            return True
+
+        match = self.PHASE_RE.match(line)
+        if match:
+            name = match.group(1)
+            if name == 'idealTree':
+                self.phase = self.PHASE_RESOLVING
+            elif name == 'ADD' and self.phase != self.PHASE_LINKING:
+                self.phase = self.PHASE_FETCHING
+            else:
+                self.phase = self.PHASE_LINKING
+            return True
+
+        match = self.SUMMARY_RE.match(line)
+        if match:
+            self.packages = int(match.group(1))
+            self.phase = self.PHASE_DONE
+            return True
+
+        if line.startswith('npm error') or line.startswith('npm ERR!'):
+            self.errors += 1
+
+        return False
+
+    def describe(self) -> str:
+        """进度描述文本"""
+        if self.phase == self.PHASE_DONE and self.packages is not None:
+            return f"{self.phase}，共 {self.packages} 个包"
+        parts = [self.phase]
+        if self.packuments:
+            parts.append(f"元数据 {self.packuments}")
+        if self.tarballs:
+            parts.append(f"已下载 {self.tarballs} 个包")
+        if self.cache_hits:
+            parts.append(f"缓存命中 {self.cache_hits}")
+        return "，".join(parts)
+
+
+class NpmResult:
+    """npm执行结果"""
+
+    # 网络类错误（换一个仓库可能成功）
+    NETWORK_ERROR_RE = re.compile(
+        r'ETIMEDOUT|ECONNRESET|ECONNREFUSED|ENOTFOUND|EAI_AGAIN|ENETUNREACH|'
+        r'EHOSTUNREACH|ERR_SOCKET_TIMEOUT|EINTEGRITY|network|\b5\d\d\b'
+    )
+
+    def __init__(self, returncode: Optional[int], stalled: bool, output: List[str], progress: NpmProgress):
+        self.returncode = returncode
+        self.stalled = stalled
+        self.output = output
+        self.progress = progress
+
+    @property
+    def ok(self) -> bool:
+        """是否执行成功"""
+        return self.returncode == 0 and not self.stalled
+
+    @property
+    def network_error(self) -> bool:
+        """是否因网络问题失败（包括卡住）"""
+        if self.ok:
+            return False
+        if self.stalled:
+            return True
+        return any(self.NETWORK_ERROR_RE.search(line) for line in self.output
+                   if line.startswith('npm error') or line.startswith('npm ERR!'))
+
+    @property
+    def tail(self) -> str:
+        """最近的输出文本"""
+        return '\n'.join(self.output)
+
+
+class NpmRunner:
+    """流式npm命令执行器"""
+
+    def __init__(self, stall_timeout: float = 120, tail_lines: int = 200):
+        """
+        初始化执行器
+
+        Args:
+            stall_timeout: 无进度超时（秒），超过该时间没有任何输出则终止npm
+            tail_lines: 保留的最近输出行数
+        """
+        self.logger = get_logger()
+        self.stall_timeout = stall_timeout
+        self.tail_lines = tail_lines
+
+    def run(
+        self,
+        cmd: List[str],
+        progress_callback: Optional[Callable[[NpmProgress], None]] = None
+    ) -> NpmResult:
+        """
+        执行npm命令并流式解析输出
+
+        Args:
+            cmd: 命令列表
+            progress_callback: 进度回调 callback(progress)，每次有新进度时调用
+
+        Returns:
+            执行结果
+
+        Raises:
+            FileNotFoundError: npm不存在
+        """
+        progress = NpmProgress()
+        output = deque(maxlen=self.tail_lines)
+        lines = queue.Queue()
+
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1
+        )
+
+        def reader(stream):
+            try:
+                for line in iter(stream.readline, ''):
+                    lines.put(line)
+            finally:
+                stream.close()
+                lines.put(None)
+
+        readers = [
+            threading.Thread(target=reader, args=(process.stdout,), daemon=True),
+            threading.Thread(target=reader, args=(process.stderr,), daemon=True)
+        ]
+        for t in readers:
+            t.start()
+
+        stalled = False
+        open_streams = len(readers)
+        last_progress = time.monotonic()
+
+        while open_streams:
+            remaining = self.stall_timeout - (time.monotonic() - last_progress)
+            if remaining <= 0:
+                stalled = True
+                break
+
+            try:
+                line = lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+
+            if line is None:
+                open_streams -= 1
+                continue
+
+            line = line.rstrip('\n')
+            output.append(line)
+            self.logger.debug(f"npm: {line}")
+
+            # 任何输出（包括警告、verbose信息）都说明npm仍在工作
+            last_progress = time.monotonic()
+
+            if progress.feed(line) and progress_callback:
+                try:
+                    progress_callback(progress)
+                except Exception as e:
+                    self.logger.warning(f"进度回调失败: {e}")
+
+        if stalled:
+            self.logger.error(f"npm 已 {self.stall_timeout:.0f} 秒无进度，终止执行")
+            process.kill()
+
+        returncode = process.wait()
+        for t in readers:
+            t.join(timeout=1)
+
+        return NpmResult(returncode, stalled, list(output), progress)
+
+
+# 测试代码
+if __name__ == '__main__':
+    runner = NpmRunner(stall_timeout=30)
+    result = runner.run(
+        ['npm', 'view', 'openclaw', 'version', '--loglevel=http'],
+        lambda p: print(f"进度: {p.describe()}")
+    )
+    print(f"返回码: {result.returncode}, 停滞: {result.stalled}")
+    print(result.tail)
@@ -0,0 +1,408 @@
+"""
+OpenClaw包信息
+不启动子进程，直接从磁盘读取已安装版本；带ETag缓存地查询仓库最新版本
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import Optional, Tuple, Dict, List, Set
+from urllib.parse import quote
+from utils.logger import get_logger
+from utils.platform import Platform
+from utils.downloader import Downloader
+
+
+def find_package_json(
+    package: str = 'openclaw',
+    prefix: Optional[str] = None,
+    binary: str = 'openclaw-cn'
+) -> Optional[str]:
+    """
+    查找已安装包的package.json
+
+    依次尝试:
+    1. npm前缀下的全局node_modules（Windows为<prefix>/node_modules，其他为<prefix>/lib/node_modules）
+    2. 从命令的真实路径向上查找name匹配的package.json
+
+    Args:
+        package: 包名
+        prefix: npm安装前缀（None则跳过第1步）
+        binary: 包提供的命令名
+
+    Returns:
+        package.json路径，未找到返回None
+    """
+    if prefix:
+        for sub in (('node_modules',), ('lib', 'node_modules')):
+            path = os.path.join(prefix, *sub, package, 'package.json')
+            if os.path.isfile(path):
+                return path
+
+    binary_path = shutil.which(binary)
+    if not binary_path:
+        return None
+
+    directory = os.path.dirname(os.path.realpath(binary_path))
+    candidates = [directory]
+
+    # Windows的命令是node_modules旁边的.cmd包装脚本
+    candidates.append(os.path.join(directory, 'node_modules', package))
+
+    for start in candidates:
+        current = start
+        while True:
+            path = os.path.join(current, 'package.json')
+            if os.path.isfile(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        if json.load(f).get('name') == package:
+                            return path
+                except Exception:
+                    pass
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+
+    return None
+
+
+def read_installed_version(
+    package: str = 'openclaw',
+    prefix: Optional[str] = None,
+    binary: str = 'openclaw-cn'
+) -> Optional[str]:
+    """
+    读取已安装包的版本（直接读package.json，不启动子进程）
+
+    Args:
+        package: 包名
+        prefix: npm安装前缀
+        binary: 包提供的命令名
+
+    Returns:
+        版本号，未安装返回None
+    """
+    path = find_package_json(package, prefix, binary)
+    if not path:
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('version')
+    except Exception as e:
+        get_logger().debug(f"读取package.json失败: {e}")
+        return None
+
+
+# (命令真实路径, mtime_ns, 子命令) -> 帮助信息中列出的选项
+_cli_options_cache: Dict[tuple, Set[str]] = {}
+
+
+def cli_options(args: List[str], binary: str = 'openclaw-cn') -> Optional[Set[str]]:
+    """
+    读取 `<binary> <args...> --help` 列出的选项
+
+    结果按命令的真实路径和mtime缓存，重新安装后才会重新执行。
+
+    Args:
+        args: 子命令（如 ['gateway', 'start']）
+        binary: 命令名
+
+    Returns:
+        选项集合（如 {'--port', '--help'}），命令不存在或执行失败返回None
+    """
+    found = shutil.which(binary)
+    if not found:
+        return None
+    try:
+        real_path = os.path.realpath(found)
+        key = (real_path, os.stat(real_path).st_mtime_ns, tuple(args))
+    except OSError:
+        return None
+
+    if key not in _cli_options_cache:
+        try:
+            result = subprocess.run(
+                [found, *args, '--help'],
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                timeout=10
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            get_logger().debug(f"读取命令帮助失败: {e}")
+            return None
+        if result.returncode != 0:
+            return None
+        _cli_options_cache[key] = set(re.findall(r'(?<![\w-])(--[A-Za-z][\w-]*)', result.stdout + result.stderr))
+    return _cli_options_cache[key]
+
+
+class LatestVersionCache:
+    """仓库dist-tags缓存（ETag条件请求）"""
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        max_age: float = 300,
+        downloader: Optional[Downloader] = None
+    ):
+        """
+        初始化缓存
+
+        Args:
+            cache_path: 缓存文件路径（默认为应用数据目录/dist_tags.json）
+            max_age: 缓存新鲜期（秒），期内直接使用缓存，不发请求
+            downloader: 下载器实例
+        """
+        self.logger = get_logger()
+
+        if cache_path is None:
+            cache_path = os.path.join(Platform.get_app_dir(), 'dist_tags.json')
+
+        self.cache_path = cache_path
+        self.max_age = max_age
+        self.downloader = downloader or Downloader()
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            self.logger.debug(f"加载dist-tags缓存失败: {e}")
+        return {}
+
+    def _save(self, entries: dict):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            self.logger.debug(f"保存dist-tags缓存失败: {e}")
+
+    def get_dist_tags(self, package: str, registry: str, timeout: float = 5) -> Optional[dict]:
+        """
+        获取包的dist-tags
+
+        新鲜期内直接返回缓存；过期后带ETag发条件请求，304时沿用缓存。
+
+        Args:
+            package: 包名
+            registry: 仓库地址
+            timeout: 请求超时（秒）
+
+        Returns:
+            dist-tags字典（如{'latest': '1.2.3'}），失败且无缓存时返回None
+        """
+        url = f"{registry.rstrip('/')}/-/package/{quote(package, safe='@')}/dist-tags"
+
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(url)
+
+            if entry and time.time() - entry.get('fetched', 0) < self.max_age:
+                return entry.get('tags')
+
+            status, data, etag = self.downloader.download_json_conditional(
+                url, entry.get('etag') if entry else None, timeout=timeout
+            )
+
+            if status == 304 and entry:
+                entry['fetched'] = time.time()
+                self.logger.debug(f"dist-tags未变化 (304): {package}")
+            elif status == 200 and isinstance(data, dict):
+                entry = {'tags': data, 'etag': etag, 'fetched': time.time()}
+                entries[url] = entry
+            else:
+                # 请求失败时沿用过期缓存
+                return entry.get('tags') if entry else None
+
+            self._save(entries)
+            return entry.get('tags')
+
+    def get_latest(self, package: str, registry: str, timeout: float = 5) -> Optional[str]:
+        """获取包的latest版本"""
+        tags = self.get_dist_tags(package, registry, timeout)
+        return tags.get('latest') if tags else None
+
+    def invalidate(self):
+        """清空缓存"""
+        with self._lock:
+            self._save({})
+
+
+class InstalledVersionCache:
+    """
+    已安装版本缓存
+
+    以命令的真实路径、mtime、大小和package.json内容摘要为键，键不变时直接返回缓存的版本（不启动子进程）。
+    重新安装会替换命令文件，键随之变化；安装/更新后也会显式调用invalidate()。
+    """
+
+    def __init__(
+        self,
+        package: str = 'openclaw',
+        binary: str = 'openclaw-cn',
+        cache_path: Optional[str] = None
+    ):
+        """
+        初始化缓存
+
+        Args:
+            package: 包名
+            binary: 包提供的命令名
+            cache_path: 缓存文件路径（默认为应用数据目录/installed_version.json）
+        """
+        self.logger = get_logger()
+        self.package = package
+        self.binary = binary
+
+        if cache_path is None:
+            cache_path = os.path.join(Platform.get_app_dir(), 'installed_version.json')
+
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+
+        # (PATH, 命令真实路径, package.json路径)，PATH不变时无需重新查找
+        self._resolved: Optional[Tuple[str, str, Optional[str]]] = None
+        self._key: Optional[list] = None
+        self._version: Optional[str] = None
+        self._loaded = False
+
+    def _binary_key(self) -> Optional[list]:
+        """
+        计算键 [命令真实路径, mtime_ns, size, package.json的SHA-1]，未安装返回None
+
+        npm解压时会统一文件的mtime，在安装器之外升级（npm i -g）后命令文件的stat可能不变，
+        因此键中包含package.json内容的摘要（只读一个小文件，不启动子进程）。
+        """
+        env_path = os.environ.get('PATH', '')
+        if self._resolved and self._resolved[0] == env_path:
+            real_path, package_json = self._resolved[1], self._resolved[2]
+        else:
+            found = shutil.which(self.binary)
+            if not found:
+                self._resolved = None
+                return None
+            real_path = os.path.realpath(found)
+            package_json = find_package_json(self.package, binary=self.binary)
+            self._resolved = (env_path, real_path, package_json)
+
+        try:
+            st = os.stat(real_path)
+            digest = None
+            if package_json:
+                with open(package_json, 'rb') as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            # 命令或package.json被删除或移动，下次重新查找
+            self._resolved = None
+            return None
+        return [real_path, st.st_mtime_ns, st.st_size, digest]
+
+    def _load(self):
+        """加载持久化的缓存（每个实例只加载一次）"""
+        self._loaded = True
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._key = data.get('key')
+                self._version = data.get('version')
+        except Exception as e:
+            self.logger.debug(f"加载版本缓存失败: {e}")
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': self._key, 'version': self._version}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            self.logger.debug(f"保存版本缓存失败: {e}")
+
+    def _resolve_version(self) -> Optional[str]:
+        """读取版本：优先package.json，找不到时才执行 <binary> --version"""
+        version = read_installed_version(self.package, binary=self.binary)
+        if version:
+            return version
+        try:
+            result = subprocess.run(
+                [self.binary, '--version'],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0:
+                return result.stdout.strip()
+        except Exception as e:
+            self.logger.debug(f"获取版本失败: {e}")
+        return None
+
+    def get(self) -> Optional[str]:
+        """
+        获取已安装版本
+
+        Returns:
+            版本号，未安装返回None
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+            key = self._binary_key()
+            if key is None:
+                return None
+            if key == self._key:
+                return self._version
+
+            self._version = self._resolve_version()
+            self._key = key
+            self._save()
+            return self._version
+
+    def invalidate(self):
+        """清空缓存（安装、更新、卸载后调用）"""
+        with self._lock:
+            self._resolved = None
+            self._key = None
+            self._version = None
+            self._loaded = True
+            try:
+                os.remove(self.cache_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.debug(f"删除版本缓存失败: {e}")
+
+
+# 全局已安装版本缓存
+_installed_version_cache = None
+
+
+def get_installed_version_cache() -> InstalledVersionCache:
+    """获取全局已安装版本缓存"""
+    global _installed_version_cache
+    if _installed_version_cache is None:
+        _installed_version_cache = InstalledVersionCache()
+    return _installed_version_cache
+
+
+# 测试代码
+if __name__ == '__main__':
+    print(f"package.json: {find_package_json()}")
+    print(f"已安装版本: {read_installed_version()}")
+    print(f"已安装版本（缓存）: {get_installed_version_cache().get()}")
+    print(f"最新版本: {LatestVersionCache().get_latest('openclaw', 'https://registry.npmjs.org/')}")
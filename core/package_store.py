@@ -0,0 +1,584 @@
+"""
+本地包仓库
+按npm integrity哈希保存openclaw及其依赖的tarball，支持离线和重复安装
+"""
+
+import base64
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Callable, Dict, Tuple, Iterator
+from urllib.parse import quote, unquote
+from utils.logger import get_logger
+from utils.platform import Platform
+from utils.downloader import Downloader
+from utils import semver
+
+
+class PackageStore:
+    """内容寻址的本地npm包仓库"""
+
+    # 请求精简版packument，体积远小于完整元数据
+    ABBREVIATED_ACCEPT = 'application/vnd.npm.install-v1+json; q=1.0, application/json; q=0.8, */*'
+
+    # 安装所需的manifest字段
+    MANIFEST_FIELDS = (
+        'name', 'version', 'dependencies', 'optionalDependencies',
+        'peerDependencies', 'peerDependenciesMeta', 'bin', 'directories',
+        'engines', 'os', 'cpu', 'dist', 'deprecated', 'hasInstallScript',
+        'bundleDependencies', 'bundledDependencies'
+    )
+
+    # 按强度排序的哈希算法
+    ALGORITHMS = ('sha512', 'sha384', 'sha256', 'sha1')
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        registry: str = 'https://registry.npmjs.org/',
+        downloader: Optional[Downloader] = None,
+        max_workers: int = 8,
+        timeout: float = 30
+    ):
+        """
+        初始化本地包仓库
+
+        Args:
+            root: 仓库目录（默认为应用数据目录/store）
+            registry: 上游npm仓库地址
+            downloader: 下载器实例
+            max_workers: 最大并发下载数
+            timeout: 单个请求超时（秒）
+        """
+        self.logger = get_logger()
+
+        if root is None:
+            root = os.path.join(Platform.get_app_dir(), 'store')
+
+        self.root = root
+        self.registry = registry.rstrip('/') + '/'
+        self.downloader = downloader or Downloader()
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        self.index_path = os.path.join(root, 'index.json')
+        self.snapshot_dir = os.path.join(root, 'snapshots')
+        self.tmp_dir = os.path.join(root, 'tmp')
+
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    # ==================== 内容寻址 ====================
+
+    @classmethod
+    def parse_integrity(cls, integrity: str) -> Optional[Tuple[str, str]]:
+        """
+        解析npm integrity字符串，取最强的哈希
+
+        Args:
+            integrity: SRI字符串（如'sha512-xxx'，可能包含多个哈希）
+
+        Returns:
+            (算法, 十六进制摘要)，无法解析返回None
+        """
+        hashes = {}
+        for item in (integrity or '').split():
+            algo, _, digest = item.partition('-')
+            if algo in cls.ALGORITHMS and digest:
+                try:
+                    hashes[algo] = base64.b64decode(digest.split('?')[0]).hex()
+                except ValueError:
+                    continue
+        for algo in cls.ALGORITHMS:
+            if algo in hashes:
+                return algo, hashes[algo]
+        return None
+
+    @staticmethod
+    def _dist_integrity(dist: dict) -> Optional[str]:
+        """获取dist中的integrity（旧包只有sha1 shasum）"""
+        if dist.get('integrity'):
+            return dist['integrity']
+        if dist.get('shasum'):
+            return 'sha1-' + base64.b64encode(bytes.fromhex(dist['shasum'])).decode('ascii')
+        return None
+
+    def content_path(self, integrity: str) -> Optional[str]:
+        """
+        获取integrity对应的tarball存储路径
+
+        Args:
+            integrity: SRI字符串
+
+        Returns:
+            存储路径，integrity无效返回None
+        """
+        parsed = self.parse_integrity(integrity)
+        if not parsed:
+            return None
+        algo, digest = parsed
+        return os.path.join(self.root, 'content', algo, digest[:2], digest[2:4], digest)
+
+    def has(self, integrity: str) -> bool:
+        """仓库中是否已有该内容"""
+        path = self.content_path(integrity)
+        return bool(path) and os.path.exists(path)
+
+    def _verify(self, path: str, integrity: str) -> bool:
+        """校验文件哈希"""
+        algo, expected = self.parse_integrity(integrity)
+        h = hashlib.new(algo)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+        return h.hexdigest() == expected
+
+    # ==================== 索引 ====================
+
+    def _load_index(self) -> Dict[str, Dict[str, dict]]:
+        """加载索引 {包名: {版本: manifest}}"""
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"加载包仓库索引失败: {e}")
+        return {}
+
+    def _save_json(self, path: str, data):
+        """原子写入JSON文件"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    # ==================== 依赖解析 ====================
+
+    def fetch_packument(self, name: str) -> Optional[dict]:
+        """
+        获取包的元数据（精简版packument）
+
+        Args:
+            name: 包名
+
+        Returns:
+            packument，失败返回None
+        """
+        url = self.registry + quote(name, safe='@')
+        return self.downloader.download_json(
+            url,
+            headers={'Accept': self.ABBREVIATED_ACCEPT},
+            timeout=self.timeout
+        )
+
+    @staticmethod
+    def _pick_version(packument: dict, spec: str) -> Optional[str]:
+        """按npm规则选择版本：dist-tag > 满足范围的latest > 满足范围的最高版本"""
+        versions = packument.get('versions', {})
+        tags = packument.get('dist-tags', {})
+
+        if spec in tags:
+            return tags[spec]
+
+        latest = tags.get('latest')
+        if latest in versions and semver.satisfies(latest, spec):
+            return latest
+
+        return semver.max_satisfying(versions.keys(), spec)
+
+    @staticmethod
+    def _node_platform() -> Tuple[str, str]:
+        """当前平台对应的Node.js process.platform和process.arch"""
+        system = 'win32' if sys.platform.startswith('win') else sys.platform
+        machine = platform.machine().lower()
+        arch = {
+            'x86_64': 'x64', 'amd64': 'x64', 'aarch64': 'arm64',
+            'arm64': 'arm64', 'i386': 'ia32', 'i686': 'ia32', 'x86': 'ia32'
+        }.get(machine, machine)
+        return system, arch
+
+    @classmethod
+    def _platform_matches(cls, manifest: dict) -> bool:
+        """manifest的os/cpu限制是否与当前平台匹配"""
+        system, arch = cls._node_platform()
+        for field, value in (('os', system), ('cpu', arch)):
+            allowed = manifest.get(field)
+            if not allowed:
+                continue
+            if f"!{value}" in allowed:
+                return False
+            positives = [a for a in allowed if not a.startswith('!')]
+            if positives and value not in positives:
+                return False
+        return True
+
+    @staticmethod
+    def _parse_dependency(name: str, spec: str) -> Optional[Tuple[str, str]]:
+        """
+        解析依赖声明
+
+        Returns:
+            (真实包名, 版本范围)，git/url/file等非仓库依赖返回None
+        """
+        if spec.startswith('npm:'):
+            target = spec[4:]
+            at = target.rfind('@')
+            if at > 0:
+                return target[:at], target[at + 1:] or 'latest'
+            return target, 'latest'
+        if re.match(r'^(git\+|git:|https?:|file:|link:|github:)', spec) or '/' in spec:
+            return None
+        return name, spec or 'latest'
+
+    def _dependencies(self, manifest: dict) -> Iterator[Tuple[str, str, bool]]:
+        """遍历manifest的依赖 (包名, 范围, 是否可选)"""
+        optional = manifest.get('optionalDependencies') or {}
+        peer_meta = manifest.get('peerDependenciesMeta') or {}
+
+        for dep, spec in (manifest.get('dependencies') or {}).items():
+            yield dep, spec, dep in optional
+        for dep, spec in optional.items():
+            if dep not in (manifest.get('dependencies') or {}):
+                yield dep, spec, True
+        for dep, spec in (manifest.get('peerDependencies') or {}).items():
+            if not peer_meta.get(dep, {}).get('optional'):
+                yield dep, spec, False
+
+    def resolve_tree(self, name: str, spec: str = 'latest') -> Optional[Dict[str, dict]]:
+        """
+        解析包及其完整依赖树
+
+        按层并发获取packument，每个(包名, 范围)只解析一次。
+
+        Args:
+            name: 包名
+            spec: 版本范围或dist-tag
+
+        Returns:
+            {'包名@版本': manifest}，根包或任一非可选依赖解析失败返回None
+        """
+        packuments = {}
+        resolved = {}
+        seen = set()
+        pending = [(name, spec, False)]
+        skipped = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending:
+                missing = sorted({n for n, _, _ in pending if n not in packuments})
+                for pkg, packument in zip(missing, executor.map(self.fetch_packument, missing)):
+                    packuments[pkg] = packument
+
+                next_pending = []
+                for pkg, pkg_spec, optional in pending:
+                    if (pkg, pkg_spec) in seen:
+                        continue
+                    seen.add((pkg, pkg_spec))
+
+                    packument = packuments.get(pkg)
+                    version = self._pick_version(packument, pkg_spec) if packument else None
+                    if not version or version not in packument.get('versions', {}):
+                        if optional:
+                            continue
+                        self.logger.error(f"无法解析依赖: {pkg}@{pkg_spec}")
+                        if pkg == name:
+                            return None
+                        skipped.append(f"{pkg}@{pkg_spec}")
+                        continue
+
+                    key = f"{pkg}@{version}"
+                    if key in resolved:
+                        continue
+
+                    raw = packument['versions'][version]
+                    if optional and not self._platform_matches(raw):
+                        continue
+
+                    manifest = {k: raw[k] for k in self.MANIFEST_FIELDS if k in raw}
+                    resolved[key] = manifest
+
+                    # 打包在tarball内的依赖无需单独获取
+                    bundled = set(manifest.get('bundleDependencies') or manifest.get('bundledDependencies') or [])
+                    for dep, dep_spec, dep_optional in self._dependencies(manifest):
+                        if dep in bundled:
+                            continue
+                        parsed = self._parse_dependency(dep, dep_spec)
+                        if parsed is None:
+                            skipped.append(f"{dep}@{dep_spec}")
+                            continue
+                        next_pending.append((parsed[0], parsed[1], dep_optional))
+
+                pending = next_pending
+
+        # 非可选依赖缺失时本地仓库无法独立完成安装，不能作为离线快照
+        if skipped:
+            self.logger.warning(
+                f"以下依赖无法从仓库预取，不记录快照，安装时由npm在线获取: {', '.join(sorted(set(skipped)))}"
+            )
+            return None
+
+        return resolved
+
+    # ==================== 预取 ====================
+
+    def _fetch_tarball(self, manifest: dict) -> bool:
+        """下载单个tarball并按integrity校验后存入仓库"""
+        dist = manifest.get('dist', {})
+        integrity = self._dist_integrity(dist)
+        path = self.content_path(integrity) if integrity else None
+        if not path or not dist.get('tarball'):
+            self.logger.warning(f"缺少tarball信息: {manifest.get('name')}@{manifest.get('version')}")
+            return False
+
+        if os.path.exists(path):
+            return True
+
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(self.tmp_dir, f"{os.path.basename(path)}.{threading.get_ident()}")
+
+        if not self.downloader.download(dist['tarball'], tmp_path, timeout=self.timeout):
+            return False
+
+        if not self._verify(tmp_path, integrity):
+            self.logger.error(f"tarball校验失败: {dist['tarball']}")
+            os.remove(tmp_path)
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        return True
+
+    def prefetch(
+        self,
+        name: str,
+        spec: str = 'latest',
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Optional[str]:
+        """
+        预取包及其依赖树到本地仓库，并记录快照
+
+        已在仓库中的tarball不会重复下载。
+
+        Args:
+            name: 包名
+            spec: 版本范围或dist-tag
+            progress_callback: 进度回调 callback(完成数, 总数)
+
+        Returns:
+            解析出的根包版本，失败返回None
+        """
+        start = time.monotonic()
+        self.logger.info(f"解析依赖树: {name}@{spec}")
+
+        try:
+            tree = self.resolve_tree(name, spec)
+            if not tree:
+                return None
+
+            todo = [m for m in tree.values() if not self.has(self._dist_integrity(m.get('dist', {})) or '')]
+            self.logger.info(f"依赖树共 {len(tree)} 个包，需下载 {len(todo)} 个")
+
+            done = 0
+            failed = []
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for manifest, ok in zip(todo, executor.map(self._fetch_tarball, todo)):
+                    done += 1
+                    if not ok:
+                        failed.append(f"{manifest.get('name')}@{manifest.get('version')}")
+                    if progress_callback:
+                        try:
+                            progress_callback(done, len(todo))
+                        except Exception as e:
+                            self.logger.warning(f"进度回调失败: {e}")
+
+            if failed:
+                self.logger.error(f"{len(failed)} 个tarball下载失败: {', '.join(failed[:10])}")
+                return None
+
+            # 更新索引
+            with self._lock:
+                for manifest in tree.values():
+                    self._index.setdefault(manifest['name'], {})[manifest['version']] = manifest
+                self._save_json(self.index_path, self._index)
+
+            # 记录快照
+            root_version = next(m['version'] for k, m in tree.items() if m['name'] == name)
+            self._save_json(self._snapshot_path(name, root_version), {
+                'name': name,
+                'version': root_version,
+                'packages': sorted(tree),
+                'created': time.time()
+            })
+
+            self.logger.info(f"✓ 已预取 {name}@{root_version} ({time.monotonic() - start:.1f}s)")
+            return root_version
+
+        except Exception as e:
+            self.logger.error(f"预取失败: {e}")
+            return None
+
+    def _snapshot_path(self, name: str, version: str) -> str:
+        safe_name = name.replace('/', '+')
+        return os.path.join(self.snapshot_dir, f"{safe_name}@{version}.json")
+
+    def snapshot(self, name: str, version: Optional[str] = None) -> Optional[dict]:
+        """
+        获取包的完整快照（所有tarball都在仓库中）
+
+        Args:
+            name: 包名
+            version: 版本（None则取最新创建的快照）
+
+        Returns:
+            快照字典 {'name', 'version', 'packages', 'created'}，没有则返回None
+        """
+        if not os.path.isdir(self.snapshot_dir):
+            return None
+
+        prefix = name.replace('/', '+') + '@'
+        candidates = []
+        for filename in os.listdir(self.snapshot_dir):
+            if not filename.startswith(prefix) or not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.snapshot_dir, filename), 'r', encoding='utf-8') as f:
+                    snap = json.load(f)
+            except Exception:
+                continue
+            if version is None or snap.get('version') == version:
+                candidates.append(snap)
+
+        for snap in sorted(candidates, key=lambda s: s.get('created', 0), reverse=True):
+            if self._is_complete(snap):
+                return snap
+        return None
+
+    def _is_complete(self, snap: dict) -> bool:
+        """快照中的包是否都在仓库中"""
+        for key in snap.get('packages', []):
+            at = key.rfind('@')
+            manifest = self._index.get(key[:at], {}).get(key[at + 1:])
+            if not manifest or not self.has(self._dist_integrity(manifest.get('dist', {})) or ''):
+                return False
+        return True
+
+    # ==================== 本地仓库服务 ====================
+
+    def _build_packument(self, name: str, base_url: str) -> Optional[dict]:
+        """用仓库中已有的版本构建packument，tarball地址指向本地服务"""
+        versions = self._index.get(name)
+        if not versions:
+            return None
+
+        out = {}
+        for version, manifest in versions.items():
+            manifest = dict(manifest)
+            dist = dict(manifest.get('dist', {}))
+            integrity = self._dist_integrity(dist)
+            parsed = self.parse_integrity(integrity) if integrity else None
+            if not parsed:
+                continue
+            dist['tarball'] = f"{base_url}/-/store/{parsed[0]}/{parsed[1]}.tgz"
+            manifest['dist'] = dist
+            out[version] = manifest
+
+        if not out:
+            return None
+
+        parsed_versions = {v: semver.parse(v) for v in out}
+        stable = [v for v, p in parsed_versions.items() if p and not p[3]]
+        candidates = stable or [v for v, p in parsed_versions.items() if p] or list(out)
+        latest = candidates[0]
+        for v in candidates[1:]:
+            if parsed_versions[v] and parsed_versions[latest] and semver.compare(v, latest) > 0:
+                latest = v
+
+        return {'name': name, 'dist-tags': {'latest': latest}, 'versions': out}
+
+    @contextmanager
+    def serve(self, host: str = '127.0.0.1', port: int = 0) -> Iterator[str]:
+        """
+        以本地npm仓库的形式提供仓库内容
+
+        用法:
+            with store.serve() as registry_url:
+                npm install openclaw --registry registry_url
+
+        Args:
+            host: 监听地址
+            port: 监听端口（0表示自动分配）
+
+        Yields:
+            本地仓库URL
+        """
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = unquote(self.path.split('?')[0]).lstrip('/')
+                base_url = f"http://{self.headers.get('Host') or f'{host}:{server.server_port}'}"
+
+                if path.startswith('-/store/'):
+                    algo, _, filename = path[len('-/store/'):].partition('/')
+                    digest = filename[:-4] if filename.endswith('.tgz') else filename
+                    file_path = os.path.join(store.root, 'content', algo, digest[:2], digest[2:4], digest)
+                    if algo in store.ALGORITHMS and re.match(r'^[0-9a-f]+$', digest) and os.path.exists(file_path):
+                        self.send_response(200)
+                        self.send_header('Content-Type', 'application/octet-stream')
+                        self.send_header('Content-Length', str(os.path.getsize(file_path)))
+                        self.end_headers()
+                        with open(file_path, 'rb') as f:
+                            shutil.copyfileobj(f, self.wfile)
+                        return
+                else:
+                    packument = store._build_packument(path, base_url)
+                    if packument:
+                        body = json.dumps(packument).encode('utf-8')
+                        self.send_response(200)
+                        self.send_header('Content-Type', 'application/json')
+                        self.send_header('Content-Length', str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+                        return
+
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                store.logger.debug(f"本地仓库: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        url = f"http://{host}:{server.server_port}/"
+        self.logger.info(f"本地包仓库已启动: {url}")
+        try:
+            yield url
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join(timeout=5)
+
+
+# 测试代码
+if __name__ == '__main__':
+    store = PackageStore()
+    version = store.prefetch('openclaw')
+    print(f"预取结果: {version}")
+
+    snap = store.snapshot('openclaw')
+    if snap:
+        print(f"快照: {snap['name']}@{snap['version']}，共 {len(snap['packages'])} 个包")
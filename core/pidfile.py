@@ -0,0 +1,172 @@
+"""
+网关PID文件
+记录网关的PID、端口和进程启动时间，安装器重启后据此重新接管仍在运行的网关
+"""
+
+import json
+import os
+import time
+from typing import Optional, Dict, Any
+from utils.logger import get_logger
+from utils.platform import Platform
+from utils.readiness import ReadinessProbe
+
+
+def process_starttime(pid: int) -> Optional[int]:
+    """
+    读取进程启动时间（/proc/<pid>/stat第22个字段，开机后的时钟滴答数，仅Linux）
+
+    PID可能被系统复用，启动时间相同才能确认是同一个进程。
+
+    Returns:
+        启动时间，无法读取返回None
+    """
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            data = f.read()
+        return int(data[data.rfind(b')') + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def pid_alive(pid: int) -> bool:
+    """进程是否存在"""
+    if pid <= 0:
+        return False
+
+    if Platform.is_windows():
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PidFile:
+    """网关PID文件"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化PID文件
+
+        Args:
+            path: 文件路径（默认为应用数据目录/gateway.pid）
+        """
+        self.logger = get_logger()
+
+        if path is None:
+            path = os.path.join(Platform.get_app_dir(), 'gateway.pid')
+
+        self.path = path
+
+    def write(self, pid: int, port: int, public_port: Optional[int] = None):
+        """
+        写入PID记录（原子替换）
+
+        Args:
+            pid: 进程PID
+            port: 网关监听的端口号
+            public_port: 转发器占用的对外端口（未使用转发器时为None）
+        """
+        record = {
+            'pid': pid,
+            'port': port,
+            'public_port': public_port,
+            'starttime': process_starttime(pid),
+            'started_at': time.time()
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"写入PID文件失败: {e}")
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """
+        读取PID记录
+
+        Returns:
+            {'pid', 'port', 'public_port', 'starttime', 'started_at'}，文件不存在或损坏返回None
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            if isinstance(record, dict) and isinstance(record.get('pid'), int):
+                return record
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.debug(f"读取PID文件失败: {e}")
+        return None
+
+    def remove(self):
+        """删除PID文件"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.debug(f"删除PID文件失败: {e}")
+
+    def validate(self, record: Dict[str, Any], probe_timeout: float = 1.0) -> bool:
+        """
+        检查记录的网关是否仍在运行
+
+        依次检查: PID存在 -> 启动时间与/proc一致（排除PID复用） -> 端口可连接
+
+        Args:
+            record: PID记录
+            probe_timeout: 端口探测超时（秒）
+
+        Returns:
+            仍在运行返回True
+        """
+        pid = record.get('pid')
+        port = record.get('port')
+
+        if not pid_alive(pid):
+            self.logger.debug(f"PID文件中的进程已不存在: {pid}")
+            return False
+
+        recorded = record.get('starttime')
+        if recorded is not None and process_starttime(pid) != recorded:
+            self.logger.debug(f"PID {pid} 已被其他进程复用")
+            return False
+
+        if not port or ReadinessProbe(port, attempt_timeout=probe_timeout).check() is not None:
+            self.logger.debug(f"PID文件中的端口不可连接: {port}")
+            return False
+
+        return True
+
+    def load_valid(self) -> Optional[Dict[str, Any]]:
+        """
+        读取并校验PID记录，记录已失效时删除文件
+
+        Returns:
+            有效的记录，没有返回None
+        """
+        record = self.read()
+        if record is None:
+            return None
+        if self.validate(record):
+            return record
+        self.remove()
+        return None
@@ -0,0 +1,340 @@
+"""
+安装流水线
+按依赖关系并发执行阶段并记录检查点，重复执行时跳过输入未变化的已完成阶段，支持从失败阶段继续
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+from typing import Optional, Callable, List, Dict, Any
+from utils.logger import get_logger
+from utils.platform import Platform
+from utils.metrics import Metrics, StageTimer
+
+
+class Stage:
+    """流水线阶段"""
+
+    def __init__(
+        self,
+        stage_id: str,
+        name: str,
+        func: Callable[[], bool],
+        fingerprint: Optional[Callable[[], Any]] = None,
+        required: bool = True,
+        failure_message: Optional[str] = None,
+        validate: Optional[Callable[[], bool]] = None,
+        depends_on: Optional[List[str]] = None
+    ):
+        """
+        初始化阶段
+
+        Args:
+            stage_id: 阶段ID（检查点中的键）
+            name: 阶段名称（用于进度显示）
+            func: 阶段函数，成功返回True
+            fingerprint: 计算输入指纹的函数（None表示该阶段每次都执行）；
+                         返回None表示输入无法确定，本次不跳过
+            required: 失败时是否终止流水线
+            failure_message: 失败时的日志信息
+            validate: 跳过前检查上次的产出是否仍然有效（如安装的文件仍在），
+                      返回False时即使输入未变化也重新执行
+            depends_on: 依赖的阶段ID列表（None表示依赖前一个阶段，[]表示无依赖）
+        """
+        self.stage_id = stage_id
+        self.name = name
+        self.func = func
+        self.fingerprint = fingerprint
+        self.required = required
+        self.failure_message = failure_message or f"{name}失败"
+        self.validate = validate
+        self.depends_on = depends_on
+
+
+class Pipeline:
+    """带检查点的阶段流水线"""
+
+    def __init__(
+        self,
+        name: str,
+        checkpoint_path: Optional[str] = None,
+        stage_callback: Optional[Callable[[Stage, int, int], None]] = None,
+        max_workers: int = 4,
+        metrics: Optional[Metrics] = None
+    ):
+        """
+        初始化流水线
+
+        Args:
+            name: 流水线名称（决定默认检查点文件名）
+            checkpoint_path: 检查点文件路径（默认为应用数据目录/checkpoints/<name>.json）
+            stage_callback: 阶段开始回调 callback(stage, current, total)，
+                            并发执行时可能从工作线程调用
+            max_workers: 最多同时执行的阶段数（1表示严格串行）
+            metrics: 耗时统计（None则不记录）；操作名为流水线名称
+        """
+        self.logger = get_logger()
+        self.name = name
+
+        if checkpoint_path is None:
+            checkpoint_path = os.path.join(Platform.get_app_dir(), 'checkpoints', f"{name}.json")
+
+        self.checkpoint_path = checkpoint_path
+        self.stage_callback = stage_callback
+        self.max_workers = max_workers
+        self.metrics = metrics
+        self.checkpoint = self.load_checkpoint()
+        self._lock = threading.Lock()
+
+    # ==================== 检查点 ====================
+
+    def load_checkpoint(self) -> Dict[str, Any]:
+        """
+        加载检查点
+
+        Returns:
+            {'params': 运行参数, 'stages': {阶段ID: 记录}}
+        """
+        try:
+            if os.path.exists(self.checkpoint_path):
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and isinstance(data.get('stages'), dict):
+                    return data
+        except Exception as e:
+            self.logger.warning(f"加载检查点失败: {e}")
+        return {'params': {}, 'stages': {}}
+
+    def _save_checkpoint(self):
+        """保存检查点（原子替换）"""
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.checkpoint, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception as e:
+            self.logger.warning(f"保存检查点失败: {e}")
+
+    def clear_checkpoint(self):
+        """清除检查点（下次执行全部阶段）"""
+        self.checkpoint = {'params': {}, 'stages': {}}
+        self._save_checkpoint()
+
+    @staticmethod
+    def _hash(value: Any) -> str:
+        """计算输入指纹的哈希"""
+        data = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def first_failed_stage(self) -> Optional[str]:
+        """
+        获取检查点中第一个失败的必需阶段
+
+        Returns:
+            阶段ID，没有失败阶段返回None
+        """
+        for stage_id in self.checkpoint.get('order', []):
+            record = self.checkpoint['stages'].get(stage_id)
+            if record and not record.get('result') and record.get('required', True):
+                return stage_id
+        return None
+
+    # ==================== 执行 ====================
+
+    def _record(self, stage: Stage, fingerprint: Optional[str], result: bool, duration: float):
+        """写入阶段检查点"""
+        self.checkpoint['stages'][stage.stage_id] = {
+            'stage_id': stage.stage_id,
+            'name': stage.name,
+            'fingerprint': fingerprint,
+            'result': result,
+            'required': stage.required,
+            'duration': round(duration, 3),
+            'finished_at': time.time()
+        }
+        self._save_checkpoint()
+
+    def _should_skip(self, stage: Stage, fingerprint: Optional[str]) -> bool:
+        """输入指纹未变化且上次成功的阶段可以跳过"""
+        if fingerprint is None:
+            return False
+        record = self.checkpoint['stages'].get(stage.stage_id)
+        if not (record and record.get('result') and record.get('fingerprint') == fingerprint):
+            return False
+        if stage.validate:
+            try:
+                return bool(stage.validate())
+            except Exception as e:
+                self.logger.debug(f"阶段产出校验失败: {stage.stage_id}: {e}")
+                return False
+        return True
+
+    def _dependencies(self, stages: List[Stage]) -> Dict[str, List[str]]:
+        """
+        计算各阶段的依赖（未指定depends_on时依赖前一个阶段）
+
+        Raises:
+            ValueError: 依赖了不存在的阶段
+        """
+        ids = {s.stage_id for s in stages}
+        deps = {}
+        for i, stage in enumerate(stages):
+            if stage.depends_on is None:
+                deps[stage.stage_id] = [stages[i - 1].stage_id] if i else []
+            else:
+                unknown = [d for d in stage.depends_on if d not in ids]
+                if unknown:
+                    raise ValueError(f"阶段 {stage.stage_id} 依赖了不存在的阶段: {', '.join(unknown)}")
+                deps[stage.stage_id] = list(stage.depends_on)
+        return deps
+
+    def _resume_skips(self, stages: List[Stage], deps: Dict[str, List[str]]) -> set:
+        """
+        resume时可直接使用检查点的阶段
+
+        失败的必需阶段、它的所有下游阶段以及没有记录的阶段需要重新执行，其余成功的阶段跳过。
+        """
+        records = self.checkpoint['stages']
+        rerun = {
+            s.stage_id for s in stages
+            if not records.get(s.stage_id) or (not records[s.stage_id].get('result') and s.required)
+        }
+
+        changed = True
+        while changed:
+            changed = False
+            for stage_id, stage_deps in deps.items():
+                if stage_id not in rerun and any(d in rerun for d in stage_deps):
+                    rerun.add(stage_id)
+                    changed = True
+
+        return {s.stage_id for s in stages if s.stage_id not in rerun}
+
+    def _run_stage(self, stage: Stage, index: int, total: int, from_checkpoint: bool, force: bool) -> bool:
+        """执行单个阶段（或按检查点跳过），返回阶段结果"""
+        if self.stage_callback:
+            try:
+                self.stage_callback(stage, index, total)
+            except Exception as e:
+                self.logger.warning(f"阶段回调失败: {e}")
+
+        # resume时，失败阶段之前的阶段直接使用检查点
+        if from_checkpoint:
+            self.logger.info(f"跳过阶段（检查点）: {stage.name}")
+            return True
+
+        fingerprint = None
+        if stage.fingerprint:
+            try:
+                inputs = stage.fingerprint()
+                if inputs is not None:
+                    fingerprint = self._hash(inputs)
+            except Exception as e:
+                self.logger.debug(f"计算阶段指纹失败: {stage.stage_id}: {e}")
+
+        if not force and self._should_skip(stage, fingerprint):
+            self.logger.info(f"跳过阶段（输入未变化）: {stage.name}")
+            return True
+
+        start = time.monotonic()
+        measure = self.metrics.measure(self.name, stage.stage_id) if self.metrics else nullcontext(StageTimer())
+        with measure as timer:
+            try:
+                result = bool(stage.func())
+            except Exception as e:
+                self.logger.error(f"阶段异常: {stage.name}: {e}")
+                result = False
+            timer.ok = result
+        duration = time.monotonic() - start
+
+        with self._lock:
+            self._record(stage, fingerprint, result, duration)
+        self.logger.debug(f"阶段 {stage.stage_id} 完成: {result} ({duration:.2f}s)")
+
+        if not result:
+            if stage.required:
+                self.logger.error(stage.failure_message)
+            else:
+                self.logger.warning(stage.failure_message)
+
+        return result
+
+    def run(
+        self,
+        stages: List[Stage],
+        params: Optional[Dict[str, Any]] = None,
+        resume: bool = False,
+        force: bool = False
+    ) -> bool:
+        """
+        执行流水线
+
+        阶段按依赖关系调度：依赖都已完成的阶段并发执行（最多max_workers个），
+        必需阶段失败后不再启动新阶段，等待正在执行的阶段结束后返回。
+
+        Args:
+            stages: 阶段列表（列表顺序即进度序号）
+            params: 运行参数（记录到检查点，供resume使用）
+            resume: 是否从检查点中失败的阶段继续（未受影响的成功阶段直接跳过）
+            force: 忽略检查点，执行全部阶段
+
+        Returns:
+            所有必需阶段成功返回True，否则返回False
+        """
+        total = len(stages)
+        deps = self._dependencies(stages)
+        index_of = {s.stage_id: i for i, s in enumerate(stages, start=1)}
+
+        skips = set()
+        if resume:
+            resume_from = self.first_failed_stage()
+            if resume_from:
+                self.logger.info(f"从失败的阶段继续: {resume_from}")
+                skips = self._resume_skips(stages, deps)
+
+        self.checkpoint['params'] = params or {}
+        self.checkpoint['order'] = [s.stage_id for s in stages]
+        self.checkpoint['started_at'] = time.time()
+
+        pipeline_start = time.monotonic()
+        results: Dict[str, bool] = {}
+        pending = list(stages)
+        running = {}
+        failed = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"pipeline-{self.name}") as executor:
+            while pending or running:
+                # 启动依赖已满足的阶段
+                if not failed:
+                    for stage in [s for s in pending if all(d in results for d in deps[s.stage_id])]:
+                        pending.remove(stage)
+                        future = executor.submit(
+                            self._run_stage, stage, index_of[stage.stage_id], total,
+                            stage.stage_id in skips, force
+                        )
+                        running[future] = stage
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    results[stage.stage_id] = future.result()
+                    if not results[stage.stage_id] and stage.required:
+                        failed = True
+
+        ok = not failed and not pending
+        if self.metrics:
+            self.metrics.record(self.name, 'total', time.monotonic() - pipeline_start, ok=ok)
+
+        if not ok:
+            return False
+
+        self.logger.info(f"流水线 {self.name} 完成 ({time.monotonic() - pipeline_start:.1f}s)")
+        return True
@@ -0,0 +1,211 @@
+"""
+端口分配器
+启动网关前用绑定探测检查端口；冲突时从/proc/net/tcp找出占用端口的进程，按配置在端口范围内一次扫描选出空闲端口
+"""
+
+import os
+import socket
+from typing import Optional, Dict, Any, Set, Iterable, List
+from utils.logger import get_logger
+from utils.platform import Platform
+from .config import Config
+
+# /proc/net/tcp中LISTEN状态的编码
+TCP_LISTEN = '0A'
+
+
+class PortAllocator:
+    """端口分配类"""
+
+    def __init__(self, host: str = '127.0.0.1', config: Optional[Config] = None):
+        """
+        初始化端口分配器
+
+        Args:
+            host: 绑定探测的地址
+            config: 配置实例（提供 openclaw.port_range）
+        """
+        self.logger = get_logger()
+        self.host = host
+        self.config = config
+
+    @staticmethod
+    def is_free(port: int, host: str = '127.0.0.1') -> bool:
+        """
+        绑定探测：端口当前是否可以监听
+
+        非Windows上设置SO_REUSEADDR，与网关自身的监听方式一致，TIME_WAIT的连接不算占用。
+        """
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if not Platform.is_windows():
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind((host, port))
+                return True
+            except OSError:
+                return False
+
+    @staticmethod
+    def _read_proc_net(kind: str = 'tcp'):
+        """逐行读取/proc/net/tcp或tcp6，返回(本地端口, 状态, inode)"""
+        try:
+            with open(f"/proc/net/{kind}", 'r') as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 10:
+                        continue
+                    port = int(fields[1].rsplit(':', 1)[1], 16)
+                    yield port, fields[3], fields[9]
+        except (OSError, StopIteration, ValueError):
+            return
+
+    def listening_ports(self) -> Optional[Set[int]]:
+        """
+        所有处于LISTEN状态的TCP端口（读取一次/proc/net/tcp和tcp6）
+
+        Returns:
+            端口集合，非Linux返回None
+        """
+        if not (Platform.is_linux() and os.path.exists('/proc/net/tcp')):
+            return None
+        ports = set()
+        for kind in ('tcp', 'tcp6'):
+            for port, state, _ in self._read_proc_net(kind):
+                if state == TCP_LISTEN:
+                    ports.add(port)
+        return ports
+
+    def find_owner(self, port: int) -> Optional[Dict[str, Any]]:
+        """
+        找出监听该端口的进程（仅Linux；只能看到当前用户有权限访问的进程）
+
+        Returns:
+            {'pid', 'name', 'cmdline'}，找不到返回None
+        """
+        if not Platform.is_linux():
+            return None
+
+        inodes = set()
+        for kind in ('tcp', 'tcp6'):
+            for local_port, state, inode in self._read_proc_net(kind):
+                if local_port == port and state == TCP_LISTEN and inode != '0':
+                    inodes.add(f"socket:[{inode}]")
+        if not inodes:
+            return None
+
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            fd_dir = f"/proc/{entry}/fd"
+            try:
+                for fd in os.listdir(fd_dir):
+                    if os.readlink(os.path.join(fd_dir, fd)) in inodes:
+                        return self._describe_process(int(entry))
+            except OSError:
+                continue
+        return None
+
+    @staticmethod
+    def _describe_process(pid: int) -> Dict[str, Any]:
+        """读取进程名和命令行"""
+        info = {'pid': pid, 'name': None, 'cmdline': None}
+        try:
+            with open(f"/proc/{pid}/comm", 'r') as f:
+                info['name'] = f.read().strip()
+            with open(f"/proc/{pid}/cmdline", 'rb') as f:
+                info['cmdline'] = f.read().replace(b'\0', b' ').decode('utf-8', errors='replace').strip()
+        except OSError:
+            pass
+        return info
+
+    def find_free_ports(
+        self,
+        start: int,
+        end: int,
+        count: int = 1,
+        exclude: Iterable[int] = ()
+    ) -> List[int]:
+        """
+        在端口范围内按顺序找出空闲端口
+
+        Linux上先读取一次监听端口集合排除已占用的端口，只对候选端口做绑定探测确认。
+
+        Args:
+            start: 起始端口（含）
+            end: 结束端口（含）
+            count: 需要的端口数
+            exclude: 额外排除的端口
+
+        Returns:
+            端口列表（空闲端口不足时少于count个）
+        """
+        skip = set(exclude)
+        listening = self.listening_ports()
+        if listening:
+            skip |= listening
+
+        ports = []
+        for port in range(max(1, start), min(end, 65535) + 1):
+            if port not in skip and self.is_free(port, self.host):
+                ports.append(port)
+                if len(ports) >= count:
+                    break
+        return ports
+
+    def find_free(self, start: int, end: int, exclude: Iterable[int] = ()) -> Optional[int]:
+        """
+        在端口范围内找第一个空闲端口
+
+        Returns:
+            端口号，没有空闲端口返回None
+        """
+        ports = self.find_free_ports(start, end, 1, exclude)
+        return ports[0] if ports else None
+
+    def port_range(self) -> tuple:
+        """配置的自动分配端口范围"""
+        config = self.config
+        if config is None:
+            config = Config()
+            config.load()
+        start, end = config.get('openclaw.port_range', [3000, 3100])
+        return start, end
+
+    def resolve(self, port: int, auto: bool = False) -> Dict[str, Any]:
+        """
+        检查端口，冲突时按需选择其他端口
+
+        Args:
+            port: 期望的端口
+            auto: 冲突时是否在配置的端口范围内自动选择空闲端口
+
+        Returns:
+            {'port': 可用端口（无可用端口为None）, 'requested': 期望端口, 'conflict': 是否冲突, 'owner': 占用进程信息}
+        """
+        result = {'port': port, 'requested': port, 'conflict': False, 'owner': None}
+        if self.is_free(port, self.host):
+            return result
+
+        result['conflict'] = True
+        result['owner'] = self.find_owner(port)
+        result['port'] = None
+
+        if auto:
+            start, end = self.port_range()
+            result['port'] = self.find_free(start, end, exclude=(port,))
+        return result
+
+
+def describe_owner(owner: Optional[Dict[str, Any]]) -> str:
+    """格式化占用进程信息"""
+    if not owner:
+        return '未知进程'
+    return f"{owner.get('name') or '?'} (PID: {owner['pid']})"
+
+
+# 测试代码
+if __name__ == '__main__':
+    allocator = PortAllocator()
+    print(f"监听端口: {sorted(allocator.listening_ports() or [])}")
+    print(f"3000: {allocator.resolve(3000, auto=True)}")
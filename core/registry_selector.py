@@ -0,0 +1,144 @@
+"""
+npm仓库选择器
+并发测量多个候选仓库，选择最快且健康的仓库，并提供故障切换顺序
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any
+from urllib.parse import quote
+from utils.logger import get_logger
+from utils.downloader import Downloader
+from utils.netprobe import NetworkProbe
+from .config import Config
+
+
+class RegistrySelector:
+    """npm仓库选择器"""
+
+    DEFAULT_REGISTRY = 'https://registry.npmjs.org/'
+
+    # 健康检查请求精简版packument
+    ABBREVIATED_ACCEPT = 'application/vnd.npm.install-v1+json; q=1.0, application/json; q=0.8, */*'
+
+    def __init__(
+        self,
+        candidates: Optional[List[str]] = None,
+        package: str = 'openclaw',
+        timeout: float = 5,
+        downloader: Optional[Downloader] = None,
+        config: Optional[Config] = None
+    ):
+        """
+        初始化仓库选择器
+
+        Args:
+            candidates: 候选仓库列表（None则使用配置 network.npm_registries）
+            package: 用于健康检查的包名（仓库必须能返回它的元数据）
+            timeout: 单个仓库的测量超时（秒）
+            downloader: 下载器实例
+            config: 配置实例
+        """
+        self.logger = get_logger()
+
+        if candidates is None:
+            if config is None:
+                config = Config()
+                config.load()
+            candidates = config.get('network.npm_registries') or [self.DEFAULT_REGISTRY]
+
+        self.candidates = [self._normalize(c) for c in candidates]
+        self.package = package
+        self.timeout = timeout
+        self.downloader = downloader or Downloader()
+
+        # 最近一次测量结果
+        self.measurements: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _normalize(registry: str) -> str:
+        """统一仓库地址格式（以/结尾）"""
+        return registry.rstrip('/') + '/'
+
+    def _measure(self, registry: str) -> Dict[str, Any]:
+        """测量单个仓库：TCP/TLS延迟 + 包元数据首字节时间"""
+        probe = NetworkProbe(timeout=self.timeout).probe_endpoint(registry)
+        result = {
+            'registry': registry,
+            'healthy': False,
+            'connect_ms': probe['connect_ms'],
+            'tls_ms': probe['tls_ms'],
+            'ttfb_ms': None,
+            'error': probe['error']
+        }
+
+        if not probe['ok']:
+            return result
+
+        ttfb = self.downloader.time_url(
+            registry + quote(self.package, safe='@'),
+            headers={'Accept': self.ABBREVIATED_ACCEPT},
+            timeout=self.timeout
+        )
+        if ttfb is None:
+            result['error'] = '元数据请求失败'
+        else:
+            result['ttfb_ms'] = ttfb * 1000
+            result['healthy'] = True
+
+        return result
+
+    def measure(self) -> List[Dict[str, Any]]:
+        """
+        并发测量所有候选仓库
+
+        Returns:
+            测量结果列表（健康的在前，按元数据首字节时间升序）
+        """
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=len(self.candidates) or 1) as executor:
+            results = list(executor.map(self._measure, self.candidates))
+
+        results.sort(key=lambda r: (not r['healthy'], r['ttfb_ms'] or 0))
+        self.measurements = results
+
+        for r in results:
+            if r['healthy']:
+                self.logger.info(f"  {r['registry']}: {r['ttfb_ms']:.0f}ms")
+            else:
+                self.logger.info(f"  {r['registry']}: 不可用 ({r['error']})")
+        self.logger.debug(f"仓库测量耗时: {time.monotonic() - start:.2f}s")
+
+        return results
+
+    def ranked(self) -> List[str]:
+        """
+        获取故障切换顺序
+
+        Returns:
+            健康仓库（最快在前），全部不健康时返回原候选列表
+        """
+        if not self.measurements:
+            self.measure()
+        healthy = [r['registry'] for r in self.measurements if r['healthy']]
+        return healthy or list(self.candidates)
+
+    def select(self) -> str:
+        """
+        选择最快的健康仓库
+
+        Returns:
+            仓库地址（全部不健康时返回第一个候选）
+        """
+        registry = self.ranked()[0]
+        self.logger.info(f"选择npm仓库: {registry}")
+        return registry
+
+
+# 测试代码
+if __name__ == '__main__':
+    selector = RegistrySelector()
+    selector.measure()
+    print(f"故障切换顺序: {selector.ranked()}")
+    print(f"选择: {selector.select()}")
@@ -0,0 +1,267 @@
+"""
+OpenClaw守护进程
+订阅网关的退出事件，异常退出后按指数退避（带抖动）自动重启，检测到崩溃循环时停止重启
+"""
+
+import queue
+import random
+import signal
+import threading
+import time
+from collections import deque
+from typing import Optional, Callable, Dict, Any
+from utils.logger import get_logger
+from utils.metrics import get_metrics
+from .manager import Manager
+
+
+class Supervisor:
+    """网关守护类"""
+
+    # 状态
+    STATE_STOPPED = 'stopped'
+    STATE_RUNNING = 'running'
+    STATE_BACKOFF = 'backoff'
+    STATE_CRASH_LOOP = 'crash_loop'
+
+    def __init__(
+        self,
+        manager: Optional[Manager] = None,
+        max_exits: int = 5,
+        window: float = 60,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        jitter: float = 0.2,
+        stable_after: float = 30.0,
+        callback: Optional[Callable[[str], None]] = None
+    ):
+        """
+        初始化守护进程
+
+        Args:
+            manager: 管理器实例
+            max_exits: 崩溃循环判定：window秒内异常退出达到该次数即停止重启
+            window: 崩溃循环判定的时间窗口（秒）
+            base_delay: 首次重启前的等待时间（秒）
+            max_delay: 重启等待时间上限（秒）
+            jitter: 等待时间的随机抖动比例（0.2表示±20%）
+            stable_after: 进程持续运行超过该时间后，退避等待时间重新从base_delay开始（秒）
+            callback: 状态回调函数
+        """
+        self.logger = get_logger()
+        self.metrics = get_metrics()
+        self.manager = manager or Manager()
+        self.max_exits = max_exits
+        self.window = window
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.stable_after = stable_after
+        self.callback = callback
+
+        self.state = self.STATE_STOPPED
+        self.restart_count = 0
+        self.last_exit: Optional[Dict[str, Any]] = None
+
+        # 时间窗口内的退出时间
+        self._exits: deque = deque()
+        self._failures = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 退出事件队列（None表示停止守护）
+        self._events: queue.Queue = queue.Queue()
+        self._process_started = time.monotonic()
+
+    def start(self, port: Optional[int] = None) -> bool:
+        """
+        启动网关并开始守护
+
+        Args:
+            port: 端口号（None则使用配置中的端口）
+
+        Returns:
+            网关启动成功返回True
+        """
+        if self._thread and self._thread.is_alive():
+            self.logger.warning("守护进程已在运行")
+            return False
+
+        if not self.manager.check_running() and not self.manager.start(port, self.callback):
+            return False
+
+        self._stop_event.clear()
+        self._events = queue.Queue()
+        self._exits.clear()
+        self._failures = 0
+        self._process_started = time.monotonic()
+        self.state = self.STATE_RUNNING
+        self.manager.add_exit_listener(self._on_exit)
+
+        self._thread = threading.Thread(target=self._watch, name='openclaw-supervisor', daemon=True)
+        self._thread.start()
+        self.logger.info("守护进程已启动")
+        return True
+
+    def stop(self) -> bool:
+        """
+        停止守护并停止网关
+
+        Returns:
+            停止成功返回True
+        """
+        self._stop_event.set()
+        self._events.put(None)
+        self.manager.remove_exit_listener(self._on_exit)
+        result = self.manager.stop(self.callback) if self.manager.check_running() else True
+
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+        self.state = self.STATE_STOPPED
+        self.logger.info("守护进程已停止")
+        return result
+
+    def _on_exit(self, event: Dict[str, Any]):
+        """管理器的退出事件回调：只处理守护期间的异常退出"""
+        if event['expected'] or self._stop_event.is_set():
+            return
+        if self.state in (self.STATE_RUNNING, self.STATE_BACKOFF):
+            self._events.put(event)
+
+    def _watch(self):
+        """守护线程：等待退出事件，按需重启"""
+        while not self._stop_event.is_set():
+            event = self._events.get()
+            if event is None or self._stop_event.is_set():
+                break
+
+            uptime = time.monotonic() - self._process_started
+            self._record_exit(event, uptime)
+
+            if uptime >= self.stable_after:
+                self._failures = 0
+
+            # 被停止或进入崩溃循环时结束守护
+            if not self._restart():
+                break
+
+        if self.state != self.STATE_CRASH_LOOP:
+            self.state = self.STATE_STOPPED
+
+    def _record_exit(self, event: Dict[str, Any], uptime: float):
+        """记录一次异常退出（管理器已在退出事件中更新了运行状态）"""
+        self.last_exit = {
+            'returncode': event['returncode'],
+            'reason': self.describe_exit(event['returncode']),
+            'uptime': round(uptime, 3),
+            'time': event['time'],
+            'stderr': event['stderr'][-10:]
+        }
+
+        now = time.monotonic()
+        self._exits.append(now)
+        while self._exits and now - self._exits[0] > self.window:
+            self._exits.popleft()
+
+        self.logger.warning(f"OpenClaw异常退出: {self.last_exit['reason']} (运行 {uptime:.1f}s)")
+        self._notify(f"✗ OpenClaw异常退出: {self.last_exit['reason']}")
+
+    def _restart(self) -> bool:
+        """
+        按退避策略重启（重启失败会继续重试，直到成功、停止或进入崩溃循环）
+
+        Returns:
+            重启成功返回True
+        """
+        while not self._stop_event.is_set():
+            if len(self._exits) >= self.max_exits:
+                self.state = self.STATE_CRASH_LOOP
+                self.logger.error(f"检测到崩溃循环: {self.window:.0f}秒内退出{len(self._exits)}次，停止自动重启")
+                self._notify("✗ OpenClaw反复崩溃，已停止自动重启")
+                return False
+
+            delay = self.next_delay()
+            self._failures += 1
+            self.state = self.STATE_BACKOFF
+            self.logger.info(f"{delay:.1f}秒后重启OpenClaw...")
+
+            if self._stop_event.wait(delay):
+                return False
+
+            start = time.perf_counter()
+            ok = self.manager.start(self.manager.port, self.callback)
+            self.metrics.record('supervise', 'restart', time.perf_counter() - start, ok=ok)
+
+            if ok:
+                self.restart_count += 1
+                self._process_started = time.monotonic()
+                self.state = self.STATE_RUNNING
+                self._notify(f"✓ OpenClaw已自动重启 (第{self.restart_count}次)")
+                return True
+
+            # 启动失败同样计为一次退出
+            self._exits.append(time.monotonic())
+
+        return False
+
+    def next_delay(self) -> float:
+        """计算下一次重启前的等待时间（指数退避 + 抖动）"""
+        delay = min(self.max_delay, self.base_delay * (2 ** self._failures))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    @staticmethod
+    def describe_exit(returncode: Optional[int]) -> str:
+        """描述退出原因"""
+        if returncode is None:
+            return '未知'
+        if returncode < 0:
+            try:
+                return f"被信号终止 ({signal.Signals(-returncode).name})"
+            except ValueError:
+                return f"被信号终止 ({-returncode})"
+        return f"退出码 {returncode}"
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取守护状态
+
+        Returns:
+            状态字典: state, restart_count, recent_exits（时间窗口内的退出次数）, last_exit
+        """
+        return {
+            'state': self.state,
+            'restart_count': self.restart_count,
+            'recent_exits': len(self._exits),
+            'last_exit': self.last_exit
+        }
+
+    def reset(self):
+        """清除崩溃循环状态（修复问题后可重新start）"""
+        self._exits.clear()
+        self._failures = 0
+        if self.state == self.STATE_CRASH_LOOP:
+            self.state = self.STATE_STOPPED
+
+    def _notify(self, message: str):
+        """调用回调函数"""
+        if self.callback:
+            try:
+                self.callback(message)
+            except Exception as e:
+                self.logger.warning(f"回调函数调用失败: {e}")
+
+
+# 测试代码
+if __name__ == '__main__':
+    supervisor = Supervisor(callback=print)
+    if supervisor.start():
+        try:
+            while supervisor.state != Supervisor.STATE_CRASH_LOOP:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            supervisor.stop()
+    print(supervisor.get_status())
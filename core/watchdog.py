@@ -0,0 +1,256 @@
+"""
+OpenClaw资源看门狗
+根据资源采样判断网关的内存或CPU是否持续超过阈值，超过时受控重启并记录重启前后的内存；演练模式只报告不重启
+
+启用 watchdog.enabled 后由Manager（启用转发器时蓝绿重启）或GatewayPool（逐个实例滚动重启）随网关启动
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, Callable, Dict, Any, List
+from utils.logger import get_logger
+from utils.metrics import get_metrics
+from utils.platform import Platform
+from .manager import Manager
+
+
+class Watchdog:
+    """网关资源看门狗类"""
+
+    # 内存中保留的事件数
+    MAX_EVENTS = 50
+
+    def __init__(
+        self,
+        manager: Optional[Manager] = None,
+        rss_limit_mb: Optional[float] = None,
+        cpu_limit_percent: Optional[float] = None,
+        sustain: Optional[float] = None,
+        check_interval: Optional[float] = None,
+        cooldown: Optional[float] = None,
+        dry_run: Optional[bool] = None,
+        callback: Optional[Callable[[str], None]] = None,
+        restart: Optional[Callable[[Optional[Callable[[str], None]]], bool]] = None
+    ):
+        """
+        初始化看门狗（参数为None时使用配置 watchdog.*）
+
+        Args:
+            manager: 管理器实例
+            rss_limit_mb: 进程树内存阈值（MB，0为不检查）
+            cpu_limit_percent: 进程树CPU阈值（百分比，0为不检查）
+            sustain: 持续超过阈值多久才触发（秒）
+            check_interval: 检查间隔（秒）
+            cooldown: 触发后的冷却时间（秒），期间不再触发
+            dry_run: 演练模式：只记录将要执行的重启，不实际重启
+            callback: 状态回调函数
+            restart: 重启函数 restart(callback)（None则使用manager.restart；实例池传入单个实例的滚动重启）
+        """
+        self.logger = get_logger()
+        self.metrics = get_metrics()
+        self.manager = manager or Manager()
+        config = self.manager.config
+
+        def option(value, key):
+            return config.get(f"watchdog.{key}") if value is None else value
+
+        self.rss_limit_mb = option(rss_limit_mb, 'rss_limit_mb') or 0
+        self.cpu_limit_percent = option(cpu_limit_percent, 'cpu_limit_percent') or 0
+        self.sustain = option(sustain, 'sustain')
+        self.check_interval = option(check_interval, 'check_interval')
+        self.cooldown = option(cooldown, 'cooldown')
+        self.dry_run = bool(option(dry_run, 'dry_run'))
+        self.callback = callback
+        self.restart = restart or self.manager.restart
+
+        self.restart_count = 0
+        self.events: deque = deque(maxlen=self.MAX_EVENTS)
+        self.history_path = os.path.join(Platform.get_app_dir(), 'watchdog.jsonl')
+
+        self._last_trigger: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """
+        开始定期检查
+
+        Returns:
+            启动成功返回True
+        """
+        if self._thread and self._thread.is_alive():
+            self.logger.warning("看门狗已在运行")
+            return False
+        if not self.rss_limit_mb and not self.cpu_limit_percent:
+            self.logger.warning("看门狗未设置任何阈值")
+            return False
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name='openclaw-watchdog', daemon=True)
+        self._thread.start()
+        mode = "（演练模式）" if self.dry_run else ""
+        self.logger.info(f"看门狗已启动{mode}: {self.describe_limits()}")
+        return True
+
+    def stop(self):
+        """停止检查（不影响网关）"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _loop(self):
+        """检查线程"""
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.warning(f"看门狗检查失败: {e}")
+
+    def describe_limits(self) -> str:
+        """描述阈值"""
+        limits = []
+        if self.rss_limit_mb:
+            limits.append(f"内存 > {self.rss_limit_mb}MB")
+        if self.cpu_limit_percent:
+            limits.append(f"CPU > {self.cpu_limit_percent}%")
+        return f"{' 或 '.join(limits)} 持续 {self.sustain}秒"
+
+    def evaluate(self) -> List[str]:
+        """
+        判断是否持续超过阈值
+
+        只有采样覆盖了完整的持续时间窗口、且窗口内每个样本都超过阈值才算超过。
+
+        Returns:
+            超过的阈值描述列表，未超过（或样本不足）返回空列表
+        """
+        sampler = self.manager.sampler
+        if not self.manager.is_running or not sampler:
+            return []
+
+        start = time.time() - self.sustain
+        samples = sampler.ring.since(start)
+        # 最早的样本应落在窗口开头的一个采样间隔内，否则采样时长还不够
+        if not samples or samples[0]['time'] > start + sampler.interval * 1.5:
+            return []
+
+        reasons = []
+        if self.rss_limit_mb:
+            lowest = min(s['rss'] for s in samples) / (1024 * 1024)
+            if lowest > self.rss_limit_mb:
+                reasons.append(f"内存持续 {self.sustain}秒 高于 {self.rss_limit_mb}MB（最低 {lowest:.0f}MB）")
+        if self.cpu_limit_percent:
+            # 第一个样本没有CPU间隔数据
+            lowest = min(s['cpu_percent'] for s in samples[1:] or samples)
+            if lowest > self.cpu_limit_percent:
+                reasons.append(f"CPU持续 {self.sustain}秒 高于 {self.cpu_limit_percent}%（最低 {lowest:.0f}%）")
+        return reasons
+
+    def check(self) -> Optional[Dict[str, Any]]:
+        """
+        检查一次，超过阈值时重启（演练模式只记录）
+
+        Returns:
+            触发时返回事件字典，否则返回None
+        """
+        if self._last_trigger is not None and time.monotonic() - self._last_trigger < self.cooldown:
+            return None
+
+        reasons = self.evaluate()
+        if not reasons:
+            return None
+
+        self._last_trigger = time.monotonic()
+        before = self.manager.sampler.latest()
+        event = {
+            'time': time.time(),
+            'pid': self.manager.pid,
+            'reasons': reasons,
+            'dry_run': self.dry_run,
+            'rss_before': before['rss'] if before else None,
+            'cpu_before': before['cpu_percent'] if before else None,
+            'rss_after': None,
+            'ok': None,
+            'duration': None
+        }
+
+        if self.dry_run:
+            self.logger.warning(f"[演练] 将重启OpenClaw: {'; '.join(reasons)}")
+            self._notify(f"[演练] OpenClaw超过资源阈值，将会重启: {'; '.join(reasons)}")
+        else:
+            self.logger.warning(f"OpenClaw超过资源阈值，重启: {'; '.join(reasons)}")
+            self._notify("OpenClaw超过资源阈值，正在重启...")
+
+            start = time.perf_counter()
+            event['ok'] = self.restart(self.callback)
+            event['duration'] = round(time.perf_counter() - start, 3)
+            self.metrics.record('watchdog', 'restart', event['duration'], ok=event['ok'])
+
+            # 新进程刚就绪时的内存
+            if event['ok'] and self.manager.sampler:
+                after = self.manager.sampler.sample()
+                event['rss_after'] = after['rss'] if after else None
+
+            if event['ok']:
+                self.restart_count += 1
+                freed = ''
+                if event['rss_before'] is not None and event['rss_after'] is not None:
+                    freed = f"，内存 {event['rss_before'] / 1048576:.0f}MB -> {event['rss_after'] / 1048576:.0f}MB"
+                self.logger.info(f"✓ 看门狗重启完成{freed}")
+                self._notify(f"✓ OpenClaw已重启{freed}")
+            else:
+                self.logger.error("✗ 看门狗重启失败")
+                self._notify("✗ OpenClaw重启失败")
+
+        self._record(event)
+        return event
+
+    def _record(self, event: Dict[str, Any]):
+        """保存事件（内存中保留最近的事件，并追加到历史文件）"""
+        self.events.append(event)
+        try:
+            os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+            with open(self.history_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+        except OSError as e:
+            self.logger.debug(f"写入看门狗记录失败: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取看门狗状态
+
+        Returns:
+            状态字典: running, dry_run, limits, restart_count, last_event
+        """
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'dry_run': self.dry_run,
+            'limits': self.describe_limits(),
+            'restart_count': self.restart_count,
+            'last_event': self.events[-1] if self.events else None
+        }
+
+    def _notify(self, message: str):
+        """调用回调函数"""
+        if self.callback:
+            try:
+                self.callback(message)
+            except Exception as e:
+                self.logger.warning(f"回调函数调用失败: {e}")
+
+
+# 测试代码
+if __name__ == '__main__':
+    watchdog = Watchdog(dry_run=True, callback=print)
+    if watchdog.manager.check_running() or watchdog.manager.start(callback=print):
+        watchdog.start()
+        try:
+            while True:
+                time.sleep(watchdog.check_interval)
+                print(watchdog.get_status())
+        except KeyboardInterrupt:
+            watchdog.stop()
@@ -7,9 +7,11 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog
 from typing import Optional
 import os
+import threading
 from utils.logger import get_logger
 from core.config import Config
 from core.installer import Installer
+from core.manager import Manager
 
 # 获取资源目录
 def get_asset_path(filename):
@@ -54,6 +56,9 @@ class MainWindow:
         # 当前页面
         self.current_page = None
 
+        # 网关管理器（启动时接管仍在运行的网关）
+        self.manager = Manager()
+
         # 创建UI
         self._setup_window()
         self._create_layout()
@@ -493,6 +498,12 @@ class MainWindow:
             command=lambda: self._stop_openclaw()
         ).pack(side=tk.LEFT, padx=5)
 
+        ttk.Button(
+            button_frame,
+            text="重启",
+            command=lambda: self._restart_openclaw()
+        ).pack(side=tk.LEFT, padx=5)
+
         ttk.Button(
             button_frame,
             text="打开Web界面",
@@ -737,32 +748,49 @@ class MainWindow:
         except Exception as e:
             self.logger.debug(f"加载OpenClaw配置失败: {e}")
 
+    def _run_manager_action(self, action):
+        """在后台线程执行管理器操作（启动可能需要等待数十秒），完成后刷新状态"""
+        def callback(message):
+            self.root.after(0, self._log_message, message)
+
+        def run():
+            try:
+                action(callback)
+            except Exception as e:
+                callback(f"✗ 操作失败: {e}")
+            self.root.after(0, self._refresh_status)
+
+        threading.Thread(target=run, daemon=True).start()
+
     def _start_openclaw(self):
         """启动OpenClaw"""
         self.logger.info("启动OpenClaw...")
-        self._log_message("OpenClaw已启动")
-
-        # TODO: 实现启动逻辑
+        self._run_manager_action(lambda callback: self.manager.start(callback=callback))
 
     def _stop_openclaw(self):
         """停止OpenClaw"""
         self.logger.info("停止OpenClaw...")
-        self._log_message("OpenClaw已停止")
+        self._run_manager_action(self.manager.stop)
 
-        # TODO: 实现停止逻辑
+    def _restart_openclaw(self):
+        """重启OpenClaw（启用转发器时蓝绿重启，不中断服务）"""
+        self.logger.info("重启OpenClaw...")
+        self._run_manager_action(self.manager.restart)
 
     def _open_webui(self):
         """打开Web界面"""
         self.logger.info("打开Web界面...")
-        self._log_message("正在打开Web界面...")
-
-        # TODO: 实现打开浏览器逻辑
+        self.manager.open_webui(callback=self._log_message)
 
     def _refresh_status(self):
         """刷新状态"""
         self.logger.info("刷新状态...")
 
-        # TODO: 实现状态刷新逻辑
+        status = self.manager.get_status()
+        self.status_vars["running"].set("运行中" if status['running'] else "未运行")
+        self.status_vars["port"].set(str(status['port'] or "-"))
+        self.status_vars["pid"].set(str(status['pid'] or "-"))
+        self.status_vars["version"].set(status['version'] or "-")
 
     def _log_message(self, message: str):
         """添加日志消息"""
@@ -4,6 +4,7 @@
 
 from .platform import Platform
 from .logger import Logger, get_logger
+from .netprobe import NetworkProbe
 
 try:
     from .downloader import Downloader
@@ -11,6 +12,7 @@ try:
         'Platform',
         'Logger',
         'get_logger',
+        'NetworkProbe',
         'Downloader'
     ]
 except ImportError:
@@ -19,4 +21,5 @@ except ImportError:
         'Platform',
         'Logger',
         'get_logger',
+        'NetworkProbe',
     ]
@@ -4,8 +4,9 @@
 """
 
 import os
+import time
 import requests
-from typing import Optional, Callable
+from typing import Optional, Callable, Tuple
 from .logger import get_logger
 
 class Downloader:
@@ -19,7 +20,8 @@ class Downloader:
         self,
         url: str,
         dest_path: str,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        timeout: Optional[float] = None
     ) -> bool:
         """
         下载文件
@@ -28,6 +30,7 @@ class Downloader:
             url: 下载URL
             dest_path: 目标路径
             progress_callback: 进度回调函数 callback(downloaded, total)
+            timeout: 连接和读取超时（秒，None表示不超时）
 
         Returns:
             下载成功返回True，失败返回False
@@ -37,7 +40,7 @@ class Downloader:
             os.makedirs(os.path.dirname(dest_path), exist_ok=True)
 
             # 下载文件
-            response = requests.get(url, stream=True)
+            response = requests.get(url, stream=True, timeout=timeout)
             response.raise_for_status()
 
             total_size = int(response.headers.get('content-length', 0))
@@ -85,24 +88,68 @@ class Downloader:
             self.logger.error(f"文本下载失败: {e}")
             return None
 
-    def download_json(self, url: str) -> Optional[dict]:
+    def download_json(
+        self,
+        url: str,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None
+    ) -> Optional[dict]:
         """
         下载JSON数据
 
         Args:
             url: 下载URL
+            headers: 额外的请求头
+            timeout: 连接和读取超时（秒，None表示不超时）
 
         Returns:
             JSON数据，失败返回None
         """
         try:
-            response = requests.get(url)
+            response = requests.get(url, headers=headers, timeout=timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             self.logger.error(f"JSON下载失败: {e}")
             return None
 
+    def download_json_conditional(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[int, Optional[dict], Optional[str]]:
+        """
+        条件请求JSON数据（If-None-Match）
+
+        Args:
+            url: 下载URL
+            etag: 上次响应的ETag（None表示无条件请求）
+            headers: 额外的请求头
+            timeout: 连接和读取超时（秒，None表示不超时）
+
+        Returns:
+            (status, data, etag)
+            status: HTTP状态码（304表示未变化，请求失败为0）
+            data: JSON数据（仅200时有值）
+            etag: 响应的ETag
+        """
+        request_headers = dict(headers or {})
+        if etag:
+            request_headers['If-None-Match'] = etag
+
+        try:
+            response = requests.get(url, headers=request_headers, timeout=timeout)
+            new_etag = response.headers.get('ETag', etag)
+            if response.status_code == 304:
+                return 304, None, new_etag
+            response.raise_for_status()
+            return response.status_code, response.json(), new_etag
+        except Exception as e:
+            self.logger.error(f"JSON下载失败: {e}")
+            return 0, None, None
+
     def check_url(self, url: str) -> bool:
         """
         检查URL是否可访问
@@ -120,6 +167,35 @@ class Downloader:
             self.logger.debug(f"URL检查失败: {e}")
             return False
 
+    def time_url(
+        self,
+        url: str,
+        headers: Optional[dict] = None,
+        timeout: float = 5
+    ) -> Optional[float]:
+        """
+        测量URL的首字节时间
+
+        Args:
+            url: 要测量的URL
+            headers: 额外的请求头
+            timeout: 超时时间（秒）
+
+        Returns:
+            首字节时间（秒），请求失败或状态码不是200时返回None
+        """
+        try:
+            start = time.perf_counter()
+            with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+                if response.status_code != 200:
+                    self.logger.debug(f"URL状态异常: {url} ({response.status_code})")
+                    return None
+                next(response.iter_content(chunk_size=1), b'')
+                return time.perf_counter() - start
+        except Exception as e:
+            self.logger.debug(f"URL测量失败: {e}")
+            return None
+
 # 测试代码
 if __name__ == '__main__':
     downloader = Downloader()
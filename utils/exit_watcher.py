@@ -0,0 +1,141 @@
+"""
+进程退出监视
+Linux上用pidfd + poll在单个线程中同时等待多个进程退出；其他平台为每个子进程使用一个阻塞在wait()上的线程
+"""
+
+import os
+import select
+import subprocess
+import threading
+from typing import Optional, Callable, Dict
+from .logger import get_logger
+from .platform import Platform
+
+# 回调函数: callback(pid, returncode)，非子进程的returncode为None
+ExitCallback = Callable[[int, Optional[int]], None]
+
+
+class ExitWatcher:
+    """进程退出监视类"""
+
+    # 无法等待的非子进程（非Linux）的存活检查间隔（秒）
+    FALLBACK_POLL_INTERVAL = 1.0
+
+    def __init__(self):
+        """初始化监视器"""
+        self.logger = get_logger()
+        self._lock = threading.Lock()
+        self._use_pidfd = Platform.is_linux() and hasattr(os, 'pidfd_open') and hasattr(select, 'poll')
+
+        # pidfd -> (pid, process, callback)
+        self._watches: Dict[int, tuple] = {}
+        self._poller = None
+        self._wake_r = self._wake_w = None
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(
+        self,
+        pid: int,
+        callback: ExitCallback,
+        process: Optional[subprocess.Popen] = None,
+        alive: Optional[Callable[[], bool]] = None
+    ):
+        """
+        监视进程退出
+
+        回调在独立线程中调用，不会阻塞监视线程。
+
+        Args:
+            pid: 进程PID
+            callback: 退出回调 callback(pid, returncode)
+            process: 子进程对象（有则可以获取返回码）
+            alive: 存活检查函数（不支持pidfd的平台上监视非子进程时使用）
+        """
+        if self._use_pidfd:
+            try:
+                self._watch_pidfd(pid, callback, process)
+                return
+            except OSError as e:
+                self.logger.debug(f"pidfd_open失败，改用等待线程: {e}")
+
+        if process is None and alive is None:
+            self.logger.warning(f"无法监视进程 {pid} 的退出")
+            return
+
+        threading.Thread(
+            target=self._wait_thread,
+            args=(pid, callback, process, alive),
+            name=f"exit-wait-{pid}",
+            daemon=True
+        ).start()
+
+    def _watch_pidfd(self, pid: int, callback: ExitCallback, process: Optional[subprocess.Popen]):
+        """注册pidfd（首次调用时启动监视线程）"""
+        fd = os.pidfd_open(pid)
+        with self._lock:
+            if self._thread is None:
+                self._poller = select.poll()
+                self._wake_r, self._wake_w = os.pipe()
+                self._poller.register(self._wake_r, select.POLLIN)
+                self._thread = threading.Thread(target=self._poll_loop, name='exit-watcher', daemon=True)
+                self._thread.start()
+            self._watches[fd] = (pid, process, callback)
+            self._poller.register(fd, select.POLLIN)
+        # 唤醒poll（新注册的fd在下一轮生效）
+        os.write(self._wake_w, b'\0')
+
+    def _poll_loop(self):
+        """监视线程：pidfd可读即表示进程已退出"""
+        while True:
+            for fd, _ in self._poller.poll():
+                if fd == self._wake_r:
+                    os.read(self._wake_r, 1024)
+                    continue
+
+                with self._lock:
+                    entry = self._watches.pop(fd, None)
+                    self._poller.unregister(fd)
+                os.close(fd)
+                if entry:
+                    pid, process, callback = entry
+                    self._dispatch(pid, process, callback)
+
+    def _wait_thread(
+        self,
+        pid: int,
+        callback: ExitCallback,
+        process: Optional[subprocess.Popen],
+        alive: Optional[Callable[[], bool]]
+    ):
+        """等待线程：子进程阻塞在wait()，非子进程定期检查存活"""
+        if process is not None:
+            process.wait()
+        else:
+            pause = threading.Event()
+            while alive():
+                pause.wait(self.FALLBACK_POLL_INTERVAL)
+        self._dispatch(pid, process, callback)
+
+    def _dispatch(self, pid: int, process: Optional[subprocess.Popen], callback: ExitCallback):
+        """在新线程中调用回调"""
+        def run():
+            # pidfd可读时子进程已退出，wait()立即返回并回收
+            returncode = process.wait() if process is not None else None
+            try:
+                callback(pid, returncode)
+            except Exception as e:
+                self.logger.warning(f"退出回调失败: {e}")
+
+        threading.Thread(target=run, name=f"exit-event-{pid}", daemon=True).start()
+
+
+# 全局监视器
+_exit_watcher = None
+
+
+def get_exit_watcher() -> ExitWatcher:
+    """获取全局进程退出监视器"""
+    global _exit_watcher
+    if _exit_watcher is None:
+        _exit_watcher = ExitWatcher()
+    return _exit_watcher
@@ -0,0 +1,118 @@
+"""
+延迟直方图
+HDR风格的对数-线性分桶：每个2的幂区间再等分为固定数量的子桶，相对误差有界，内存占用与样本数无关
+"""
+
+import math
+from typing import Optional, Dict, List
+
+
+class LatencyHistogram:
+    """HDR风格的延迟直方图（记录整数微秒）"""
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        """
+        初始化直方图
+
+        Args:
+            sub_bucket_bits: 每个2的幂区间的子桶数为 2**sub_bucket_bits（7对应约0.8%的相对误差）
+        """
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.counts: List[int] = []
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.sum = 0
+
+    def _index(self, value: int) -> int:
+        """值对应的桶下标"""
+        if value < 2 * self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - (self.sub_bucket_bits + 1)
+        return self.sub_bucket_count * shift + (value >> shift)
+
+    def _highest_value(self, index: int) -> int:
+        """桶内的最大值"""
+        if index < 2 * self.sub_bucket_count:
+            return index
+        shift = index // self.sub_bucket_count - 1
+        top = index - self.sub_bucket_count * shift
+        return ((top + 1) << shift) - 1
+
+    def record(self, value: int, count: int = 1):
+        """
+        记录一个值
+
+        Args:
+            value: 值（微秒，负数按0记录）
+            count: 次数
+        """
+        value = max(0, int(value))
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def record_seconds(self, seconds: float):
+        """记录一个以秒为单位的值"""
+        self.record(round(seconds * 1_000_000))
+
+    def merge(self, other: 'LatencyHistogram'):
+        """合并另一个直方图（子桶数必须相同）"""
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("直方图精度不同，无法合并")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, pct: float) -> Optional[int]:
+        """
+        百分位数
+
+        Args:
+            pct: 百分位（0-100）
+
+        Returns:
+            百分位所在桶的最大值（不超过记录到的最大值），无样本返回None
+        """
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(pct / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    def mean(self) -> Optional[float]:
+        """平均值"""
+        return self.sum / self.total if self.total else None
+
+    def summary_ms(self, percentiles=(50, 90, 99, 99.9)) -> Dict[str, Optional[float]]:
+        """
+        汇总（毫秒）
+
+        Returns:
+            {'min', 'p50', 'p90', 'p99', 'p99.9', 'max', 'mean'}
+        """
+        def ms(value):
+            return None if value is None else round(value / 1000, 3)
+
+        summary = {'min': ms(self.min)}
+        for pct in percentiles:
+            summary[f"p{pct:g}"] = ms(self.percentile(pct))
+        summary['max'] = ms(self.max)
+        summary['mean'] = ms(self.mean())
+        return summary
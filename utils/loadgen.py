@@ -0,0 +1,257 @@
+"""
+HTTP压测工具
+以固定速率（或尽可能快）和并发数向网关发送请求，统计吞吐量和延迟分布，结果保存为JSON便于对比
+
+固定速率时，延迟从计划发送时间开始计算（避免协同遗漏：服务变慢时排队的时间也计入延迟）。
+
+用法:
+    python -m utils.loadgen http://localhost:3000/ [--rate 200] [--concurrency 16] [--duration 10]
+                            [--output result.json] [--compare baseline.json]
+"""
+
+import http.client
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlparse
+from .logger import get_logger
+from .platform import Platform
+from .histogram import LatencyHistogram
+
+
+class LoadGenerator:
+    """HTTP负载生成器"""
+
+    def __init__(
+        self,
+        url: str,
+        rate: float = 0,
+        concurrency: int = 8,
+        duration: float = 10,
+        method: str = 'GET',
+        timeout: float = 10,
+        warmup: float = 0
+    ):
+        """
+        初始化负载生成器
+
+        Args:
+            url: 目标URL（http）
+            rate: 每秒请求数（0表示不限速，每个连接收到响应后立即发送下一个）
+            concurrency: 并发连接数
+            duration: 压测时长（秒）
+            method: 请求方法
+            timeout: 单个请求超时（秒）
+            warmup: 预热时长（秒），期间的请求不计入统计
+        """
+        self.logger = get_logger()
+        parsed = urlparse(url)
+        if parsed.scheme != 'http':
+            raise ValueError(f"只支持http: {url}")
+
+        self.url = url
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = (parsed.path or '/') + (f"?{parsed.query}" if parsed.query else '')
+        self.rate = rate
+        self.concurrency = max(1, concurrency)
+        self.duration = duration
+        self.method = method
+        self.timeout = timeout
+        self.warmup = warmup
+
+    def _worker(self, start: float, end: float, counter, result: Dict[str, Any]):
+        """工作线程：持有一个长连接，循环发送请求"""
+        histogram = result['histogram']
+        conn = None
+        while True:
+            if self.rate > 0:
+                # 固定速率：领取下一个请求的计划发送时间
+                intended = start + next(counter) / self.rate
+                # 服务跟不上计划速率时，到点后不再补发积压的请求
+                if intended >= end or time.perf_counter() >= end:
+                    break
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                intended = time.perf_counter()
+                if intended >= end:
+                    break
+
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                conn.request(self.method, self.path)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+                if response.will_close:
+                    conn.close()
+                    conn = None
+            except Exception as e:
+                status = type(e).__name__
+                if conn:
+                    conn.close()
+                conn = None
+
+            finished = time.perf_counter()
+            if intended < start + self.warmup:
+                continue
+
+            result['status'][status] = result['status'].get(status, 0) + 1
+            if isinstance(status, int) and status < 500:
+                histogram.record_seconds(finished - intended)
+            else:
+                result['errors'] += 1
+
+        if conn:
+            conn.close()
+
+    def run(self) -> Dict[str, Any]:
+        """
+        执行压测
+
+        Returns:
+            结果字典:
+            url/rate/concurrency/duration: 压测参数
+            requests: 计入统计的请求数
+            errors: 失败的请求数（连接错误和5xx）
+            status: {状态码或异常名: 次数}
+            throughput: 每秒成功请求数
+            latency_ms: {'min', 'p50', 'p90', 'p99', 'p99.9', 'max', 'mean'}
+        """
+        counter = itertools.count()
+        results = [
+            {'histogram': LatencyHistogram(), 'status': {}, 'errors': 0}
+            for _ in range(self.concurrency)
+        ]
+
+        self.logger.info(
+            f"压测 {self.url}: 并发 {self.concurrency}, "
+            f"速率 {self.rate or '不限'}/s, 时长 {self.duration}s"
+        )
+
+        start = time.perf_counter()
+        end = start + self.warmup + self.duration
+        threads = [
+            threading.Thread(target=self._worker, args=(start, end, counter, r), daemon=True)
+            for r in results
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = max(time.perf_counter() - start - self.warmup, 1e-9)
+
+        histogram = LatencyHistogram()
+        status: Dict[str, int] = {}
+        errors = 0
+        for r in results:
+            histogram.merge(r['histogram'])
+            errors += r['errors']
+            for code, count in r['status'].items():
+                status[str(code)] = status.get(str(code), 0) + count
+
+        return {
+            'url': self.url,
+            'rate': self.rate,
+            'concurrency': self.concurrency,
+            'duration': round(elapsed, 3),
+            'started_at': time.time() - elapsed,
+            'requests': histogram.total + errors,
+            'errors': errors,
+            'status': status,
+            'throughput': round(histogram.total / elapsed, 2),
+            'latency_ms': histogram.summary_ms()
+        }
+
+
+def save_result(result: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    保存压测结果
+
+    Args:
+        result: 压测结果
+        path: 文件路径（默认为应用数据目录/benchmarks/<时间>.json）
+
+    Returns:
+        文件路径
+    """
+    if path is None:
+        path = os.path.join(
+            Platform.get_app_dir(), 'benchmarks',
+            f"loadgen_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def format_result(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """
+    格式化压测结果
+
+    Args:
+        result: 压测结果
+        baseline: 对比的基准结果（可选，显示变化百分比）
+
+    Returns:
+        文本
+    """
+    def change(current, previous) -> str:
+        if previous in (None, 0) or current is None:
+            return ''
+        return f"  ({(current - previous) / previous * 100:+.1f}%)"
+
+    lines = [
+        f"请求数: {result['requests']}  失败: {result['errors']}  时长: {result['duration']}s",
+        f"吞吐量: {result['throughput']}/s"
+        + (change(result['throughput'], baseline.get('throughput')) if baseline else '')
+    ]
+    base_latency = baseline.get('latency_ms', {}) if baseline else {}
+    for key, value in result['latency_ms'].items():
+        text = '-' if value is None else f"{value:.2f}ms"
+        lines.append(f"  {key:<6} {text:>12}{change(value, base_latency.get(key))}")
+    return '\n'.join(lines)
+
+
+def _main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='OpenClaw网关压测')
+    parser.add_argument('url', help='目标URL，如 http://localhost:3000/')
+    parser.add_argument('--rate', type=float, default=0, help='每秒请求数（0表示不限速）')
+    parser.add_argument('--concurrency', type=int, default=8, help='并发连接数')
+    parser.add_argument('--duration', type=float, default=10, help='压测时长（秒）')
+    parser.add_argument('--warmup', type=float, default=0, help='预热时长（秒）')
+    parser.add_argument('--method', default='GET', help='请求方法')
+    parser.add_argument('--output', help='结果JSON文件路径')
+    parser.add_argument('--compare', help='对比的基准结果JSON文件')
+    args = parser.parse_args(argv)
+
+    result = LoadGenerator(
+        args.url,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        method=args.method,
+        warmup=args.warmup
+    ).run()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(format_result(result, baseline))
+    print(f"结果已保存: {save_result(result, args.output)}")
+
+
+# 命令行入口
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,243 @@
+"""
+日志尾部读取工具
+从文件末尾按块向前查找读取最后N行（不读取整个文件）；跟踪模式在Linux上使用inotify，其他平台轮询mtime/大小
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Optional, List, Iterator
+from .logger import get_logger
+from .platform import Platform
+
+
+def tail_lines(path: str, lines: int = 100, block_size: int = 64 * 1024) -> List[str]:
+    """
+    读取文件的最后N行
+
+    从文件末尾按块向前读取，找到足够的换行符即停止，耗时与文件大小无关。
+
+    Args:
+        path: 文件路径
+        lines: 行数
+        block_size: 每次向前读取的字节数
+
+    Returns:
+        行列表（不含换行符），文件不存在返回空列表
+    """
+    if lines <= 0:
+        return []
+
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return []
+
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        blocks = []
+        newlines = 0
+
+        # 末尾的换行符不算作一行的分隔
+        if end:
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                newlines -= 1
+
+        while position > 0 and newlines < lines:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+
+    data = b''.join(reversed(blocks))
+    result = data.decode('utf-8', errors='replace').splitlines()
+    return result[-lines:]
+
+
+class _PollWaiter:
+    """轮询文件mtime/大小等待变化"""
+
+    def __init__(self, path: str, interval: float):
+        self.path = path
+        self.interval = interval
+        self._last = self._signature()
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    def wait(self, timeout: float):
+        """等待文件变化或超时"""
+        end = time.monotonic() + timeout
+        while True:
+            signature = self._signature()
+            if signature != self._last:
+                self._last = signature
+                return
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class _InotifyWaiter:
+    """使用inotify等待文件所在目录的变化（可感知轮转）"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, path: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1失败')
+
+        directory = os.path.dirname(os.path.abspath(path)) or '.'
+        mask = (self.IN_MODIFY | self.IN_ATTRIB | self.IN_MOVED_FROM | self.IN_MOVED_TO
+                | self.IN_CREATE | self.IN_DELETE)
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch失败: {directory}")
+
+        self._name = os.fsencode(os.path.basename(path))
+
+    def wait(self, timeout: float):
+        """等待目标文件相关的事件或超时"""
+        end = time.monotonic() + timeout
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return
+            if self._drain():
+                return
+
+    def _drain(self) -> bool:
+        """读取并丢弃所有待处理事件，返回是否有目标文件的事件"""
+        matched = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return matched
+            offset = 0
+            while offset + self._EVENT.size <= len(data):
+                _, _, _, length = self._EVENT.unpack_from(data, offset)
+                name = data[offset + self._EVENT.size:offset + self._EVENT.size + length].rstrip(b'\0')
+                if name == self._name:
+                    matched = True
+                offset += self._EVENT.size + length
+
+    def close(self):
+        os.close(self._fd)
+
+
+def follow(
+    path: str,
+    from_end: bool = True,
+    poll_interval: float = 0.5,
+    stop_event: Optional[threading.Event] = None
+) -> Iterator[str]:
+    """
+    跟踪文件新增的行（类似 tail -F）
+
+    Linux上使用inotify等待写入，其他平台轮询mtime/大小；文件被轮转或截断后从新文件开头继续读取。
+
+    Args:
+        path: 文件路径
+        from_end: 从当前末尾开始（False则先输出已有内容）
+        poll_interval: 轮询间隔，同时也是检查stop_event的最长间隔（秒）
+        stop_event: 设置后停止跟踪
+
+    Yields:
+        新增的行（不含换行符）
+    """
+    logger = get_logger()
+
+    waiter = None
+    if Platform.is_linux():
+        try:
+            waiter = _InotifyWaiter(path)
+        except (OSError, AttributeError) as e:
+            logger.debug(f"inotify不可用，改用轮询: {e}")
+    if waiter is None:
+        waiter = _PollWaiter(path, poll_interval)
+
+    f = None
+    inode = None
+    partial = b''
+
+    try:
+        while not (stop_event and stop_event.is_set()):
+            if f is None:
+                try:
+                    f = open(path, 'rb')
+                    inode = os.fstat(f.fileno()).st_ino
+                    if from_end:
+                        f.seek(0, os.SEEK_END)
+                    # 首次之后（轮转/重建的文件）都从开头读取
+                    from_end = False
+                    partial = b''
+                except FileNotFoundError:
+                    waiter.wait(poll_interval)
+                    continue
+
+            chunk = f.read(64 * 1024)
+            if chunk:
+                partial += chunk
+                *complete, partial = partial.split(b'\n')
+                for line in complete:
+                    yield line.rstrip(b'\r').decode('utf-8', errors='replace')
+                continue
+
+            # 没有新数据：检查文件是否被轮转或截断
+            try:
+                st = os.stat(path)
+                if st.st_ino != inode or st.st_size < f.tell():
+                    f.close()
+                    f = None
+                    continue
+            except FileNotFoundError:
+                pass
+
+            waiter.wait(poll_interval)
+    finally:
+        if f:
+            f.close()
+        waiter.close()
+
+
+# 测试代码
+if __name__ == '__main__':
+    import sys
+
+    target = sys.argv[1]
+    print('\n'.join(tail_lines(target, 10)))
+    if '-f' in sys.argv:
+        for new_line in follow(target):
+            print(new_line, flush=True)
@@ -0,0 +1,273 @@
+"""
+耗时统计工具
+记录各操作阶段的墙钟时间、CPU时间和子进程时间，追加到本地指标文件，并统计p50/p95
+
+用法:
+    python -m utils.metrics [--op install] [--path metrics.jsonl]
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Any, Iterator
+from .logger import get_logger
+from .platform import Platform
+
+try:
+    import resource
+except ImportError:
+    # Windows没有resource模块，子进程时间记为0
+    resource = None
+
+
+def _children_time() -> float:
+    """已结束子进程的累计CPU时间（用户态+内核态）"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    计算百分位数（最近秩法）
+
+    Args:
+        values: 数值列表
+        pct: 百分位（0-100）
+
+    Returns:
+        百分位数，列表为空返回None
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class StageTimer:
+    """单个阶段的计时结果"""
+
+    def __init__(self):
+        self.ok = True
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.subprocess = 0.0
+
+
+class Metrics:
+    """阶段耗时统计"""
+
+    # 指标文件超过该大小时只保留后一半记录
+    MAX_FILE_BYTES = 2 * 1024 * 1024
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化统计
+
+        Args:
+            path: 指标文件路径（默认为应用数据目录/metrics.jsonl）
+        """
+        self.logger = get_logger()
+
+        if path is None:
+            path = os.path.join(Platform.get_app_dir(), 'metrics.jsonl')
+
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, operation: str, stage: str) -> Iterator[StageTimer]:
+        """
+        统计一个阶段的耗时
+
+        CPU时间为当前线程的CPU时间；子进程时间为期间结束的子进程的CPU时间
+        （进程级统计，多个阶段并发时可能互相计入）。
+
+        用法:
+            with metrics.measure('install', 'download') as timer:
+                ...
+                timer.ok = result
+
+        Args:
+            operation: 操作名（如install、start）
+            stage: 阶段名
+
+        Yields:
+            计时结果对象，可设置ok标记阶段是否成功
+        """
+        timer = StageTimer()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        children_start = _children_time()
+        try:
+            yield timer
+        except BaseException:
+            timer.ok = False
+            raise
+        finally:
+            timer.wall = time.perf_counter() - wall_start
+            timer.cpu = time.thread_time() - cpu_start
+            timer.subprocess = max(0.0, _children_time() - children_start)
+            self.record(operation, stage, timer.wall, timer.cpu, timer.subprocess, timer.ok)
+
+    def record(
+        self,
+        operation: str,
+        stage: str,
+        wall: float,
+        cpu: float = 0.0,
+        subprocess_time: float = 0.0,
+        ok: bool = True
+    ):
+        """
+        追加一条阶段记录
+
+        Args:
+            operation: 操作名
+            stage: 阶段名
+            wall: 墙钟时间（秒）
+            cpu: CPU时间（秒）
+            subprocess_time: 子进程CPU时间（秒）
+            ok: 是否成功
+        """
+        entry = {
+            't': round(time.time(), 3),
+            'op': operation,
+            'stage': stage,
+            'wall': round(wall, 4),
+            'cpu': round(cpu, 4),
+            'sub': round(subprocess_time, 4),
+            'ok': ok
+        }
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, separators=(',', ':'), ensure_ascii=False) + '\n')
+                if os.path.getsize(self.path) > self.MAX_FILE_BYTES:
+                    self._compact()
+        except Exception as e:
+            self.logger.debug(f"写入指标失败: {e}")
+
+        self.logger.debug(f"[{operation}] {stage}: {wall * 1000:.0f}ms (CPU {cpu * 1000:.0f}ms, 子进程 {subprocess_time * 1000:.0f}ms)")
+
+    def _compact(self):
+        """压缩指标文件，只保留后一半记录"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[len(lines) // 2:])
+        os.replace(tmp_path, self.path)
+
+    def load(self, operation: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        读取指标记录
+
+        Args:
+            operation: 只读取该操作的记录（None表示全部）
+
+        Returns:
+            记录列表
+        """
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if operation is None or entry.get('op') == operation:
+                    records.append(entry)
+        return records
+
+    def summarize(self, operation: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        按操作和阶段统计p50/p95
+
+        Args:
+            operation: 只统计该操作（None表示全部）
+
+        Returns:
+            {操作: {阶段: {'count', 'failures', 'wall_p50', 'wall_p95', 'cpu_p50',
+                          'cpu_p95', 'sub_p50', 'sub_p95'}}}
+        """
+        groups: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for entry in self.load(operation):
+            groups.setdefault(entry['op'], {}).setdefault(entry['stage'], []).append(entry)
+
+        summary = {}
+        for op, stages in groups.items():
+            summary[op] = {}
+            for stage, entries in stages.items():
+                stats = {
+                    'count': len(entries),
+                    'failures': sum(1 for e in entries if not e.get('ok', True))
+                }
+                for key in ('wall', 'cpu', 'sub'):
+                    values = [e.get(key, 0.0) for e in entries]
+                    stats[f"{key}_p50"] = percentile(values, 50)
+                    stats[f"{key}_p95"] = percentile(values, 95)
+                summary[op][stage] = stats
+        return summary
+
+    def format_summary(self, operation: Optional[str] = None) -> str:
+        """
+        格式化统计结果为文本表格（毫秒）
+
+        Args:
+            operation: 只统计该操作（None表示全部）
+
+        Returns:
+            表格文本
+        """
+        lines = [
+            f"{'操作':<10} {'阶段':<24} {'次数':>5} {'失败':>4} "
+            f"{'墙钟p50':>9} {'墙钟p95':>9} {'CPU p50':>9} {'CPU p95':>9} {'子进程p50':>9} {'子进程p95':>9}"
+        ]
+        for op, stages in self.summarize(operation).items():
+            for stage, s in stages.items():
+                lines.append(
+                    f"{op:<10} {stage:<24} {s['count']:>5} {s['failures']:>4} "
+                    + ' '.join(f"{s[k] * 1000:>9.0f}" for k in (
+                        'wall_p50', 'wall_p95', 'cpu_p50', 'cpu_p95', 'sub_p50', 'sub_p95'
+                    ))
+                )
+        return '\n'.join(lines)
+
+
+# 全局统计实例
+_metrics = None
+
+
+def get_metrics() -> Metrics:
+    """获取全局统计实例"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+# 命令行入口
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='OpenClawInstaller阶段耗时统计')
+    parser.add_argument('--op', help='只显示该操作（如install、start）')
+    parser.add_argument('--path', help='指标文件路径')
+    parser.add_argument('--json', action='store_true', help='以JSON输出')
+
+    args = parser.parse_args()
+
+    metrics = Metrics(args.path)
+    if args.json:
+        print(json.dumps(metrics.summarize(args.op), indent=2, ensure_ascii=False))
+    else:
+        print(metrics.format_summary(args.op))
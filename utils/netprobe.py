@@ -0,0 +1,181 @@
+"""
+网络探测工具
+并发测量多个端点的DNS解析、TCP连接和TLS握手耗时，并按延迟排序
+"""
+
+import socket
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+from urllib.parse import urlparse
+from .logger import get_logger
+
+
+class NetworkProbe:
+    """网络端点探测类"""
+
+    def __init__(self, timeout: float = 5, max_workers: int = 8, verify_tls: bool = True):
+        """
+        初始化探测器
+
+        Args:
+            timeout: 单个端点的超时时间（秒）
+            max_workers: 最大并发探测数
+            verify_tls: 是否校验TLS证书（本地测试服务器可关闭）
+        """
+        self.logger = get_logger()
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.verify_tls = verify_tls
+
+    @staticmethod
+    def parse_endpoint(url: str) -> Dict[str, Any]:
+        """
+        解析端点URL
+
+        Args:
+            url: 端点URL（如 https://registry.npmjs.org/），无scheme时按https处理
+
+        Returns:
+            {'url', 'host', 'port', 'tls'}
+        """
+        if '://' not in url:
+            url = f"https://{url}"
+        parsed = urlparse(url)
+        tls = parsed.scheme == 'https'
+        port = parsed.port or (443 if tls else 80)
+        return {'url': url, 'host': parsed.hostname, 'port': port, 'tls': tls}
+
+    def probe_endpoint(self, url: str) -> Dict[str, Any]:
+        """
+        探测单个端点
+
+        Args:
+            url: 端点URL
+
+        Returns:
+            探测结果字典:
+            url/host/port/tls: 端点信息
+            ok: 是否可用
+            dns_ms/connect_ms/tls_ms: 各阶段耗时（毫秒，未执行为None）
+            total_ms: 总耗时（毫秒）
+            error: 错误信息（成功为None）
+        """
+        result = self.parse_endpoint(url)
+        result.update({
+            'ok': False,
+            'dns_ms': None,
+            'connect_ms': None,
+            'tls_ms': None,
+            'total_ms': None,
+            'error': None
+        })
+
+        start = time.perf_counter()
+        sock = None
+        try:
+            # DNS解析
+            t0 = time.perf_counter()
+            addrinfo = socket.getaddrinfo(
+                result['host'], result['port'], type=socket.SOCK_STREAM
+            )
+            result['dns_ms'] = (time.perf_counter() - t0) * 1000
+            family, socktype, proto, _, address = addrinfo[0]
+
+            # TCP连接
+            t0 = time.perf_counter()
+            sock = socket.socket(family, socktype, proto)
+            sock.settimeout(self.timeout)
+            sock.connect(address)
+            result['connect_ms'] = (time.perf_counter() - t0) * 1000
+
+            # TLS握手
+            if result['tls']:
+                context = ssl.create_default_context()
+                if not self.verify_tls:
+                    context.check_hostname = False
+                    context.verify_mode = ssl.CERT_NONE
+                t0 = time.perf_counter()
+                sock = context.wrap_socket(sock, server_hostname=result['host'])
+                result['tls_ms'] = (time.perf_counter() - t0) * 1000
+
+            result['ok'] = True
+
+        except socket.timeout:
+            result['error'] = '超时'
+        except Exception as e:
+            result['error'] = str(e)
+        finally:
+            result['total_ms'] = (time.perf_counter() - start) * 1000
+            if sock:
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+        return result
+
+    def probe(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        并发探测多个端点
+
+        Args:
+            urls: 端点URL列表
+
+        Returns:
+            按延迟排序的结果列表（可用端点在前，按总耗时升序）
+        """
+        urls = list(dict.fromkeys(u for u in urls if u))
+        if not urls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            results = list(executor.map(self.probe_endpoint, urls))
+
+        results.sort(key=lambda r: (not r['ok'], r['total_ms']))
+
+        for r in results:
+            if r['ok']:
+                self.logger.debug(
+                    f"  {r['url']}: 连接 {r['connect_ms']:.0f}ms"
+                    + (f", TLS {r['tls_ms']:.0f}ms" if r['tls_ms'] is not None else "")
+                )
+            else:
+                self.logger.debug(f"  {r['url']}: 不可用 ({r['error']})")
+
+        return results
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    """
+    格式化探测结果为文本表格
+
+    Args:
+        results: probe() 返回的结果列表
+
+    Returns:
+        表格文本
+    """
+    def ms(value):
+        return f"{value:.0f}" if value is not None else "-"
+
+    lines = [f"{'端点':<45} {'DNS':>6} {'TCP':>6} {'TLS':>6} {'总计':>6}  状态"]
+    for r in results:
+        status = "✓" if r['ok'] else f"✗ {r['error']}"
+        lines.append(
+            f"{r['url']:<45} {ms(r['dns_ms']):>6} {ms(r['connect_ms']):>6} "
+            f"{ms(r['tls_ms']):>6} {ms(r['total_ms']):>6}  {status}"
+        )
+    return '\n'.join(lines)
+
+
+# 测试代码
+if __name__ == '__main__':
+    probe = NetworkProbe()
+    results = probe.probe([
+        'https://registry.npmjs.org/',
+        'https://registry.npmmirror.com/',
+        'https://github.com'
+    ])
+    print(format_table(results))
@@ -0,0 +1,313 @@
+"""
+进程资源采样工具
+定时读取/proc下进程及其所有子进程的CPU、内存、线程数和打开文件数，存入固定大小的数组环形缓冲区（仅Linux）
+"""
+
+import os
+import threading
+import time
+from array import array
+from typing import Optional, Dict, List
+from .logger import get_logger
+from .platform import Platform
+
+
+class SampleRing:
+    """数组实现的定长时间序列环形缓冲区"""
+
+    FIELDS = ('time', 'cpu_percent', 'rss', 'threads', 'fds', 'processes')
+
+    def __init__(self, capacity: int = 1800):
+        """
+        初始化缓冲区
+
+        Args:
+            capacity: 最多保留的样本数
+        """
+        self.capacity = capacity
+        self._columns = {name: array('d', bytes(8 * capacity)) for name in self.FIELDS}
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, sample: Dict[str, float]):
+        """追加一个样本（满时覆盖最旧的样本）"""
+        with self._lock:
+            for name in self.FIELDS:
+                self._columns[name][self._next] = sample.get(name, 0.0)
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def _index(self, age: int) -> int:
+        """第age新的样本的下标（0为最新）"""
+        return (self._next - 1 - age) % self.capacity
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """获取最新样本"""
+        with self._lock:
+            if not self._count:
+                return None
+            i = self._index(0)
+            return {name: self._columns[name][i] for name in self.FIELDS}
+
+    def since(self, start: float) -> List[Dict[str, float]]:
+        """获取时间不早于start的样本（按时间升序）"""
+        result = []
+        with self._lock:
+            times = self._columns['time']
+            for age in range(self._count):
+                i = self._index(age)
+                if times[i] < start:
+                    break
+                result.append({name: self._columns[name][i] for name in self.FIELDS})
+        result.reverse()
+        return result
+
+
+class ProcessSampler:
+    """进程树资源采样类"""
+
+    def __init__(self, pid: int, interval: float = 2.0, capacity: int = 1800):
+        """
+        初始化采样器
+
+        Args:
+            pid: 根进程PID（同时统计它的所有子孙进程）
+            interval: 采样间隔（秒）
+            capacity: 环形缓冲区容量（样本数）
+        """
+        self.logger = get_logger()
+        self.pid = pid
+        self.interval = interval
+        self.ring = SampleRing(capacity)
+
+        self._clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self._page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self._last_ticks: Dict[int, int] = {}
+        self._last_time: Optional[float] = None
+
+        # 采样自身消耗的CPU时间（秒）
+        self.overhead = 0.0
+        self._started = time.monotonic()
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def is_supported() -> bool:
+        """当前平台是否支持采样"""
+        return Platform.is_linux() and os.path.isdir('/proc/self')
+
+    # ==================== /proc 读取 ====================
+
+    @staticmethod
+    def _read_stat(pid: int) -> Optional[List[str]]:
+        """读取/proc/<pid>/stat中进程名之后的字段（下标0为state）"""
+        try:
+            with open(f"/proc/{pid}/stat", 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        # 进程名可能包含空格和括号，从最后一个')'之后开始拆分
+        return data[data.rfind(b')') + 2:].decode('ascii', errors='replace').split()
+
+    def _children(self, pid: int) -> List[int]:
+        """获取子进程PID（优先读/proc/<pid>/task/*/children）"""
+        result = []
+        try:
+            for tid in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{tid}/children", 'r') as f:
+                    result.extend(int(c) for c in f.read().split())
+            return result
+        except FileNotFoundError:
+            if not os.path.exists(f"/proc/{pid}"):
+                return []
+        except OSError:
+            pass
+
+        # 内核不支持children文件时扫描所有进程的ppid
+        for entry in os.listdir('/proc'):
+            if entry.isdigit():
+                fields = self._read_stat(int(entry))
+                if fields and int(fields[1]) == pid:
+                    result.append(int(entry))
+        return result
+
+    def process_tree(self) -> List[int]:
+        """获取根进程及所有子孙进程的PID"""
+        pids = []
+        queue = [self.pid]
+        while queue:
+            pid = queue.pop()
+            if pid in pids:
+                continue
+            pids.append(pid)
+            queue.extend(self._children(pid))
+        return pids
+
+    def _uptime_ticks(self) -> Optional[float]:
+        """系统启动至今的时钟滴答数"""
+        try:
+            with open('/proc/uptime', 'r') as f:
+                return float(f.read().split()[0]) * self._clock_ticks
+        except OSError:
+            return None
+
+    # ==================== 采样 ====================
+
+    def sample(self) -> Optional[Dict[str, float]]:
+        """
+        采样一次并写入环形缓冲区
+
+        Returns:
+            样本字典，根进程不存在时返回None
+        """
+        cpu_start = time.thread_time()
+        now = time.time()
+
+        ticks: Dict[int, int] = {}
+        rss = threads = fds = 0
+
+        for pid in self.process_tree():
+            fields = self._read_stat(pid)
+            if not fields:
+                continue
+            ticks[pid] = int(fields[11]) + int(fields[12])
+            threads += int(fields[17])
+            try:
+                with open(f"/proc/{pid}/statm", 'r') as f:
+                    rss += int(f.read().split()[1]) * self._page_size
+                fds += len(os.listdir(f"/proc/{pid}/fd"))
+            except OSError:
+                pass
+
+        if self.pid not in ticks:
+            self.overhead += time.thread_time() - cpu_start
+            return None
+
+        cpu_percent = 0.0
+        if self._last_time is not None and now > self._last_time:
+            # 新出现的子进程整个生命周期都计入本次间隔
+            used = sum(t - self._last_ticks.get(pid, 0) for pid, t in ticks.items())
+            cpu_percent = max(0.0, used / self._clock_ticks / (now - self._last_time) * 100)
+
+        self._last_ticks = ticks
+        self._last_time = now
+
+        sample = {
+            'time': now,
+            'cpu_percent': cpu_percent,
+            'rss': float(rss),
+            'threads': float(threads),
+            'fds': float(fds),
+            'processes': float(len(ticks))
+        }
+        self.ring.append(sample)
+        self.overhead += time.thread_time() - cpu_start
+        return sample
+
+    def start(self) -> bool:
+        """
+        启动后台采样线程
+
+        Returns:
+            启动成功返回True，平台不支持返回False
+        """
+        if not self.is_supported():
+            self.logger.debug("当前平台不支持进程采样")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+
+        self._stop_event.clear()
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._loop, name=f"sampler-{self.pid}", daemon=True)
+        self._thread.start()
+        return True
+
+    def _loop(self):
+        """采样线程"""
+        while not self._stop_event.is_set():
+            try:
+                if self.sample() is None:
+                    self.logger.debug(f"进程 {self.pid} 已退出，停止采样")
+                    break
+            except Exception as e:
+                self.logger.debug(f"采样失败: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        """停止采样线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    # ==================== 查询 ====================
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """获取最新样本"""
+        return self.ring.latest()
+
+    def window(self, seconds: float) -> Dict[str, Dict[str, float]]:
+        """
+        统计最近一段时间的样本
+
+        Args:
+            seconds: 时间窗口（秒）
+
+        Returns:
+            {指标: {'min', 'max', 'avg'}}，窗口内没有样本返回空字典
+        """
+        samples = self.ring.since(time.time() - seconds)
+        if not samples:
+            return {}
+        stats = {}
+        for name in SampleRing.FIELDS[1:]:
+            values = [s[name] for s in samples]
+            stats[name] = {'min': min(values), 'max': max(values), 'avg': sum(values) / len(values)}
+        return stats
+
+    def uptime(self) -> Optional[float]:
+        """
+        根进程的运行时间
+
+        Returns:
+            秒数，进程不存在返回None
+        """
+        fields = self._read_stat(self.pid)
+        uptime_ticks = self._uptime_ticks()
+        if not fields or uptime_ticks is None:
+            return None
+        return max(0.0, (uptime_ticks - int(fields[19])) / self._clock_ticks)
+
+    def overhead_percent(self) -> float:
+        """采样线程自身的CPU占用（百分比）"""
+        elapsed = time.monotonic() - self._started
+        return self.overhead / elapsed * 100 if elapsed > 0 else 0.0
+
+
+def format_sample(sample: Optional[Dict[str, float]]) -> str:
+    """格式化样本为一行文本"""
+    if not sample:
+        return '无数据'
+    return (
+        f"CPU {sample['cpu_percent']:.1f}%  内存 {sample['rss'] / 1024 / 1024:.1f}MB  "
+        f"线程 {sample['threads']:.0f}  文件 {sample['fds']:.0f}  进程 {sample['processes']:.0f}"
+    )
+
+
+# 测试代码
+if __name__ == '__main__':
+    import sys
+
+    sampler = ProcessSampler(int(sys.argv[1]) if len(sys.argv) > 1 else os.getpid(), interval=1)
+    for _ in range(5):
+        print(format_sample(sampler.sample()))
+        time.sleep(1)
+    print(f"运行时间: {sampler.uptime():.0f}s")
+    print(f"窗口统计: {sampler.window(60)}")
+    print(f"采样开销: {sampler.overhead_percent():.3f}%")
@@ -0,0 +1,143 @@
+"""
+进程输出日志
+子进程的stdout/stderr直接写入日志文件（文件描述符归子进程所有，本进程退出后子进程仍可正常写日志），
+按大小轮转：启动前轮转，运行中复制后截断
+"""
+
+import os
+import shutil
+from typing import List, IO
+from .logger import get_logger
+from .platform import Platform
+
+
+def rotate_file(path: str, backup_count: int, copy_truncate: bool = False):
+    """
+    轮转: path.N-1 -> path.N, ..., path -> path.1
+
+    Args:
+        path: 文件路径
+        backup_count: 保留的历史文件数（为0时直接清空）
+        copy_truncate: 复制到 path.1 后截断原文件（文件仍被其他进程以追加模式写入时使用）
+    """
+    for i in range(backup_count - 1, 0, -1):
+        src = f"{path}.{i}"
+        if os.path.exists(src):
+            os.replace(src, f"{path}.{i + 1}")
+
+    if copy_truncate:
+        if backup_count > 0:
+            shutil.copyfile(path, f"{path}.1")
+        with open(path, 'r+b') as f:
+            f.truncate(0)
+    elif backup_count > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+class ProcessLog:
+    """子进程日志文件"""
+
+    # 读取最近输出时最多读取的字节数
+    TAIL_BYTES = 64 * 1024
+
+    def __init__(self, path: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3):
+        """
+        初始化日志文件
+
+        Args:
+            path: 日志文件路径（轮转后的文件为 path.1 ~ path.N）
+            max_bytes: 单个文件的最大字节数
+            backup_count: 保留的历史文件数
+        """
+        self.logger = get_logger()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    def size(self) -> int:
+        """当前日志文件的字节数"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def open(self) -> IO[bytes]:
+        """
+        打开日志文件供子进程写入（超过大小上限时先轮转）
+
+        以追加模式打开，传给Popen的stdout/stderr后调用方应关闭自己的副本。
+
+        Returns:
+            文件对象
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if self.size() > self.max_bytes:
+            try:
+                rotate_file(self.path, self.backup_count)
+            except OSError as e:
+                self.logger.debug(f"轮转日志文件失败: {e}")
+        f = open(self.path, 'ab')
+        f.seek(0, os.SEEK_END)
+        return f
+
+    def trim(self) -> bool:
+        """
+        子进程运行中日志超过大小上限时，复制到 path.1 后截断
+
+        子进程以追加模式写入，截断后从文件开头继续写；复制和截断之间写入的少量输出会丢失。
+        Windows上子进程的文件句柄不是追加模式，截断后会在原位置继续写入，因此只在启动前轮转。
+
+        Returns:
+            执行了轮转返回True
+        """
+        if Platform.is_windows() or self.size() <= self.max_bytes:
+            return False
+        try:
+            rotate_file(self.path, self.backup_count, copy_truncate=True)
+            return True
+        except OSError as e:
+            self.logger.debug(f"轮转日志文件失败: {e}")
+            return False
+
+    def output_since(self, offset: int, lines: int = 20) -> List[str]:
+        """
+        读取offset之后写入的最后几行（用于获取本次启动的输出）
+
+        Args:
+            offset: 起始字节位置（子进程启动时的文件大小；文件已被截断时从开头读取）
+            lines: 行数
+
+        Returns:
+            行列表（不含换行符）
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                end = f.seek(0, os.SEEK_END)
+                start = offset if offset <= end else 0
+                f.seek(max(start, end - self.TAIL_BYTES))
+                data = f.read()
+        except OSError:
+            return []
+        return data.decode('utf-8', errors='replace').splitlines()[-lines:]
+
+
+# 测试代码
+if __name__ == '__main__':
+    import subprocess
+    import sys
+    import tempfile
+
+    log = ProcessLog(os.path.join(tempfile.mkdtemp(), 'test.log'), max_bytes=64 * 1024)
+    log_file = log.open()
+    offset = log_file.tell()
+    proc = subprocess.Popen(
+        [sys.executable, '-c', "import sys\nfor i in range(20000): print(i); print('e', i, file=sys.stderr)"],
+        stdout=log_file,
+        stderr=subprocess.STDOUT
+    )
+    log_file.close()
+    proc.wait()
+    print('\n'.join(log.output_since(offset, 5)))
+    print(f"轮转: {log.trim()}, 大小: {log.size()}")
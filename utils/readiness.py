@@ -0,0 +1,147 @@
+"""
+就绪探测工具
+以指数退避轮询TCP端口（可选HTTP健康检查路径），服务开始接受请求即返回，并记录就绪耗时
+"""
+
+import http.client
+import socket
+import time
+from typing import Optional, Callable, Dict, Any
+from .logger import get_logger
+
+
+class ReadinessProbe:
+    """服务就绪探测类"""
+
+    def __init__(
+        self,
+        port: int,
+        host: str = '127.0.0.1',
+        health_path: Optional[str] = None,
+        deadline: float = 30,
+        initial_delay: float = 0.05,
+        max_delay: float = 1.0,
+        factor: float = 2.0,
+        attempt_timeout: float = 1.0
+    ):
+        """
+        初始化探测器
+
+        Args:
+            port: 端口号
+            host: 主机地址
+            health_path: HTTP健康检查路径（如'/health'，None则只检查端口）
+            deadline: 最长等待时间（秒）
+            initial_delay: 首次重试间隔（秒）
+            max_delay: 最大重试间隔（秒）
+            factor: 重试间隔的增长倍数
+            attempt_timeout: 单次探测的超时（秒）
+        """
+        self.logger = get_logger()
+        self.port = port
+        self.host = host
+        self.health_path = health_path
+        self.deadline = deadline
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.attempt_timeout = attempt_timeout
+
+    def check_port(self) -> Optional[str]:
+        """
+        检查端口是否接受连接
+
+        Returns:
+            错误信息，可连接返回None
+        """
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.attempt_timeout):
+                return None
+        except socket.timeout:
+            return '连接超时'
+        except OSError as e:
+            return str(e)
+
+    def check_health(self) -> Optional[str]:
+        """
+        请求HTTP健康检查路径（2xx/3xx视为健康）
+
+        Returns:
+            错误信息，健康返回None
+        """
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.attempt_timeout)
+        try:
+            conn.request('GET', self.health_path)
+            status = conn.getresponse().status
+            if 200 <= status < 400:
+                return None
+            return f"HTTP {status}"
+        except socket.timeout:
+            return '请求超时'
+        except (OSError, http.client.HTTPException) as e:
+            return str(e)
+        finally:
+            conn.close()
+
+    def check(self) -> Optional[str]:
+        """执行一次探测，就绪返回None，否则返回错误信息"""
+        error = self.check_port()
+        if error is None and self.health_path:
+            error = self.check_health()
+        return error
+
+    def wait(self, alive: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        等待服务就绪
+
+        Args:
+            alive: 进程存活检查函数（返回False时立即停止等待，如 lambda: proc.poll() is None）
+
+        Returns:
+            探测结果字典:
+            ready: 是否就绪
+            elapsed: 等待耗时（秒）
+            attempts: 探测次数
+            error: 最后一次探测的错误信息（就绪为None）
+            exited: 进程是否在就绪前退出
+        """
+        start = time.monotonic()
+        end = start + self.deadline
+        delay = self.initial_delay
+        result = {'ready': False, 'elapsed': 0.0, 'attempts': 0, 'error': None, 'exited': False}
+
+        while True:
+            if alive and not alive():
+                result['exited'] = True
+                result['error'] = '进程已退出'
+                break
+
+            result['attempts'] += 1
+            result['error'] = self.check()
+            if result['error'] is None:
+                result['ready'] = True
+                break
+
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * self.factor, self.max_delay)
+
+        result['elapsed'] = time.monotonic() - start
+
+        if result['ready']:
+            self.logger.debug(f"服务就绪: {self.host}:{self.port} ({result['elapsed'] * 1000:.0f}ms, {result['attempts']}次探测)")
+        else:
+            self.logger.debug(f"服务未就绪: {self.host}:{self.port} ({result['error']})")
+
+        return result
+
+
+# 测试代码
+if __name__ == '__main__':
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    path = sys.argv[2] if len(sys.argv) > 2 else None
+    print(ReadinessProbe(port, health_path=path, deadline=5).wait())
@@ -0,0 +1,258 @@
+"""
+语义化版本工具
+支持npm风格的版本比较和范围匹配（^、~、x-range、连字符范围、||）
+"""
+
+import re
+from typing import Optional, Tuple, List, Iterable
+
+# 完整版本号: 1.2.3 / v1.2.3-beta.1+build
+_VERSION_RE = re.compile(
+    r'^\s*v?(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?\s*$'
+)
+# 部分版本号: 1 / 1.2 / 1.x / 1.2.* / 1.2.3-beta
+_PARTIAL_RE = re.compile(
+    r'^v?(\d+|[xX*])(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$'
+)
+_COMPARATOR_RE = re.compile(r'^(<=|>=|<|>|=|\^|~>?)?\s*(.*)$')
+
+Version = Tuple[int, int, int, Tuple]
+
+
+def parse(version: str) -> Optional[Version]:
+    """
+    解析版本号
+
+    Args:
+        version: 版本字符串（如'1.2.3'、'v18.17.0'、'1.0.0-beta.1'）
+
+    Returns:
+        (major, minor, patch, prerelease)，无法解析返回None
+    """
+    match = _VERSION_RE.match(version or '')
+    if not match:
+        return None
+    pre = ()
+    if match.group(4):
+        pre = tuple(int(p) if p.isdigit() else p for p in match.group(4).split('.'))
+    return int(match.group(1)), int(match.group(2)), int(match.group(3)), pre
+
+
+def _pre_key(pre: Tuple) -> Tuple:
+    """预发布标识的排序键（无预发布的版本大于有预发布的版本）"""
+    if not pre:
+        return (1,)
+    # 数字标识小于字母标识
+    return (0,) + tuple((0, p, '') if isinstance(p, int) else (1, 0, p) for p in pre)
+
+
+def _key(version: Version) -> Tuple:
+    return version[0], version[1], version[2], _pre_key(version[3])
+
+
+def compare(a: str, b: str) -> int:
+    """
+    比较两个版本号
+
+    Returns:
+        a<b返回-1，相等返回0，a>b返回1
+
+    Raises:
+        ValueError: 版本号无法解析
+    """
+    va, vb = parse(a), parse(b)
+    if va is None or vb is None:
+        raise ValueError(f"无效的版本号: {a if va is None else b}")
+    ka, kb = _key(va), _key(vb)
+    return (ka > kb) - (ka < kb)
+
+
+def _partial(text: str):
+    """解析部分版本号，缺失或通配的部分为None"""
+    match = _PARTIAL_RE.match(text)
+    if not match:
+        raise ValueError(f"无效的版本范围: {text}")
+    parts = []
+    for group in match.groups()[:3]:
+        parts.append(None if group is None or group in 'xX*' else int(group))
+    # 1.x.3 这种写法按 1.x 处理
+    for i in range(1, 3):
+        if parts[i - 1] is None:
+            parts[i] = None
+    pre = ()
+    if match.group(4) and parts[2] is not None:
+        pre = tuple(int(p) if p.isdigit() else p for p in match.group(4).split('.'))
+    return parts[0], parts[1], parts[2], pre
+
+
+def _desugar(op: str, text: str) -> List[Tuple[str, Version]]:
+    """将单个比较器展开为基本比较器列表 [(op, version)]"""
+    if text in ('', '*', 'x', 'X'):
+        return [('>=', (0, 0, 0, ()))]
+
+    major, minor, patch, pre = _partial(text)
+
+    if major is None:
+        return [('<', (0, 0, 0, ()))] if op in ('<', '>') else [('>=', (0, 0, 0, ()))]
+
+    low = (major, minor or 0, patch or 0, pre)
+
+    if op == '^':
+        if major > 0 or minor is None:
+            high = (major + 1, 0, 0, ())
+        elif minor > 0 or patch is None:
+            high = (0, minor + 1, 0, ())
+        else:
+            high = (0, 0, patch + 1, ())
+        return [('>=', low), ('<', _pre0(high))]
+
+    if op in ('~', '~>'):
+        if minor is None:
+            high = (major + 1, 0, 0, ())
+        else:
+            high = (major, minor + 1, 0, ())
+        return [('>=', low), ('<', _pre0(high))]
+
+    # 完整版本号
+    if patch is not None:
+        return [(op or '=', low)]
+
+    # x-range
+    if minor is None:
+        upper = (major + 1, 0, 0, ())
+    else:
+        upper = (major, minor + 1, 0, ())
+
+    if op in ('', '='):
+        return [('>=', low), ('<', _pre0(upper))]
+    if op == '>':
+        return [('>=', upper)]
+    if op == '>=':
+        return [('>=', low)]
+    if op == '<':
+        return [('<', _pre0(low))]
+    if op == '<=':
+        return [('<', _pre0(upper))]
+    raise ValueError(f"无效的版本范围: {op}{text}")
+
+
+def _pre0(version: Version) -> Version:
+    """上界使用 -0 预发布，排除上界版本的预发布（与npm一致）"""
+    return version[0], version[1], version[2], (0,) if not version[3] else version[3]
+
+
+def _parse_range(range_str: str) -> List[List[Tuple[str, Version]]]:
+    """解析版本范围为比较器集合列表（集合之间为或，集合内为与）"""
+    sets = []
+    for part in (range_str or '*').split('||'):
+        part = part.strip()
+        comparators = []
+
+        # 连字符范围: 1.2.3 - 2.3.4
+        hyphen = re.match(r'^(\S+)\s+-\s+(\S+)$', part)
+        if hyphen:
+            comparators.extend(c for c in _desugar('>=', hyphen.group(1)) if c[0] == '>=')
+            comparators.extend(c for c in _desugar('<=', hyphen.group(2)) if c[0] != '>=')
+            sets.append(comparators)
+            continue
+
+        # 运算符与版本之间允许空格: ">= 1.2.3"
+        tokens = re.sub(r'(<=|>=|<|>|=|\^|~>?)\s+', r'\1', part).split()
+        for token in tokens or ['*']:
+            match = _COMPARATOR_RE.match(token)
+            comparators.extend(_desugar(match.group(1) or '', match.group(2)))
+        sets.append(comparators)
+    return sets
+
+
+def _test(version: Version, op: str, bound: Version) -> bool:
+    kv, kb = _key(version), _key(bound)
+    if op == '=':
+        return kv == kb
+    if op == '>':
+        return kv > kb
+    if op == '>=':
+        return kv >= kb
+    if op == '<':
+        return kv < kb
+    if op == '<=':
+        return kv <= kb
+    return False
+
+
+def satisfies(version: str, range_str: str) -> bool:
+    """
+    检查版本是否满足范围
+
+    Args:
+        version: 版本号
+        range_str: npm风格的版本范围（如'^1.2.0'、'>=14 <21'、'1.x || 2.x'）
+
+    Returns:
+        满足返回True，否则返回False（版本或范围无效时也返回False）
+    """
+    v = parse(version)
+    if v is None:
+        return False
+    try:
+        sets = _parse_range(range_str)
+    except ValueError:
+        return False
+
+    for comparators in sets:
+        if not all(_test(v, op, bound) for op, bound in comparators):
+            continue
+        if v[3]:
+            # 预发布版本只匹配同一 major.minor.patch 上带预发布标识的比较器
+            if not any(bound[3] and bound[3] != (0,) and bound[:3] == v[:3]
+                       for _, bound in comparators):
+                continue
+        return True
+    return False
+
+
+def max_satisfying(versions: Iterable[str], range_str: str) -> Optional[str]:
+    """
+    获取满足范围的最高版本
+
+    Args:
+        versions: 候选版本列表
+        range_str: 版本范围
+
+    Returns:
+        最高的满足版本，没有则返回None
+    """
+    best = None
+    best_key = None
+    for version in versions:
+        if not satisfies(version, range_str):
+            continue
+        key = _key(parse(version))
+        if best_key is None or key > best_key:
+            best, best_key = version, key
+    return best
+
+
+# 测试代码
+if __name__ == '__main__':
+    cases = [
+        ('1.2.3', '^1.0.0', True),
+        ('2.0.0', '^1.0.0', False),
+        ('0.2.5', '^0.2.3', True),
+        ('0.3.0', '^0.2.3', False),
+        ('1.2.9', '~1.2.3', True),
+        ('1.3.0', '~1.2.3', False),
+        ('1.9.9', '1.x', True),
+        ('2.0.0-beta.1', '^2.0.0-beta.0', True),
+        ('2.0.0-beta.1', '^1.0.0', False),
+        ('3.0.0', '>=2 <4', True),
+        ('1.5.0', '1.2.3 - 2.3.4', True),
+        ('2.3.5', '1.2.3 - 2.3', True),
+        ('2.4.0', '1.2.3 - 2.3', False),
+        ('5.0.0', '1.x || >=5', True),
+    ]
+    for version, range_str, expected in cases:
+        result = satisfies(version, range_str)
+        flag = '✓' if result == expected else '✗'
+        print(f"{flag} {version} {range_str!r}: {result}")
+    print(max_satisfying(['1.0.0', '1.5.0', '2.0.0', '1.6.0-rc.1'], '^1.0.0'))
@@ -0,0 +1,188 @@
+"""
+本地TCP转发器
+占用对外端口，把连接转发到当前目标端口；切换目标只影响新连接，旧连接可以继续完成后再关闭（连接排空）
+"""
+
+import socket
+import threading
+import time
+from typing import Optional, Dict
+from .logger import get_logger
+
+
+class TcpForwarder:
+    """TCP转发器"""
+
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        listen_port: int,
+        target_port: int,
+        listen_host: str = '127.0.0.1',
+        target_host: str = '127.0.0.1',
+        connect_timeout: float = 5
+    ):
+        """
+        初始化转发器
+
+        Args:
+            listen_port: 对外监听的端口
+            target_port: 转发目标端口
+            listen_host: 监听地址
+            target_host: 目标地址
+            connect_timeout: 连接目标的超时（秒）
+        """
+        self.logger = get_logger()
+        self.listen_port = listen_port
+        self.listen_host = listen_host
+        self.target_host = target_host
+        self.target_port = target_port
+        self.connect_timeout = connect_timeout
+
+        self._server: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+
+        # 各目标端口上的活动连接数
+        self._active: Dict[int, int] = {}
+        self.total_connections = 0
+        self.failed_connections = 0
+
+    def start(self):
+        """
+        开始监听
+
+        Raises:
+            OSError: 端口被占用
+        """
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            server.bind((self.listen_host, self.listen_port))
+            server.listen(128)
+        except OSError:
+            server.close()
+            raise
+
+        self._server = server
+        self._thread = threading.Thread(target=self._accept_loop, name=f"forwarder-{self.listen_port}", daemon=True)
+        self._thread.start()
+        self.logger.info(f"转发器已启动: {self.listen_port} -> {self.target_port}")
+
+    def _accept_loop(self):
+        """接受连接"""
+        server = self._server
+        while True:
+            try:
+                client, _ = server.accept()
+            except OSError:
+                # 监听socket已关闭
+                break
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client: socket.socket):
+        """处理单个连接：连接当前目标并双向转发"""
+        with self._lock:
+            port = self.target_port
+            self._active[port] = self._active.get(port, 0) + 1
+            self.total_connections += 1
+
+        upstream = None
+        try:
+            upstream = socket.create_connection((self.target_host, port), timeout=self.connect_timeout)
+            upstream.settimeout(None)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            upstream.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            reverse = threading.Thread(target=self._pump, args=(upstream, client), daemon=True)
+            reverse.start()
+            self._pump(client, upstream)
+            reverse.join()
+        except OSError as e:
+            with self._lock:
+                self.failed_connections += 1
+            self.logger.debug(f"转发失败 (目标端口 {port}): {e}")
+        finally:
+            for sock in (client, upstream):
+                if sock:
+                    try:
+                        sock.close()
+                    except OSError:
+                        pass
+            with self._lock:
+                self._active[port] -= 1
+                self._drained.notify_all()
+
+    def _pump(self, src: socket.socket, dst: socket.socket):
+        """单向转发直到对端关闭写方向"""
+        try:
+            while True:
+                data = src.recv(self.BUFFER_SIZE)
+                if not data:
+                    break
+                dst.sendall(data)
+        except OSError:
+            pass
+        finally:
+            try:
+                dst.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+    def switch(self, target_port: int) -> int:
+        """
+        切换转发目标（只影响新连接）
+
+        Args:
+            target_port: 新的目标端口
+
+        Returns:
+            原目标端口
+        """
+        with self._lock:
+            old = self.target_port
+            self.target_port = target_port
+        self.logger.info(f"转发目标切换: {old} -> {target_port}")
+        return old
+
+    def active_connections(self, target_port: Optional[int] = None) -> int:
+        """活动连接数（target_port为None时统计全部）"""
+        with self._lock:
+            if target_port is None:
+                return sum(self._active.values())
+            return self._active.get(target_port, 0)
+
+    def drain(self, target_port: int, timeout: float = 30) -> bool:
+        """
+        等待目标端口上的连接全部结束
+
+        Args:
+            target_port: 目标端口
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            全部结束返回True，超时返回False
+        """
+        end = time.monotonic() + timeout
+        with self._lock:
+            while self._active.get(target_port, 0) > 0:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._drained.wait(remaining)
+        return True
+
+    def stop(self):
+        """停止监听（已建立的连接不受影响，可随后调用drain等待结束）"""
+        if self._server:
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._server.close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None